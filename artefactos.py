@@ -0,0 +1,517 @@
+"""
+Módulo con la geometría persistida de las rutas y la caché de sus archivos.
+
+Al crear una ruta solo se guarda su geometría y sus métricas en
+'rutas/geometrias/': los puntos del camino de todos los tramos en binario, en
+'<nombre>.npy', el resto de datos en '<nombre>.json' y su huella en
+'<nombre>.huella'. Los archivos PDF, GPX y HTML se generan la primera vez que
+se piden (a través del planificador de exportacion.py) y se guardan en
+'cache_artefactos/' bajo una huella de su contenido (SHA-256 de la geometría,
+el formato y la versión de su generador), de modo que las siguientes peticiones
+sirven el archivo directamente, leyendo solo la huella guardada, y solo ocupan
+disco los archivos que realmente se usan. Al cambiar un generador hay que subir
+su versión en VERSIONES_RENDERIZADORES, para que no se sigan sirviendo los
+archivos generados con la versión anterior.
+
+Los nombres públicos de los archivos no cambian: '<nombre>.pdf',
+'rutas_<nombre>.html' y 'rutas_<nombre>.gpx' dentro de /static. El GPX ligero,
+con el camino simplificado (ver simplificacion.py), es 'rutas_<nombre>.lite.gpx'.
+
+"""
+
+import os
+import json
+import hashlib
+import threading
+from dataclasses import dataclass, fields
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from utils import exportar_gpx, exportar_pdf, generar_mapa
+from simplificacion import TOLERANCIA_GPX_LIGERO_M, ZOOM_INICIAL_MAPA, importancia_puntos, tolerancia_para_zoom
+
+_BASE = os.path.dirname(os.path.abspath(__file__))
+
+# Carpeta con la geometría de cada ruta
+DIRECTORIO_GEOMETRIAS = os.path.join(_BASE, "rutas", "geometrias")
+
+# Carpeta con los archivos generados, por huella de contenido
+DIRECTORIO_ARTEFACTOS = os.path.join(_BASE, "cache_artefactos")
+
+
+@dataclass(frozen=True, eq=False)
+class GeometriaRuta:
+    """
+    Geometría y métricas de una ruta, suficientes para generar todos sus archivos.
+
+    Dos geometrías son iguales si tienen la misma huella, es decir, el mismo contenido.
+
+    Attributes
+    ----------
+    nombre : str
+        Nombre de la ruta.
+    modo_transporte : str
+        "walk", "bike" o "drive".
+    origen : Tuple[float, float]
+        Coordenadas del punto de inicio.
+    puntos_intermedios : List[Tuple[float, float]]
+        Coordenadas de los puntos intermedios, en el orden de la ruta.
+    destino : Tuple[float, float]
+        Coordenadas del destino.
+    origen_nombre : str
+        Nombre legible del origen.
+    puntos_intermedios_nombres : List[str]
+        Nombres legibles de los puntos intermedios.
+    destino_nombre : str
+        Nombre legible del destino.
+    distancias : List[float]
+        Distancia de cada tramo en km.
+    tiempos_estimados : List[float]
+        Tiempo estimado de cada tramo en horas.
+    tramos : List[np.ndarray]
+        Arrays (n, 3) de latitud, longitud y elevación del camino de cada tramo.
+    """
+    nombre: str
+    modo_transporte: str
+    origen: Tuple[float, float]
+    puntos_intermedios: List[Tuple[float, float]]
+    destino: Tuple[float, float]
+    origen_nombre: str
+    puntos_intermedios_nombres: List[str]
+    destino_nombre: str
+    distancias: List[float]
+    tiempos_estimados: List[float]
+    tramos: List[np.ndarray]
+
+    def __eq__(self, otra: object) -> bool:
+        return isinstance(otra, GeometriaRuta) and self.huella() == otra.huella()
+
+    def __hash__(self) -> int:
+        return hash(self.huella())
+
+    @cached_property
+    def importancia_tramos(self) -> List[np.ndarray]:
+        """
+        Importancia de Douglas-Peucker de los puntos de cada tramo.
+
+        Se calcula una sola vez por geometría; cada nivel de detalle se obtiene
+        después con tramos_simplificados().
+        """
+        return [importancia_puntos(puntos) for puntos in self.tramos]
+
+    def tramos_simplificados(self, tolerancia: float) -> List[np.ndarray]:
+        """
+        Devuelve los puntos de cada tramo simplificados con Douglas-Peucker.
+
+        Parameters
+        ----------
+        tolerancia : float
+            Desviación máxima admitida en metros.
+
+        Returns
+        -------
+        List[np.ndarray]
+            Arrays (n, 3) de latitud, longitud y elevación de los puntos conservados.
+        """
+        return [puntos[importancia > tolerancia]
+                for puntos, importancia in zip(self.tramos, self.importancia_tramos)]
+
+    def _metadatos(self) -> Dict[str, Any]:
+        # Todos los datos salvo los puntos de los tramos, que se guardan aparte en binario
+        datos = {campo.name: getattr(self, campo.name) for campo in fields(self) if campo.name != "tramos"}
+        datos["longitudes_tramos"] = [len(puntos) for puntos in self.tramos]
+        return datos
+
+    def _puntos(self) -> np.ndarray:
+        # Puntos de todos los tramos en un único array (n, 3) contiguo
+        if not self.tramos:
+            return np.empty((0, 3), dtype=np.float64)
+        return np.ascontiguousarray(np.concatenate(self.tramos), dtype=np.float64)
+
+    @cached_property
+    def _huella(self) -> str:
+        metadatos = json.dumps(self._metadatos(), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        huella = hashlib.sha256(metadatos.encode("utf-8"))
+        huella.update(self._puntos().tobytes())
+        return huella.hexdigest()
+
+    def huella(self) -> str:
+        """
+        Devuelve la huella SHA-256 del contenido de la geometría.
+
+        Se calcula una sola vez por geometría, que no se puede modificar.
+
+        Returns
+        -------
+        str
+            Huella en hexadecimal; cambia si cambia cualquier dato de la ruta.
+        """
+        return self._huella
+
+    def guardar(self, directorio: str = DIRECTORIO_GEOMETRIAS) -> str:
+        """
+        Guarda la geometría en '<directorio>/<nombre>.npy' y '<nombre>.json', y su huella en '<nombre>.huella'.
+
+        Parameters
+        ----------
+        directorio : str, optional
+            Carpeta de destino, por defecto DIRECTORIO_GEOMETRIAS.
+
+        Returns
+        -------
+        str
+            Ruta del archivo guardado.
+        """
+        os.makedirs(directorio, exist_ok=True)
+        ruta_archivo = os.path.join(directorio, f"{self.nombre}.json")
+        sufijo = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        ruta_puntos = os.path.join(directorio, f"{self.nombre}.npy")
+        with open(f"{ruta_puntos}.{sufijo}", "wb") as archivo:
+            np.save(archivo, self._puntos(), allow_pickle=False)
+        os.replace(f"{ruta_puntos}.{sufijo}", ruta_puntos)
+        with open(f"{ruta_archivo}.{sufijo}", "w", encoding="utf-8") as archivo:
+            json.dump(self._metadatos(), archivo, ensure_ascii=False)
+        os.replace(f"{ruta_archivo}.{sufijo}", ruta_archivo)
+        # La huella se escribe después, para que nunca apunte a una geometría que aún no está guardada
+        ruta_huella = os.path.join(directorio, f"{self.nombre}.huella")
+        with open(f"{ruta_huella}.{sufijo}", "w", encoding="utf-8") as archivo:
+            archivo.write(self.huella())
+        os.replace(f"{ruta_huella}.{sufijo}", ruta_huella)
+        return ruta_archivo
+
+    @staticmethod
+    def leer_huella(nombre: str, directorio: str = DIRECTORIO_GEOMETRIAS) -> Optional[str]:
+        """
+        Lee la huella guardada de una ruta sin cargar su geometría.
+
+        Parameters
+        ----------
+        nombre : str
+            Nombre de la ruta.
+        directorio : str, optional
+            Carpeta de las geometrías, por defecto DIRECTORIO_GEOMETRIAS.
+
+        Returns
+        -------
+        Optional[str]
+            Huella de la geometría, o None si no se ha guardado.
+        """
+        if os.path.basename(nombre) != nombre:
+            return None
+        try:
+            with open(os.path.join(directorio, f"{nombre}.huella"), "r", encoding="utf-8") as archivo:
+                return archivo.read().strip() or None
+        except OSError:
+            return None
+
+    @classmethod
+    def cargar(cls, nombre: str, directorio: str = DIRECTORIO_GEOMETRIAS) -> Optional["GeometriaRuta"]:
+        """
+        Carga la geometría guardada de una ruta.
+
+        Parameters
+        ----------
+        nombre : str
+            Nombre de la ruta.
+        directorio : str, optional
+            Carpeta de las geometrías, por defecto DIRECTORIO_GEOMETRIAS.
+
+        Returns
+        -------
+        Optional[GeometriaRuta]
+            Geometría de la ruta, o None si no existe o no se puede leer.
+        """
+        ruta_archivo = os.path.join(directorio, f"{nombre}.json")
+        if os.path.basename(nombre) != nombre or not os.path.exists(ruta_archivo):
+            return None
+        try:
+            with open(ruta_archivo, "r", encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+            datos["origen"] = tuple(datos["origen"])
+            datos["destino"] = tuple(datos["destino"])
+            datos["puntos_intermedios"] = [tuple(p) for p in datos["puntos_intermedios"]]
+            longitudes = datos.pop("longitudes_tramos", None)
+            if longitudes is None:
+                # Geometría guardada con los puntos de los tramos dentro del JSON
+                datos["tramos"] = [np.asarray(tramo, dtype=np.float64).reshape(-1, 3) for tramo in datos["tramos"]]
+                return cls(**datos)
+            puntos = np.load(os.path.join(directorio, f"{nombre}.npy"), allow_pickle=False)
+            if puntos.shape != (sum(longitudes), 3):
+                raise ValueError("los puntos guardados no corresponden a los tramos")
+            datos["tramos"] = np.split(puntos, np.cumsum(longitudes)[:-1]) if longitudes else []
+            return cls(**datos)
+        except Exception as e:
+            print(f"Error al cargar la geometría '{ruta_archivo}': {e}")
+            return None
+
+
+def _renderizar_html(geometria: GeometriaRuta, archivo: str) -> str:
+    # Sin los puntos que no se distinguen con el zoom con el que se abre el mapa (unos 4 m en Alicante)
+    tolerancia = tolerancia_para_zoom(ZOOM_INICIAL_MAPA, geometria.origen[0])
+    tramos = [puntos[:, :2] for puntos in geometria.tramos_simplificados(tolerancia)]
+    return generar_mapa(geometria.origen, geometria.puntos_intermedios, geometria.destino, tramos, archivo)
+
+
+def _renderizar_gpx(geometria: GeometriaRuta, archivo: str) -> str:
+    return exportar_gpx(geometria.tramos, archivo)
+
+
+def _renderizar_gpx_ligero(geometria: GeometriaRuta, archivo: str) -> str:
+    return exportar_gpx(geometria.tramos_simplificados(TOLERANCIA_GPX_LIGERO_M), archivo)
+
+
+def _renderizar_pdf(geometria: GeometriaRuta, archivo: str) -> str:
+    return exportar_pdf(geometria.distancias, geometria.tiempos_estimados, geometria.modo_transporte,
+                        geometria.nombre, geometria.origen_nombre, geometria.puntos_intermedios_nombres,
+                        geometria.destino_nombre, archivo)
+
+
+# Generador de cada formato a partir de la geometría
+RENDERIZADORES: Dict[str, Callable[[GeometriaRuta, str], str]] = {
+    "gpx": _renderizar_gpx,
+    "html": _renderizar_html,
+    "pdf": _renderizar_pdf,
+    "gpx_lite": _renderizar_gpx_ligero,
+}
+
+# Versión del generador de cada formato; forma parte de la huella de sus archivos
+VERSIONES_RENDERIZADORES: Dict[str, int] = {
+    "gpx": 1,
+    "html": 2,
+    "pdf": 1,
+    "gpx_lite": 1,
+}
+
+# Extensión de los archivos de cada formato
+EXTENSIONES: Dict[str, str] = {
+    "gpx": "gpx",
+    "html": "html",
+    "pdf": "pdf",
+    "gpx_lite": "lite.gpx",
+}
+
+
+def huella_artefacto(huella: str, formato: str) -> str:
+    """
+    Devuelve la huella del archivo de un formato generado a partir de una geometría.
+
+    Parameters
+    ----------
+    huella : str
+        Huella de la geometría (ver GeometriaRuta.huella()).
+    formato : str
+        "gpx", "gpx_lite", "html" o "pdf".
+
+    Returns
+    -------
+    str
+        SHA-256 de la huella de la geometría, el formato y la versión de su generador.
+    """
+    contenido = f"{huella}|{formato}|{VERSIONES_RENDERIZADORES[formato]}"
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def archivo_publico(nombre: str, formato: str) -> str:
+    """
+    Devuelve el nombre público (dentro de /static) del archivo de una ruta.
+
+    Parameters
+    ----------
+    nombre : str
+        Nombre de la ruta.
+    formato : str
+        "gpx", "gpx_lite", "html" o "pdf".
+
+    Returns
+    -------
+    str
+        '<nombre>.pdf', 'rutas_<nombre>.html', 'rutas_<nombre>.gpx' o 'rutas_<nombre>.lite.gpx'.
+    """
+    return f"{nombre}.pdf" if formato == "pdf" else f"rutas_{nombre}.{EXTENSIONES[formato]}"
+
+
+def interpretar_archivo_publico(nombre_archivo: str) -> Optional[Tuple[str, str]]:
+    """
+    Obtiene la ruta y el formato a los que corresponde un nombre público de archivo.
+
+    Parameters
+    ----------
+    nombre_archivo : str
+        Nombre pedido dentro de /static.
+
+    Returns
+    -------
+    Optional[Tuple[str, str]]
+        (nombre de la ruta, formato), o None si no es un archivo de ruta.
+    """
+    if os.path.basename(nombre_archivo) != nombre_archivo:
+        return None
+    if nombre_archivo.endswith(".pdf") and len(nombre_archivo) > len(".pdf"):
+        return nombre_archivo[:-len(".pdf")], "pdf"
+    if not nombre_archivo.startswith("rutas_"):
+        return None
+    # Las extensiones más largas primero, para que '.lite.gpx' no se tome por '.gpx'
+    for formato, extension in sorted(EXTENSIONES.items(), key=lambda e: -len(e[1])):
+        nombre = nombre_archivo[len("rutas_"):-len(extension) - 1]
+        if formato != "pdf" and nombre_archivo.endswith(f".{extension}") and nombre:
+            return nombre, formato
+    return None
+
+
+class CacheArtefactos:
+    """
+    Caché en disco de los archivos generados de las rutas, por huella de contenido.
+
+    Attributes
+    ----------
+    directorio : str
+        Carpeta de los archivos generados.
+
+    Methods
+    -------
+    ruta_archivo(geometria, formato)
+        Devuelve dónde se guarda el archivo de un formato.
+    ruta_por_huella(huella, formato)
+        Devuelve dónde se guarda el archivo de un formato a partir de la huella de la geometría.
+    obtener(geometria, formato)
+        Devuelve el archivo de un formato, generándolo si todavía no existe.
+    eliminar(huella)
+        Borra los archivos generados de una geometría.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_ARTEFACTOS) -> None:
+        """
+        Inicializa la caché.
+
+        Parameters
+        ----------
+        directorio : str, optional
+            Carpeta de los archivos generados, por defecto DIRECTORIO_ARTEFACTOS.
+        """
+        self.directorio: str = directorio
+        self._bloqueos: Dict[str, threading.Lock] = {}
+        self._bloqueo: threading.Lock = threading.Lock()
+
+    def ruta_archivo(self, geometria: GeometriaRuta, formato: str) -> str:
+        """
+        Devuelve dónde se guarda el archivo de un formato.
+
+        Parameters
+        ----------
+        geometria : GeometriaRuta
+            Geometría de la ruta.
+        formato : str
+            "gpx", "gpx_lite", "html" o "pdf".
+
+        Returns
+        -------
+        str
+            Ruta '<directorio>/<huella del archivo>.<extensión>'.
+        """
+        return self.ruta_por_huella(geometria.huella(), formato)
+
+    def ruta_por_huella(self, huella: str, formato: str) -> str:
+        """
+        Devuelve dónde se guarda el archivo de un formato a partir de la huella de la geometría.
+
+        Parameters
+        ----------
+        huella : str
+            Huella de la geometría.
+        formato : str
+            "gpx", "gpx_lite", "html" o "pdf".
+
+        Returns
+        -------
+        str
+            Ruta '<directorio>/<huella del archivo>.<extensión>'.
+        """
+        return os.path.join(self.directorio, f"{huella_artefacto(huella, formato)}.{EXTENSIONES[formato]}")
+
+    def obtener(self, geometria: GeometriaRuta, formato: str) -> str:
+        """
+        Devuelve el archivo de un formato, generándolo si todavía no existe.
+
+        Dos peticiones simultáneas del mismo archivo lo generan una sola vez.
+
+        Parameters
+        ----------
+        geometria : GeometriaRuta
+            Geometría de la ruta.
+        formato : str
+            "gpx", "gpx_lite", "html" o "pdf".
+
+        Returns
+        -------
+        str
+            Ruta del archivo generado.
+
+        Raises
+        ------
+        ValueError
+            Si el formato no es válido.
+        """
+        if formato not in RENDERIZADORES:
+            raise ValueError(f"Formato de archivo no válido: {formato}")
+        ruta_archivo = self.ruta_archivo(geometria, formato)
+        if os.path.exists(ruta_archivo):
+            return ruta_archivo
+
+        with self._bloqueo:
+            bloqueo = self._bloqueos.setdefault(ruta_archivo, threading.Lock())
+        try:
+            with bloqueo:
+                if not os.path.exists(ruta_archivo):
+                    os.makedirs(self.directorio, exist_ok=True)
+                    # Se genera con otro nombre y se renombra, para no servir nunca un archivo a medias
+                    temporal = f"{ruta_archivo}.{os.getpid()}.tmp.{EXTENSIONES[formato]}"
+                    try:
+                        RENDERIZADORES[formato](geometria, temporal)
+                        os.replace(temporal, ruta_archivo)
+                    finally:
+                        if os.path.exists(temporal):
+                            os.remove(temporal)
+        finally:
+            with self._bloqueo:
+                if self._bloqueos.get(ruta_archivo) is bloqueo:
+                    del self._bloqueos[ruta_archivo]
+        return ruta_archivo
+
+    def eliminar(self, huella: str) -> None:
+        """
+        Borra los archivos generados de una geometría.
+
+        Parameters
+        ----------
+        huella : str
+            Huella de la geometría.
+        """
+        for formato in RENDERIZADORES:
+            ruta_archivo = self.ruta_por_huella(huella, formato)
+            if os.path.exists(ruta_archivo):
+                os.remove(ruta_archivo)
+
+
+# Caché de archivos compartida por todo el proceso
+cache_artefactos = CacheArtefactos()
+
+
+def eliminar_artefactos(nombre: str) -> None:
+    """
+    Borra la geometría guardada de una ruta y sus archivos generados.
+
+    Parameters
+    ----------
+    nombre : str
+        Nombre de la ruta.
+    """
+    huella = GeometriaRuta.leer_huella(nombre, DIRECTORIO_GEOMETRIAS)
+    if huella is None:
+        geometria = GeometriaRuta.cargar(nombre, DIRECTORIO_GEOMETRIAS)
+        huella = geometria.huella() if geometria is not None else None
+    if huella is not None:
+        cache_artefactos.eliminar(huella)
+    for extension in ("npy", "json", "huella"):
+        ruta_archivo = os.path.join(DIRECTORIO_GEOMETRIAS, f"{nombre}.{extension}")
+        if os.path.exists(ruta_archivo):
+            os.remove(ruta_archivo)
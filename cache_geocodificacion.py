@@ -0,0 +1,210 @@
+"""
+Módulo con la caché persistente de geocodificación.
+
+Guarda en una base de datos SQLite el resultado de cada consulta al
+geocodificador, de modo que las direcciones frecuentes (p. ej. "Plaza de los
+Luceros") no vuelven a consultarse a Nominatim ni pagan la espera entre
+peticiones. También se guardan entradas negativas para las direcciones que no
+se encontraron o que quedaron fuera de Alicante, con una caducidad más corta.
+
+Las direcciones se guardan por su clave canónica (ver
+normalizacion_direcciones.py), por lo que las distintas formas de escribir una
+misma dirección comparten entrada. La clave incluye además el proveedor que
+dio el resultado, de modo que los resultados de un servidor de pruebas o del
+nomenclátor nunca se sirven como si vinieran de Nominatim. Las entradas se
+mantienen además en memoria, por lo que un acierto repetido en el mismo
+proceso no llega a consultar la base de datos.
+
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+from normalizacion_direcciones import clave_canonica
+
+# Archivo SQLite de la caché
+DB_GEOCODIFICACION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_geocodificacion.db")
+
+# Caducidad en segundos de las entradas positivas y negativas
+TTL_POSITIVO = 30 * 24 * 3600
+TTL_NEGATIVO = 24 * 3600
+
+# Proveedor cuyas claves no llevan prefijo (las entradas guardadas antes de distinguir proveedores)
+PROVEEDOR_NOMINATIM = "nominatim"
+
+
+def clave_consulta(direccion: str, proveedor: str = PROVEEDOR_NOMINATIM) -> str:
+    """
+    Calcula la clave de caché de una dirección.
+
+    Parameters
+    ----------
+    direccion : str
+        Dirección tal y como la escribe el usuario.
+    proveedor : str, optional
+        Nombre del proveedor que geocodifica la dirección, por defecto PROVEEDOR_NOMINATIM.
+
+    Returns
+    -------
+    str
+        Clave canónica de la dirección, precedida de "<proveedor>|" si no es Nominatim.
+    """
+    clave = clave_canonica(direccion)
+    return clave if proveedor == PROVEEDOR_NOMINATIM else f"{proveedor}|{clave}"
+
+
+class CacheGeocodificacion:
+    """
+    Caché de geocodificación en SQLite con caducidad y entradas negativas.
+
+    Attributes
+    ----------
+    ruta_archivo : str
+        Ruta de la base de datos SQLite.
+    ttl_positivo : float
+        Segundos de validez de una dirección encontrada.
+    ttl_negativo : float
+        Segundos de validez de una dirección no encontrada.
+
+    Methods
+    -------
+    obtener(direccion, proveedor)
+        Busca una dirección en la caché.
+    guardar(direccion, coordenadas, proveedor)
+        Guarda el resultado de geocodificar una dirección.
+    eliminar_caducadas()
+        Borra de la base de datos las entradas caducadas.
+    """
+
+    def __init__(self, ruta_archivo: str = DB_GEOCODIFICACION,
+                 ttl_positivo: float = TTL_POSITIVO, ttl_negativo: float = TTL_NEGATIVO) -> None:
+        """
+        Inicializa la caché y crea la tabla si no existe.
+
+        Parameters
+        ----------
+        ruta_archivo : str, optional
+            Ruta de la base de datos, por defecto 'cache_geocodificacion.db'.
+        ttl_positivo : float, optional
+            Validez en segundos de las entradas positivas, por defecto 30 días.
+        ttl_negativo : float, optional
+            Validez en segundos de las entradas negativas, por defecto 1 día.
+        """
+        self.ruta_archivo: str = ruta_archivo
+        self.ttl_positivo: float = ttl_positivo
+        self.ttl_negativo: float = ttl_negativo
+        self._memoria: Dict[str, Tuple[Optional[Tuple[float, float]], float]] = {}
+        self._bloqueo: threading.Lock = threading.Lock()
+        self._conexion: Optional[sqlite3.Connection] = None
+
+    def obtener(self, direccion: str,
+                proveedor: str = PROVEEDOR_NOMINATIM) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """
+        Busca una dirección en la caché.
+
+        Parameters
+        ----------
+        direccion : str
+            Dirección a buscar.
+        proveedor : str, optional
+            Nombre del proveedor, por defecto PROVEEDOR_NOMINATIM.
+
+        Returns
+        -------
+        Tuple[bool, Optional[Tuple[float, float]]]
+            (True, coordenadas) si hay una entrada vigente, donde las coordenadas
+            son None en las entradas negativas; (False, None) si no la hay.
+        """
+        clave = clave_consulta(direccion, proveedor)
+        ahora = time.time()
+
+        entrada = self._memoria.get(clave)
+        if entrada is None:
+            try:
+                with self._bloqueo:
+                    fila = self._conectar().execute(
+                        "SELECT lat, lon, expira FROM geocodificaciones WHERE consulta = ?", (clave,)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Error al leer '{direccion}' de la caché de geocodificación: {e}")
+                return False, None
+            if fila is None:
+                return False, None
+            lat, lon, expira = fila
+            entrada = ((lat, lon) if lat is not None else None, expira)
+            self._memoria[clave] = entrada
+
+        coordenadas, expira = entrada
+        if expira <= ahora:
+            self._memoria.pop(clave, None)
+            return False, None
+        return True, coordenadas
+
+    def guardar(self, direccion: str, coordenadas: Optional[Tuple[float, float]],
+                proveedor: str = PROVEEDOR_NOMINATIM) -> None:
+        """
+        Guarda el resultado de geocodificar una dirección.
+
+        Parameters
+        ----------
+        direccion : str
+            Dirección consultada.
+        coordenadas : Optional[Tuple[float, float]]
+            Coordenadas encontradas, o None para guardar una entrada negativa.
+        proveedor : str, optional
+            Nombre del proveedor que dio el resultado, por defecto PROVEEDOR_NOMINATIM.
+        """
+        clave = clave_consulta(direccion, proveedor)
+        ttl = self.ttl_positivo if coordenadas is not None else self.ttl_negativo
+        expira = time.time() + ttl
+        lat, lon = coordenadas if coordenadas is not None else (None, None)
+
+        self._memoria[clave] = (coordenadas, expira)
+        try:
+            with self._bloqueo:
+                conexion = self._conectar()
+                conexion.execute(
+                    "INSERT OR REPLACE INTO geocodificaciones (consulta, lat, lon, expira) VALUES (?, ?, ?, ?)",
+                    (clave, lat, lon, expira)
+                )
+                conexion.commit()
+        except sqlite3.Error as e:
+            print(f"Error al guardar '{direccion}' en la caché de geocodificación: {e}")
+
+    def eliminar_caducadas(self) -> int:
+        """
+        Borra de la base de datos las entradas caducadas.
+
+        Returns
+        -------
+        int
+            Número de entradas eliminadas.
+        """
+        ahora = time.time()
+        self._memoria = {c: e for c, e in self._memoria.items() if e[1] > ahora}
+        with self._bloqueo:
+            conexion = self._conectar()
+            cursor = conexion.execute("DELETE FROM geocodificaciones WHERE expira <= ?", (ahora,))
+            conexion.commit()
+        return cursor.rowcount
+
+    def _conectar(self) -> sqlite3.Connection:
+        # Una única conexión compartida por los hilos del proceso, protegida por el bloqueo
+        if self._conexion is None:
+            self._conexion = sqlite3.connect(self.ruta_archivo, check_same_thread=False)
+            self._conexion.execute('''
+                CREATE TABLE IF NOT EXISTS geocodificaciones (
+                    consulta TEXT PRIMARY KEY,
+                    lat REAL,
+                    lon REAL,
+                    expira REAL NOT NULL
+                )
+            ''')
+            self._conexion.commit()
+        return self._conexion
+
+
+# Caché compartida por todos los geocodificadores del proceso
+cache_geocodificacion = CacheGeocodificacion()
@@ -0,0 +1,107 @@
+"""
+Módulo con un escritor de GPX por flujo para rutas de cualquier longitud.
+
+En lugar de construir el árbol completo de objetos de gpxpy (un objeto por
+punto) y serializarlo de una vez con to_xml(), el documento se genera por
+fragmentos de texto a medida que se recorren los tramos, y se escribe
+directamente en el archivo o en la respuesta HTTP. La memoria usada por el
+escritor no depende del número de puntos de la ruta.
+
+El documento tiene la misma estructura que el que generaba gpxpy: un track
+"Ruta N" con un único segmento por cada tramo.
+
+"""
+
+from typing import Iterable, Iterator, Sequence, TextIO, Tuple
+
+# Puntos que se agrupan en cada fragmento de texto generado
+PUNTOS_POR_FRAGMENTO = 1000
+
+# Decimales de las coordenadas (7 decimales son ~1 cm, la precisión de OSM) y de la elevación
+DECIMALES_COORDENADAS = 7
+DECIMALES_ELEVACION = 2
+
+CABECERA_GPX = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<gpx xmlns="http://www.topografix.com/GPX/1/1" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://www.topografix.com/GPX/1/1 http://www.topografix.com/GPX/1/1/gpx.xsd" '
+    'version="1.1" creator="planificador de rutas de Alicante">\n'
+)
+
+PIE_GPX = "</gpx>\n"
+
+
+def _numero(valor: float, decimales: int) -> str:
+    # Sin ceros finales, como gpxpy: 38.3485858, -0.486, 0
+    texto = f"{float(valor):.{decimales}f}".rstrip("0").rstrip(".")
+    return "0" if texto in ("", "-0") else texto
+
+
+def _filas(tramo: Iterable[Sequence[float]], tamano_bloque: int) -> Iterator[Sequence[float]]:
+    # Los arrays de numpy (n, 3) se convierten a listas por bloques, sin copiar el tramo entero
+    if not hasattr(tramo, "tolist"):
+        yield from tramo
+        return
+    for inicio in range(0, len(tramo), tamano_bloque):
+        yield from tramo[inicio:inicio + tamano_bloque].tolist()
+
+
+def fragmentos_gpx(tramos: Iterable[Iterable[Sequence[float]]],
+                   puntos_por_fragmento: int = PUNTOS_POR_FRAGMENTO) -> Iterator[str]:
+    """
+    Genera el documento GPX de una ruta por fragmentos de texto.
+
+    Parameters
+    ----------
+    tramos : Iterable[Iterable[Sequence[float]]]
+        Puntos (latitud, longitud, elevación) del camino de cada tramo, como
+        arrays (n, 3) o secuencias; se recorren una sola vez, por lo que pueden
+        ser generadores.
+    puntos_por_fragmento : int, optional
+        Puntos agrupados en cada fragmento, por defecto PUNTOS_POR_FRAGMENTO.
+
+    Yields
+    ------
+    str
+        Fragmentos consecutivos del documento.
+    """
+    yield CABECERA_GPX
+    for i, tramo in enumerate(tramos):
+        yield f"  <trk>\n    <name>Ruta {i + 1}</name>\n    <trkseg>\n"
+        lineas = []
+        for lat, lon, elevacion in _filas(tramo, puntos_por_fragmento):
+            lineas.append(
+                f'      <trkpt lat="{_numero(lat, DECIMALES_COORDENADAS)}" lon="{_numero(lon, DECIMALES_COORDENADAS)}">\n'
+                f"        <ele>{_numero(elevacion, DECIMALES_ELEVACION)}</ele>\n"
+                f"      </trkpt>\n"
+            )
+            if len(lineas) >= puntos_por_fragmento:
+                yield "".join(lineas)
+                lineas = []
+        if lineas:
+            yield "".join(lineas)
+        yield "    </trkseg>\n  </trk>\n"
+    yield PIE_GPX
+
+
+def escribir_gpx(tramos: Iterable[Iterable[Sequence[float]]], salida: TextIO) -> int:
+    """
+    Escribe el documento GPX de una ruta en un archivo abierto o flujo de texto.
+
+    Parameters
+    ----------
+    tramos : Iterable[Iterable[Sequence[float]]]
+        Puntos (latitud, longitud, elevación) del camino de cada tramo.
+    salida : TextIO
+        Destino del documento, p. ej. un archivo abierto en modo texto.
+
+    Returns
+    -------
+    int
+        Número de caracteres escritos.
+    """
+    escritos = 0
+    for fragmento in fragmentos_gpx(tramos):
+        escritos += salida.write(fragmento)
+    return escritos
@@ -0,0 +1,182 @@
+"""
+Módulo con el planificador de exportación de las rutas.
+
+Los archivos de una ruta (GPX, mapa HTML y PDF) se generan bajo demanda a
+partir de su geometría guardada (ver artefactos.py), en un grupo de hilos
+acotado y compartido por todo el proceso, de modo que una petición de varios
+formatos espera al exportador más lento y no a la suma de todos.
+
+Cada archivo se genera una sola vez por contenido: si ya está en la caché de
+artefactos se devuelve directamente, y si otra petición lo está generando se
+espera a ese mismo resultado en lugar de lanzar otro. Las peticiones de
+archivos de /static pasan por aquí (ver artefacto_bajo_demanda()).
+
+Se usan hilos y no procesos porque los exportadores trabajan sobre la
+geometría ya cargada en memoria, que no conviene serializar.
+
+"""
+
+import os
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+import artefactos
+from artefactos import (RENDERIZADORES, CacheArtefactos, GeometriaRuta, cache_artefactos,
+                        interpretar_archivo_publico)
+
+# Formatos de archivo que se pueden generar para cada ruta
+FORMATOS_EXPORTACION: Tuple[str, ...] = ("gpx", "html", "pdf")
+
+# Número máximo de exportadores en ejecución a la vez en todo el proceso
+MAX_HILOS_EXPORTACION = 4
+
+
+class PlanificadorExportacion:
+    """
+    Genera en paralelo los archivos de las rutas, cada uno una sola vez por contenido.
+
+    Attributes
+    ----------
+    max_hilos : int
+        Número máximo de exportadores en ejecución a la vez.
+    cache : CacheArtefactos
+        Caché en la que se guardan los archivos generados.
+
+    Methods
+    -------
+    exportar(geometria, formatos)
+        Devuelve los archivos pedidos de una ruta, generando los que falten.
+    """
+
+    def __init__(self, max_hilos: int = MAX_HILOS_EXPORTACION, cache: Optional[CacheArtefactos] = None) -> None:
+        """
+        Inicializa el planificador; el grupo de hilos se crea con la primera exportación.
+
+        Parameters
+        ----------
+        max_hilos : int, optional
+            Exportadores en ejecución a la vez como máximo, por defecto MAX_HILOS_EXPORTACION.
+        cache : CacheArtefactos, optional
+            Caché de archivos, por defecto la compartida por el proceso.
+        """
+        self.max_hilos: int = max_hilos
+        self.cache: CacheArtefactos = cache if cache is not None else cache_artefactos
+        self._ejecutor: Optional[ThreadPoolExecutor] = None
+        self._en_curso: Dict[Tuple[str, str], Future] = {}
+        self._bloqueo: threading.Lock = threading.Lock()
+
+    def exportar(self, geometria: GeometriaRuta, formatos: Iterable[str] = FORMATOS_EXPORTACION) -> Dict[str, str]:
+        """
+        Devuelve los archivos pedidos de una ruta, generando los que falten.
+
+        Los archivos ya presentes en la caché no se vuelven a generar, y los que
+        se están generando desde otro hilo se esperan. Cada exportador se
+        ejecuta con una copia del contexto actual, por lo que sus tiempos quedan
+        en la traza de la petición.
+
+        Parameters
+        ----------
+        geometria : GeometriaRuta
+            Geometría de la ruta.
+        formatos : Iterable[str], optional
+            Formatos pedidos, por defecto FORMATOS_EXPORTACION.
+
+        Returns
+        -------
+        Dict[str, str]
+            Ruta en la caché del archivo de cada formato pedido.
+
+        Raises
+        ------
+        ValueError
+            Si algún formato no es válido.
+        RuntimeError
+            Si falla algún exportador.
+        """
+        formatos = list(formatos)
+        desconocidos = [f for f in formatos if f not in RENDERIZADORES]
+        if desconocidos:
+            raise ValueError(f"Formatos de exportación no válidos: {', '.join(desconocidos)}")
+
+        huella = geometria.huella()
+        futuros: Dict[str, Future] = {}
+        nuevos: Dict[Tuple[str, str], Future] = {}
+        with self._bloqueo:
+            if self._ejecutor is None:
+                self._ejecutor = ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix="exportacion")
+            for formato in formatos:
+                clave = (huella, formato)
+                if clave not in self._en_curso:
+                    contexto = contextvars.copy_context()
+                    self._en_curso[clave] = self._ejecutor.submit(contexto.run, self.cache.obtener, geometria, formato)
+                    nuevos[clave] = self._en_curso[clave]
+                futuros[formato] = self._en_curso[clave]
+        # Fuera del bloqueo: si el futuro ya ha terminado, la función se llama en este mismo hilo
+        for clave, futuro in nuevos.items():
+            futuro.add_done_callback(lambda f, clave=clave: self._terminar(clave, f))
+
+        archivos: Dict[str, str] = {}
+        errores = []
+        for formato, futuro in futuros.items():
+            try:
+                archivos[formato] = futuro.result()
+            except Exception as e:
+                errores.append(f"{formato}: {e}")
+        if errores:
+            raise RuntimeError(f"Error al exportar archivos: {'; '.join(errores)}")
+        return archivos
+
+    def _terminar(self, clave: Tuple[str, str], futuro: Future) -> None:
+        # Una vez terminado, el archivo (si se generó) ya está en la caché
+        with self._bloqueo:
+            if self._en_curso.get(clave) is futuro:
+                del self._en_curso[clave]
+
+
+# Planificador compartido por todas las rutas del proceso
+planificador_exportacion = PlanificadorExportacion()
+
+
+def artefacto_bajo_demanda(nombre_archivo: str,
+                           planificador: Optional[PlanificadorExportacion] = None) -> Optional[str]:
+    """
+    Devuelve el archivo público pedido de una ruta, generándolo si aún no existe.
+
+    Si el archivo ya está en la caché solo se lee la huella guardada de la
+    ruta; la geometría se carga únicamente cuando hay que generarlo, y entonces
+    se genera a través del planificador, que comparte la generación con las
+    peticiones simultáneas del mismo archivo.
+
+    Parameters
+    ----------
+    nombre_archivo : str
+        Nombre pedido dentro de /static, p. ej. 'Ruta_1.pdf' o 'rutas_Ruta_1.lite.gpx'.
+    planificador : PlanificadorExportacion, optional
+        Planificador usado, por defecto el compartido por el proceso.
+
+    Returns
+    -------
+    Optional[str]
+        Ruta del archivo en la caché, o None si no corresponde a ninguna ruta guardada.
+
+    Raises
+    ------
+    RuntimeError
+        Si falla la generación del archivo.
+    """
+    interpretado = interpretar_archivo_publico(nombre_archivo)
+    if interpretado is None:
+        return None
+    nombre, formato = interpretado
+    planificador = planificador if planificador is not None else planificador_exportacion
+
+    huella = GeometriaRuta.leer_huella(nombre, artefactos.DIRECTORIO_GEOMETRIAS)
+    if huella is not None:
+        ruta_archivo = planificador.cache.ruta_por_huella(huella, formato)
+        if os.path.exists(ruta_archivo):
+            return ruta_archivo
+    geometria = GeometriaRuta.cargar(nombre, artefactos.DIRECTORIO_GEOMETRIAS)
+    if geometria is None:
+        return None
+    return planificador.exportar(geometria, [formato])[formato]
@@ -2,30 +2,90 @@
 Clase para manejar la geocodificación de direcciones usando Nominatim de OpenStreetMap.
 
 Esta clase permite convertir direcciones en coordenadas geográficas
-específicamente para la ciudad de Alicante, España.
+específicamente para la ciudad de Alicante, España. Los resultados se guardan
+en una caché persistente (ver cache_geocodificacion.py), de modo que solo se
+consulta a Nominatim la primera vez que aparece cada dirección. Antes que a
+Nominatim se consulta el nomenclátor local de Alicante (ver nomenclator.py),
+que resuelve sin conexión las calles y lugares conocidos y también permite
+obtener el nombre de la calle o lugar más cercano a unas coordenadas
+(geocodificación inversa) sin ninguna petición de red. Las consultas
+a Nominatim pasan por un limitador de tasa compartido por todo el proceso
+(ver limitador.py) que respeta su cuota de una petición por segundo.
+
+Además del cliente síncrono de geopy, las consultas por lotes pueden hacerse
+con su cliente asíncrono (adaptador de aiohttp), que mantiene muchas
+consultas en curso desde un único hilo compartiendo el mismo limitador.
+
+El servicio consultado es intercambiable (ver proveedores_geocodificacion.py):
+Nominatim por defecto, el nomenclátor local o un servidor local de pruebas.
 
 
 """
 
-import time
-from typing import Optional, Tuple
-from geopy.geocoders import Nominatim
-from geopy.location import Location
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from cache_geocodificacion import CacheGeocodificacion, cache_geocodificacion, clave_consulta
+from limitador import LimitadorTasa
+from nomenclator import Nomenclator, obtener_nomenclator
+from proveedores_geocodificacion import (ProveedorGeocodificacionInterface, ProveedorNominatim,
+                                         obtener_proveedor_por_defecto)
+
+# Número máximo de consultas a Nominatim en curso a la vez en una geocodificación por lotes
+MAX_HILOS_LOTE = 4
+
+# Número máximo de consultas asíncronas a Nominatim en curso a la vez
+MAX_CONSULTAS_ASINCRONAS = 16
+
+# Límites de la ciudad de Alicante: (latitud mínima, latitud máxima, longitud mínima, longitud máxima)
+LIMITES_ALICANTE: Tuple[float, float, float, float] = (38.22, 38.40, -0.51, -0.43)
+
+def dentro_de_alicante(punto: Tuple[float, float]) -> bool:
+    """
+    Comprueba si unas coordenadas están dentro de los límites de Alicante.
+
+    Parameters
+    ----------
+    punto : Tuple[float, float]
+        Coordenadas (latitud, longitud)
+
+    Returns
+    -------
+    bool
+        True si el punto está dentro de LIMITES_ALICANTE
+    """
+    lat_min, lat_max, lon_min, lon_max = LIMITES_ALICANTE
+    return lat_min <= punto[0] <= lat_max and lon_min <= punto[1] <= lon_max
 
 class Geocodificador:
     """
     Convierte direcciones en coordenadas geográficas.
 
-    Esta clase utiliza el servicio Nominatim de OpenStreetMap para
-    convertir direcciones en coordenadas (latitud, longitud).
+    Esta clase utiliza un proveedor de geocodificación (por defecto el
+    servicio Nominatim de OpenStreetMap) para convertir direcciones en
+    coordenadas (latitud, longitud).
 
     Attributes
     ----------
-    geolocator : Nominatim
-        Instancia del geocodificador Nominatim configurada
+    proveedor : ProveedorGeocodificacionInterface
+        Proveedor consultado para las direcciones que no se resuelven localmente
+    cache : CacheGeocodificacion
+        Caché de resultados consultada antes de Nominatim
+    limitador : LimitadorTasa or None
+        Limitador de tasa aplicado a las consultas al proveedor
+    nomenclator : Nomenclator or None
+        Nomenclátor local consultado antes de Nominatim; si es None se usa el
+        de Alicante compartido por el proceso, en cuanto exista
+    asincrono : bool
+        Si es True, las consultas por lotes usan el cliente asíncrono
     """
 
-    def __init__(self, user_agent: str = "PII_UA", timeout: int = 10) -> None:
+    def __init__(self, user_agent: str = "PII_UA", timeout: int = 10,
+                 cache: Optional[CacheGeocodificacion] = None,
+                 limitador: Optional[LimitadorTasa] = None,
+                 nomenclator: Optional[Nomenclator] = None,
+                 asincrono: bool = False,
+                 proveedor: Optional[ProveedorGeocodificacionInterface] = None) -> None:
         """
         Inicializa el geocodificador.
 
@@ -35,13 +95,34 @@ class Geocodificador:
             Nombre para las peticiones a Nominatim, por defecto "PII_UA"
         timeout : int, optional
             Tiempo máximo de espera en segundos, por defecto 10
+        cache : CacheGeocodificacion, optional
+            Caché de resultados, por defecto la compartida por todo el proceso
+        limitador : LimitadorTasa, optional
+            Limitador de tasa, por defecto el que exige el proveedor
+        nomenclator : Nomenclator, optional
+            Nomenclátor local, por defecto el de Alicante compartido por todo el proceso
+        asincrono : bool, optional
+            Si es True, obtener_coordenadas_lote() usa el cliente asíncrono, por defecto False
+        proveedor : ProveedorGeocodificacionInterface, optional
+            Proveedor de geocodificación, por defecto el establecido para todo el
+            proceso o, si no hay ninguno, Nominatim
         """
-        self.geolocator: Nominatim = Nominatim(user_agent=user_agent, timeout=timeout)
+        if proveedor is None:
+            proveedor = obtener_proveedor_por_defecto() or ProveedorNominatim(user_agent=user_agent, timeout=timeout)
+        self.proveedor: ProveedorGeocodificacionInterface = proveedor
+        self.asincrono: bool = asincrono
+        self.cache: CacheGeocodificacion = cache if cache is not None else cache_geocodificacion
+        self.limitador: Optional[LimitadorTasa] = limitador if limitador is not None else proveedor.limitador
+        self.nomenclator: Optional[Nomenclator] = nomenclator
 
     def obtener_coordenadas(self, direccion: str) -> Optional[Tuple[float, float]]:
         """
         Obtiene las coordenadas de una dirección en Alicante.
 
+        Si la dirección está en el nomenclátor local o en la caché (también
+        como no encontrada) se devuelve directamente, sin consultar al
+        proveedor ni esperar.
+
         Parameters
         ----------
         direccion : str
@@ -57,19 +138,183 @@ class Geocodificador:
         Exception
             Si hay un error en la geocodificación
         """
-        query: str = f"{direccion}, Alicante, Spain"
+        encontrada, coordenadas = self._buscar_local(direccion)
+        if encontrada:
+            return coordenadas
+
         try:
-            ubicacion: Optional[Location] = self.geolocator.geocode(query)
-            time.sleep(1)  # Evita bloqueos por exceso de peticiones
+            if self.limitador is not None:
+                self.limitador.esperar()  # Solo espera si se superaría la cuota del servicio
+            return self._guardar_resultado(direccion, self.proveedor.geocodificar(direccion))
+
+        except Exception as e:
+            print(f"Error en la geocodificación de '{direccion}': {e}")
+
+        return None
 
-            if ubicacion:
-                lat: float = ubicacion.latitude
-                lon: float = ubicacion.longitude
+    async def obtener_coordenadas_async(self, direccion: str,
+                                        cliente: Optional[Any] = None) -> Optional[Tuple[float, float]]:
+        """
+        Obtiene las coordenadas de una dirección sin bloquear el bucle de eventos.
+
+        Equivale a obtener_coordenadas(), pero la espera del limitador y la
+        petición al proveedor se hacen de forma asíncrona.
+
+        Parameters
+        ----------
+        direccion : str
+            Dirección a geocodificar
+        cliente : Any, optional
+            Cliente asíncrono del proveedor ya abierto; si no se indica se abre
+            uno para esta consulta
+
+        Returns
+        -------
+        Optional[Tuple[float, float]]
+            Tupla (latitud, longitud) o None si no se encuentra
+        """
+        encontrada, coordenadas = self._buscar_local(direccion)
+        if encontrada:
+            return coordenadas
+        if cliente is None:
+            async with self.proveedor.cliente_async() as cliente:
+                return await self.obtener_coordenadas_async(direccion, cliente)
 
-                if 38.22 <= lat <= 38.40 and -0.51 <= lon <= -0.43:
-                    return (lat, lon)
+        try:
+            if self.limitador is not None:
+                await self.limitador.esperar_async()  # Solo espera si se superaría la cuota del servicio
+            return self._guardar_resultado(direccion, await self.proveedor.geocodificar_async(direccion, cliente))
 
         except Exception as e:
             print(f"Error en la geocodificación de '{direccion}': {e}")
 
         return None
+
+    def obtener_coordenadas_lote(self, direcciones: List[str],
+                                 max_hilos: int = MAX_HILOS_LOTE) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Obtiene las coordenadas de varias direcciones con el menor número de consultas.
+
+        Las direcciones repetidas (con la misma clave de caché) se geocodifican
+        una sola vez, las que están en el nomenclátor o en la caché se sirven
+        de ellos y el resto se resuelven en paralelo, siempre dentro del límite
+        de tasa de Nominatim. Si el geocodificador es asíncrono, las consultas
+        se hacen con obtener_coordenadas_lote_async().
+
+        Parameters
+        ----------
+        direcciones : List[str]
+            Direcciones a geocodificar
+        max_hilos : int, optional
+            Consultas simultáneas como máximo, por defecto MAX_HILOS_LOTE
+
+        Returns
+        -------
+        Dict[str, Optional[Tuple[float, float]]]
+            Coordenadas (latitud, longitud) de cada dirección, o None si no se encuentra
+        """
+        if self.asincrono:
+            return asyncio.run(self.obtener_coordenadas_lote_async(direcciones))
+
+        resultados, pendientes = self._separar_pendientes(direcciones)
+        if pendientes:
+            with ThreadPoolExecutor(max_workers=min(max_hilos, len(pendientes))) as ejecutor:
+                coordenadas = ejecutor.map(self.obtener_coordenadas, [d for _, d in pendientes])
+                for (clave, _), resultado in zip(pendientes, coordenadas):
+                    resultados[clave] = resultado
+
+        return {direccion: resultados[clave_consulta(direccion)] for direccion in direcciones}
+
+    async def obtener_coordenadas_lote_async(self, direcciones: List[str],
+                                             max_en_curso: int = MAX_CONSULTAS_ASINCRONAS
+                                             ) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Obtiene las coordenadas de varias direcciones con consultas asíncronas.
+
+        Aplica la misma deduplicación y las mismas búsquedas locales que
+        obtener_coordenadas_lote(), pero resuelve el resto desde un solo hilo
+        con un cliente asíncrono compartido por todas las consultas.
+
+        Parameters
+        ----------
+        direcciones : List[str]
+            Direcciones a geocodificar
+        max_en_curso : int, optional
+            Consultas en curso como máximo, por defecto MAX_CONSULTAS_ASINCRONAS
+
+        Returns
+        -------
+        Dict[str, Optional[Tuple[float, float]]]
+            Coordenadas (latitud, longitud) de cada dirección, o None si no se encuentra
+        """
+        resultados, pendientes = self._separar_pendientes(direcciones)
+        if pendientes:
+            semaforo = asyncio.Semaphore(max_en_curso)
+
+            async def consultar(direccion: str, cliente: Any) -> Optional[Tuple[float, float]]:
+                async with semaforo:
+                    return await self.obtener_coordenadas_async(direccion, cliente)
+
+            async with self.proveedor.cliente_async() as cliente:
+                coordenadas = await asyncio.gather(*(consultar(d, cliente) for _, d in pendientes))
+            for (clave, _), resultado in zip(pendientes, coordenadas):
+                resultados[clave] = resultado
+
+        return {direccion: resultados[clave_consulta(direccion)] for direccion in direcciones}
+
+    def obtener_nombres(self, puntos: List[Tuple[float, float]]) -> List[Optional[str]]:
+        """
+        Obtiene el nombre de la calle o lugar más cercano a cada punto.
+
+        La búsqueda inversa se hace únicamente sobre el nomenclátor local, con
+        una sola consulta a su índice espacial, sin llamar a Nominatim.
+
+        Parameters
+        ----------
+        puntos : List[Tuple[float, float]]
+            Coordenadas (latitud, longitud) de los puntos
+
+        Returns
+        -------
+        List[Optional[str]]
+            Nombre más cercano a cada punto, o None si no hay nomenclátor o
+            ningún nombre está lo bastante cerca
+        """
+        nomenclator = self.nomenclator if self.nomenclator is not None else obtener_nomenclator()
+        if nomenclator is None:
+            return [None] * len(puntos)
+        return nomenclator.nombres_mas_cercanos(puntos)
+
+    def _separar_pendientes(self, direcciones: List[str]
+                            ) -> Tuple[Dict[str, Optional[Tuple[float, float]]], List[Tuple[str, str]]]:
+        # Resultados locales por clave y direcciones únicas que hay que consultar a Nominatim
+        unicas: Dict[str, str] = {}
+        for direccion in direcciones:
+            unicas.setdefault(clave_consulta(direccion), direccion)
+
+        resultados: Dict[str, Optional[Tuple[float, float]]] = {}
+        pendientes: List[Tuple[str, str]] = []
+        for clave, direccion in unicas.items():
+            encontrada, coordenadas = self._buscar_local(direccion)
+            if encontrada:
+                resultados[clave] = coordenadas
+            else:
+                pendientes.append((clave, direccion))
+        return resultados, pendientes
+
+    def _guardar_resultado(self, direccion: str,
+                           resultado: Optional[Tuple[float, float]]) -> Optional[Tuple[float, float]]:
+        coordenadas = resultado if resultado is not None and dentro_de_alicante(resultado) else None
+
+        # Los errores de red no se guardan; las direcciones no encontradas sí, como entradas negativas
+        self.cache.guardar(direccion, coordenadas, self.proveedor.nombre)
+        return coordenadas
+
+    def _buscar_local(self, direccion: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        # Nomenclátor primero, para que una entrada negativa antigua de la caché no lo oculte
+        nomenclator = self.nomenclator if self.nomenclator is not None else obtener_nomenclator()
+        if nomenclator is not None:
+            coordenadas = nomenclator.buscar(direccion)
+            if coordenadas is not None and dentro_de_alicante(coordenadas):
+                return True, coordenadas
+        return self.cache.obtener(direccion, self.proveedor.nombre)
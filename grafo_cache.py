@@ -0,0 +1,334 @@
+"""
+Módulo para la gestión de grafos de calles en caché.
+
+Este módulo mantiene un almacén de grafos de OSMnx compartido por todas las
+rutas del proceso. Cada grafo se identifica por el modo de transporte y la
+tesela geográfica que cubre, se descarga una única vez y se serializa en disco,
+de modo que los siguientes arranques solo necesitan deserializarlo.
+
+Los grafos se guardan en memoria y en disco en su forma compacta (ver
+grafo_compacto.py); el grafo de OSMnx solo existe durante la descarga. Los
+archivos se abren con mmap, de modo que varios workers del servidor comparten
+una única copia en memoria. Para generarlos antes de arrancar los workers:
+
+    python grafo_cache.py
+
+Si además existe una jerarquía de contracción para un grafo (ver
+jerarquia_contraccion.py), las rutas la usan para resolver sus tramos.
+
+Las rutas contenidas en los límites de Alicante usan un único grafo de toda la
+ciudad por modo de transporte, que el servidor precarga al arrancar. Al
+descargar el grafo de la ciudad se guarda también el nomenclátor con los
+nombres de sus calles (ver nomenclator.py). Los grafos compactos no guardan
+esos nombres, así que si el grafo ya estaba en caché sin nomenclátor,
+'python grafo_cache.py' lo genera.
+
+"""
+
+import os
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import osmnx as ox
+import networkx as nx
+from shapely.geometry import box
+from grafo_compacto import GrafoCompacto
+from jerarquia_contraccion import JerarquiaContraccion
+from nomenclator import Nomenclator
+from geocodificador import LIMITES_ALICANTE, dentro_de_alicante
+
+# Directorio donde se guardan los grafos serializados
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_grafos")
+
+# Tamaño de la tesela en grados y radio mínimo (en metros) cubierto alrededor de cualquier punto
+TAMANO_TESELA = 0.02
+RADIO_MINIMO = 5000
+
+# Tesela especial que cubre toda la ciudad y margen (en grados) añadido a sus límites
+TESELA_ALICANTE = "alicante"
+MARGEN_ALICANTE = 0.01
+
+MODOS_TRANSPORTE = ("walk", "bike", "drive")
+
+
+class AlmacenGrafos:
+    """
+    Almacén de grafos de calles indexado por (modo de transporte, tesela).
+
+    Los grafos se buscan primero en memoria, después en disco y, solo si no
+    existen, se descargan de OpenStreetMap y se guardan para usos posteriores.
+
+    Attributes
+    ----------
+    directorio : str
+        Directorio donde se serializan los grafos.
+    grafos : Dict[Tuple[str, str], GrafoCompacto]
+        Grafos compactos ya cargados en memoria.
+    jerarquias : Dict[Tuple[str, str], JerarquiaContraccion]
+        Jerarquías de contracción ya cargadas en memoria.
+
+    Methods
+    -------
+    obtener(modo, puntos)
+        Devuelve el grafo que cubre los puntos para el modo indicado.
+    clave(modo, puntos)
+        Calcula la clave (modo, tesela) asociada a un conjunto de puntos.
+    precargar(modos)
+        Carga en memoria el grafo de toda la ciudad para cada modo.
+    obtener_jerarquia(modo, puntos)
+        Devuelve la jerarquía de contracción del grafo de los puntos, si existe.
+    construir_jerarquia(modo, tesela)
+        Precalcula y guarda la jerarquía de contracción de un grafo.
+    construir_nomenclator()
+        Genera el nomenclátor de las calles de Alicante si aún no existe.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_CACHE) -> None:
+        """
+        Inicializa el almacén de grafos.
+
+        Parameters
+        ----------
+        directorio : str, optional
+            Directorio de la caché en disco, por defecto 'cache_grafos'.
+        """
+        self.directorio: str = directorio
+        self.grafos: Dict[Tuple[str, str], GrafoCompacto] = {}
+        self.jerarquias: Dict[Tuple[str, str], JerarquiaContraccion] = {}
+        # Fecha de modificación de los archivos de jerarquía que no corresponden a su grafo
+        self._jerarquias_rechazadas: Dict[Tuple[str, str], int] = {}
+        self._bloqueo: threading.Lock = threading.Lock()
+        self._bloqueos_clave: Dict[Tuple[str, str], threading.Lock] = {}
+
+    @staticmethod
+    def clave(modo: str, puntos: List[Tuple[float, float]]) -> Tuple[str, str]:
+        """
+        Calcula la clave (modo, tesela) de un conjunto de puntos.
+
+        Si todos los puntos están dentro de Alicante se usa el grafo de la
+        ciudad; en otro caso, la tesela que contiene el primer punto.
+
+        Parameters
+        ----------
+        modo : str
+            Modo de transporte ("walk", "bike" o "drive").
+        puntos : List[Tuple[float, float]]
+            Coordenadas (latitud, longitud) de los puntos de la ruta.
+
+        Returns
+        -------
+        Tuple[str, str]
+            Modo de transporte e identificador de la tesela.
+        """
+        if all(dentro_de_alicante(p) for p in puntos):
+            return modo, TESELA_ALICANTE
+        fila = math.floor(puntos[0][0] / TAMANO_TESELA)
+        columna = math.floor(puntos[0][1] / TAMANO_TESELA)
+        return modo, f"{fila}_{columna}"
+
+    def obtener(self, modo: str, puntos: List[Tuple[float, float]]) -> GrafoCompacto:
+        """
+        Devuelve el grafo que cubre los puntos para el modo de transporte indicado.
+
+        Parameters
+        ----------
+        modo : str
+            Modo de transporte ("walk", "bike" o "drive").
+        puntos : List[Tuple[float, float]]
+            Coordenadas (latitud, longitud) de los puntos de la ruta.
+
+        Returns
+        -------
+        GrafoCompacto
+            Grafo de toda la ciudad, o de una tesela que cubre al menos
+            RADIO_MINIMO metros alrededor del primer punto.
+        """
+        return self._obtener_por_clave(self.clave(modo, puntos))
+
+    def precargar(self, modos: Iterable[str] = MODOS_TRANSPORTE) -> None:
+        """
+        Carga en memoria el grafo de toda la ciudad para cada modo de transporte.
+
+        Parameters
+        ----------
+        modos : Iterable[str], optional
+            Modos de transporte a precargar, por defecto walk, bike y drive.
+        """
+        for modo in modos:
+            self._obtener_por_clave((modo, TESELA_ALICANTE))
+        if not os.path.exists(self._ruta_archivo(("nomenclator", TESELA_ALICANTE), "json")):
+            print("⚠️ No hay nomenclátor de calles: genéralo con 'python grafo_cache.py'")
+
+    def obtener_jerarquia(self, modo: str, puntos: List[Tuple[float, float]]) -> Optional[JerarquiaContraccion]:
+        """
+        Devuelve la jerarquía de contracción del grafo que cubre los puntos.
+
+        Parameters
+        ----------
+        modo : str
+            Modo de transporte ("walk", "bike" o "drive").
+        puntos : List[Tuple[float, float]]
+            Coordenadas (latitud, longitud) de los puntos de la ruta.
+
+        Returns
+        -------
+        Optional[JerarquiaContraccion]
+            Jerarquía del grafo, o None si no se ha precalculado o el archivo
+            guardado no corresponde al grafo actual.
+        """
+        clave = self.clave(modo, puntos)
+        jerarquia = self.jerarquias.get(clave)
+        if jerarquia is not None:
+            return jerarquia
+
+        ruta_archivo = self._ruta_archivo(clave, "ch")
+        try:
+            modificacion = os.stat(ruta_archivo).st_mtime_ns
+        except OSError:
+            return None
+        # Un archivo ya rechazado no se vuelve a abrir hasta que cambie (p. ej. al reconstruirlo)
+        if self._jerarquias_rechazadas.get(clave) == modificacion:
+            return None
+        try:
+            jerarquia = JerarquiaContraccion.cargar(ruta_archivo, self._obtener_por_clave(clave))
+        except Exception as e:
+            print(f"Error al cargar la jerarquía '{ruta_archivo}': {e}")
+            self._jerarquias_rechazadas[clave] = modificacion
+            return None
+        self.jerarquias[clave] = jerarquia
+        return jerarquia
+
+    def construir_jerarquia(self, modo: str, tesela: str = TESELA_ALICANTE) -> JerarquiaContraccion:
+        """
+        Precalcula y guarda la jerarquía de contracción de un grafo.
+
+        Parameters
+        ----------
+        modo : str
+            Modo de transporte ("walk", "bike" o "drive").
+        tesela : str, optional
+            Tesela del grafo, por defecto toda la ciudad de Alicante.
+
+        Returns
+        -------
+        JerarquiaContraccion
+            Jerarquía construida, que queda también en memoria.
+        """
+        clave = (modo, tesela)
+        jerarquia = JerarquiaContraccion.construir(self._obtener_por_clave(clave))
+
+        ruta_archivo = self._ruta_archivo(clave, "ch")
+        temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+        jerarquia.guardar(temporal)
+        os.replace(temporal, ruta_archivo)
+        self.jerarquias[clave] = jerarquia
+        return jerarquia
+
+    def construir_nomenclator(self) -> Optional[str]:
+        """
+        Genera el nomenclátor de las calles de Alicante si aún no existe.
+
+        Normalmente se genera al descargar el grafo de la ciudad. Si el grafo
+        ya estaba en caché, como el grafo compacto no guarda los nombres de las
+        calles, se vuelven a descargar las calles de la ciudad una sola vez.
+
+        Returns
+        -------
+        Optional[str]
+            Ruta del archivo del nomenclátor, o None si no se ha podido generar.
+        """
+        ruta_archivo = self._ruta_archivo(("nomenclator", TESELA_ALICANTE), "json")
+        if not os.path.exists(ruta_archivo):
+            if not os.path.exists(self.directorio):
+                os.makedirs(self.directorio)
+            self._guardar_nomenclator(self._descargar(("walk", TESELA_ALICANTE)))
+        return ruta_archivo if os.path.exists(ruta_archivo) else None
+
+    def _obtener_por_clave(self, clave: Tuple[str, str]) -> GrafoCompacto:
+        grafo = self.grafos.get(clave)
+        if grafo is not None:
+            return grafo
+
+        # Un bloqueo por clave evita descargar dos veces el mismo grafo en paralelo
+        with self._bloqueo:
+            bloqueo_clave = self._bloqueos_clave.setdefault(clave, threading.Lock())
+        with bloqueo_clave:
+            grafo = self.grafos.get(clave)
+            if grafo is None:
+                grafo = self._cargar_de_disco(clave)
+                if grafo is None:
+                    grafo_osm = self._descargar(clave)
+                    grafo = GrafoCompacto.desde_networkx(grafo_osm)
+                    self._guardar_en_disco(clave, grafo)
+                    if clave[1] == TESELA_ALICANTE:
+                        self._guardar_nomenclator(grafo_osm)
+                self.grafos[clave] = grafo
+        return grafo
+
+    def _ruta_archivo(self, clave: Tuple[str, str], extension: str = "grafo") -> str:
+        modo, tesela = clave
+        return os.path.join(self.directorio, f"{modo}_{tesela}.{extension}")
+
+    def _cargar_de_disco(self, clave: Tuple[str, str]):
+        ruta_archivo = self._ruta_archivo(clave)
+        if not os.path.exists(ruta_archivo):
+            return None
+        try:
+            return GrafoCompacto.cargar(ruta_archivo)
+        except Exception as e:
+            print(f"Error al cargar el grafo '{ruta_archivo}': {e}")
+            return None
+
+    def _guardar_en_disco(self, clave: Tuple[str, str], grafo: GrafoCompacto) -> None:
+        if not os.path.exists(self.directorio):
+            os.makedirs(self.directorio)
+        ruta_archivo = self._ruta_archivo(clave)
+        # Escritura atómica para que otro proceso nunca lea un archivo a medias
+        temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+        grafo.guardar(temporal)
+        os.replace(temporal, ruta_archivo)
+
+    def _guardar_nomenclator(self, grafo_osm: nx.MultiDiGraph) -> None:
+        # Solo el primer grafo de la ciudad descargado genera el nomenclátor de sus calles
+        ruta_archivo = self._ruta_archivo(("nomenclator", TESELA_ALICANTE), "json")
+        if os.path.exists(ruta_archivo):
+            return
+        try:
+            temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+            Nomenclator.desde_networkx(grafo_osm).guardar(temporal)
+            os.replace(temporal, ruta_archivo)
+        except Exception as e:
+            print(f"Error al guardar el nomenclátor '{ruta_archivo}': {e}")
+
+    @staticmethod
+    def _descargar(clave: Tuple[str, str]) -> nx.MultiDiGraph:
+        modo, tesela = clave
+        if tesela == TESELA_ALICANTE:
+            lat_min, lat_max, lon_min, lon_max = LIMITES_ALICANTE
+            poligono = box(lon_min - MARGEN_ALICANTE, lat_min - MARGEN_ALICANTE,
+                           lon_max + MARGEN_ALICANTE, lat_max + MARGEN_ALICANTE)
+            return ox.graph_from_polygon(poligono, network_type=modo)
+
+        fila, columna = (int(v) for v in tesela.split("_"))
+        centro_lat = (fila + 0.5) * TAMANO_TESELA
+        centro_lon = (columna + 0.5) * TAMANO_TESELA
+
+        # El radio cubre la semidiagonal de la tesela más RADIO_MINIMO alrededor de cualquier punto
+        alto = TAMANO_TESELA * 111320
+        ancho = alto * math.cos(math.radians(centro_lat))
+        radio = RADIO_MINIMO + math.hypot(alto, ancho) / 2
+
+        return ox.graph_from_point((centro_lat, centro_lon), dist=radio, network_type=modo)
+
+
+# Almacén compartido por todas las rutas del proceso
+almacen_grafos = AlmacenGrafos()
+
+
+if __name__ == "__main__":
+    # Genera (o comprueba) los archivos de los grafos de Alicante y su nomenclátor una sola vez
+    almacen_grafos.precargar()
+    for (modo, tesela), grafo in almacen_grafos.grafos.items():
+        print(f"Grafo {modo}/{tesela}: {len(grafo)} nodos, {len(grafo.destinos)} aristas")
+    archivo_nomenclator = almacen_grafos.construir_nomenclator()
+    print(f"Nomenclátor: {archivo_nomenclator or 'no se ha podido generar'}")
@@ -0,0 +1,672 @@
+"""
+Módulo con la representación compacta de los grafos de calles.
+
+Este módulo convierte los grafos de OSMnx (diccionarios anidados de NetworkX)
+en un grafo compacto basado en arrays de NumPy con formato CSR, y ofrece un
+motor de caminos mínimos que trabaja directamente sobre esos arrays.
+
+Los grafos se guardan en un formato binario propio que se abre con mmap en
+modo de solo lectura: todos los procesos (workers WSGI) que cargan el mismo
+archivo comparten las mismas páginas físicas de memoria.
+
+Formato del archivo
+-------------------
+- 8 bytes: firma FIRMA_ARCHIVO.
+- 4 bytes: longitud L de la cabecera (entero sin signo little-endian).
+- L bytes: cabecera JSON con los metadatos y, para cada array, su tipo,
+  forma y desplazamiento dentro del archivo.
+- Datos de los arrays, cada uno alineado a ALINEACION bytes.
+
+"""
+
+import json
+import hashlib
+import math
+import mmap
+import heapq
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import networkx as nx
+from scipy.spatial import cKDTree
+
+FIRMA_ARCHIVO = b"GRAFOC01"
+ALINEACION = 64
+
+# Radio medio de la Tierra en metros (el mismo que usa OSMnx)
+RADIO_TIERRA = 6371009
+
+
+def distancia_haversine(lat1, lon1, lat2, lon2):
+    """
+    Calcula la distancia ortodrómica en metros entre coordenadas (vectorizada).
+
+    Parameters
+    ----------
+    lat1, lon1, lat2, lon2 : float or np.ndarray
+        Latitudes y longitudes en grados.
+
+    Returns
+    -------
+    float or np.ndarray
+        Distancia en metros.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA * np.arcsin(np.sqrt(a))
+
+
+def escribir_arrays(ruta_archivo: str, arrays: Dict[str, np.ndarray],
+                    metadatos: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Escribe un conjunto de arrays en el formato binario mapeable en memoria.
+
+    Parameters
+    ----------
+    ruta_archivo : str
+        Ruta del archivo de destino.
+    arrays : Dict[str, np.ndarray]
+        Arrays a guardar, identificados por nombre.
+    metadatos : Dict[str, Any], optional
+        Información adicional serializable en JSON.
+    """
+    arrays = {nombre: np.ascontiguousarray(a, dtype=a.dtype.newbyteorder("<")) for nombre, a in arrays.items()}
+
+    # La cabecera depende de los desplazamientos y viceversa: se reserva un tamaño fijo por array
+    descripcion: Dict[str, Any] = {"metadatos": metadatos or {}, "arrays": {}}
+    for nombre, a in arrays.items():
+        descripcion["arrays"][nombre] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": 0}
+    tamano_cabecera = len(json.dumps(descripcion).encode("utf-8")) + 20 * len(arrays)
+
+    posicion = len(FIRMA_ARCHIVO) + 4 + tamano_cabecera
+    for nombre, a in arrays.items():
+        posicion += -posicion % ALINEACION
+        descripcion["arrays"][nombre]["offset"] = posicion
+        posicion += a.nbytes
+
+    cabecera = json.dumps(descripcion).encode("utf-8").ljust(tamano_cabecera)
+    with open(ruta_archivo, "wb") as f:
+        f.write(FIRMA_ARCHIVO)
+        f.write(struct.pack("<I", len(cabecera)))
+        f.write(cabecera)
+        for nombre, a in arrays.items():
+            f.write(b"\0" * (descripcion["arrays"][nombre]["offset"] - f.tell()))
+            f.write(a.tobytes())
+
+
+def leer_arrays(ruta_archivo: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Abre un archivo escrito con escribir_arrays() mapeándolo en memoria.
+
+    Los arrays devueltos son de solo lectura y apuntan directamente a las
+    páginas del archivo, compartidas con cualquier otro proceso que lo abra.
+
+    Parameters
+    ----------
+    ruta_archivo : str
+        Ruta del archivo.
+
+    Returns
+    -------
+    Tuple[Dict[str, np.ndarray], Dict[str, Any]]
+        Arrays por nombre y metadatos guardados.
+
+    Raises
+    ------
+    ValueError
+        Si el archivo no tiene el formato esperado.
+    """
+    with open(ruta_archivo, "rb") as f:
+        memoria = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if memoria[:len(FIRMA_ARCHIVO)] != FIRMA_ARCHIVO:
+        memoria.close()
+        raise ValueError(f"'{ruta_archivo}' no es un archivo de grafo válido")
+    inicio = len(FIRMA_ARCHIVO)
+    (longitud,) = struct.unpack("<I", memoria[inicio:inicio + 4])
+    descripcion = json.loads(memoria[inicio + 4:inicio + 4 + longitud].decode("utf-8"))
+
+    arrays: Dict[str, np.ndarray] = {}
+    for nombre, info in descripcion["arrays"].items():
+        tipo = np.dtype(info["dtype"])
+        cantidad = int(np.prod(info["shape"], dtype=np.int64))
+        arrays[nombre] = np.frombuffer(memoria, dtype=tipo, count=cantidad,
+                                       offset=info["offset"]).reshape(info["shape"])
+    return arrays, descripcion["metadatos"]
+
+
+class GrafoCompacto:
+    """
+    Grafo dirigido de calles almacenado en arrays de NumPy (formato CSR).
+
+    Los nodos se guardan ordenados por su identificador de OpenStreetMap, de
+    forma que el índice interno de un nodo se obtiene con una búsqueda binaria.
+    Las aristas salientes del nodo de índice i son las posiciones
+    desplazamientos[i]:desplazamientos[i + 1] de los arrays destinos y pesos.
+
+    Attributes
+    ----------
+    nodos : np.ndarray
+        Identificadores OSM de los nodos, ordenados de menor a mayor.
+    lat : np.ndarray
+        Latitud de cada nodo.
+    lon : np.ndarray
+        Longitud de cada nodo.
+    elevacion : np.ndarray or None
+        Elevación de cada nodo, si el grafo original la incluía.
+    desplazamientos : np.ndarray
+        Posición de inicio de las aristas de cada nodo (longitud n + 1).
+    destinos : np.ndarray
+        Índice del nodo destino de cada arista.
+    pesos : np.ndarray
+        Longitud de cada arista en metros.
+
+    Methods
+    -------
+    desde_networkx(grafo)
+        Construye el grafo compacto a partir de un grafo de OSMnx.
+    guardar(ruta_archivo)
+        Serializa los arrays del grafo en el formato binario mapeable.
+    cargar(ruta_archivo)
+        Abre con mmap un grafo serializado con guardar().
+    indice(nodo)
+        Devuelve el índice interno de un nodo OSM.
+    indices(nodos)
+        Devuelve los índices internos de varios nodos OSM en una sola búsqueda.
+    coordenadas(nodos)
+        Devuelve las coordenadas (lat, lon) de una lista de nodos.
+    puntos(nodos)
+        Devuelve latitud, longitud y elevación de una lista de nodos en un array.
+    nodo_mas_cercano(lat, lon)
+        Devuelve el nodo OSM más cercano a unas coordenadas.
+    nodos_mas_cercanos(puntos)
+        Ajusta varios puntos a sus nodos más cercanos en una sola consulta.
+    factor_heuristica()
+        Devuelve la escala admisible de la heurística de A* para el grafo.
+    suma_control()
+        Devuelve el SHA-256 de los nodos y las aristas del grafo.
+    camino_mas_corto(origen, destino, algoritmo)
+        Calcula el camino mínimo y su longitud entre dos nodos OSM (A* o Dijkstra).
+    caminos_desde(origen, destinos)
+        Calcula los caminos mínimos desde un nodo a varios con una sola búsqueda.
+    distancias_desde(origen, destinos)
+        Calcula solo las distancias mínimas desde un nodo a varios con una sola búsqueda.
+    """
+
+    def __init__(self, nodos: np.ndarray, lat: np.ndarray, lon: np.ndarray,
+                 desplazamientos: np.ndarray, destinos: np.ndarray, pesos: np.ndarray,
+                 elevacion: Optional[np.ndarray] = None) -> None:
+        """
+        Inicializa el grafo compacto a partir de sus arrays.
+
+        Parameters
+        ----------
+        nodos : np.ndarray
+            Identificadores OSM ordenados.
+        lat : np.ndarray
+            Latitudes de los nodos.
+        lon : np.ndarray
+            Longitudes de los nodos.
+        desplazamientos : np.ndarray
+            Desplazamientos CSR de las aristas de cada nodo.
+        destinos : np.ndarray
+            Índices destino de las aristas.
+        pesos : np.ndarray
+            Longitudes de las aristas en metros.
+        elevacion : np.ndarray, optional
+            Elevación de cada nodo.
+        """
+        self.nodos: np.ndarray = nodos
+        self.lat: np.ndarray = lat
+        self.lon: np.ndarray = lon
+        self.elevacion: Optional[np.ndarray] = elevacion
+        self.desplazamientos: np.ndarray = desplazamientos
+        self.destinos: np.ndarray = destinos
+        self.pesos: np.ndarray = pesos
+
+        # Índice espacial de los nodos (KD-tree), construido en la primera consulta
+        self._arbol: Optional[cKDTree] = None
+        self._escala_lon: float = 1.0
+        self._bloqueo_arbol: threading.Lock = threading.Lock()
+        self._factor_heuristica: Optional[float] = None
+        self._suma_control: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.nodos)
+
+    @classmethod
+    def desde_networkx(cls, grafo: nx.MultiDiGraph) -> "GrafoCompacto":
+        """
+        Construye un grafo compacto a partir de un grafo de OSMnx.
+
+        De las aristas paralelas entre dos nodos solo se conserva la más corta,
+        que es la única que puede formar parte de un camino mínimo.
+
+        Parameters
+        ----------
+        grafo : nx.MultiDiGraph
+            Grafo de calles generado por OSMnx.
+
+        Returns
+        -------
+        GrafoCompacto
+            Grafo equivalente almacenado en arrays.
+        """
+        nodos = np.array(sorted(grafo.nodes), dtype=np.int64)
+        indices: Dict[int, int] = {int(n): i for i, n in enumerate(nodos)}
+
+        lat = np.array([grafo.nodes[n]['y'] for n in nodos], dtype=np.float64)
+        lon = np.array([grafo.nodes[n]['x'] for n in nodos], dtype=np.float64)
+        elevacion = None
+        if any('elevation' in grafo.nodes[n] for n in nodos):
+            elevacion = np.array([grafo.nodes[n].get('elevation', 0) for n in nodos], dtype=np.float32)
+
+        # Longitud mínima por par de nodos (descarta aristas paralelas y bucles)
+        minimos: Dict[Tuple[int, int], float] = {}
+        for u, v, longitud in grafo.edges(data='length', default=0.0):
+            if u == v:
+                continue
+            par = (indices[u], indices[v])
+            if par not in minimos or longitud < minimos[par]:
+                minimos[par] = longitud
+
+        origenes = np.fromiter((u for u, _ in minimos), dtype=np.int64, count=len(minimos))
+        destinos = np.fromiter((v for _, v in minimos), dtype=np.int32, count=len(minimos))
+        pesos = np.fromiter(minimos.values(), dtype=np.float32, count=len(minimos))
+
+        orden = np.argsort(origenes, kind="stable")
+        desplazamientos = np.zeros(len(nodos) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origenes, minlength=len(nodos)), out=desplazamientos[1:])
+
+        return cls(nodos, lat, lon, desplazamientos, destinos[orden], pesos[orden], elevacion)
+
+    def guardar(self, ruta_archivo: str) -> None:
+        """
+        Serializa los arrays del grafo en el formato binario mapeable.
+
+        Parameters
+        ----------
+        ruta_archivo : str
+            Ruta del archivo de destino.
+        """
+        arrays = {
+            "nodos": self.nodos, "lat": self.lat, "lon": self.lon,
+            "desplazamientos": self.desplazamientos, "destinos": self.destinos, "pesos": self.pesos
+        }
+        if self.elevacion is not None:
+            arrays["elevacion"] = self.elevacion
+        escribir_arrays(ruta_archivo, arrays)
+
+    @classmethod
+    def cargar(cls, ruta_archivo: str) -> "GrafoCompacto":
+        """
+        Abre con mmap un grafo serializado con guardar().
+
+        La carga es prácticamente instantánea: los datos se leen del disco (o
+        de la caché de páginas compartida) a medida que se consultan.
+
+        Parameters
+        ----------
+        ruta_archivo : str
+            Ruta del archivo del grafo.
+
+        Returns
+        -------
+        GrafoCompacto
+            Grafo de solo lectura respaldado por el archivo.
+        """
+        datos, _ = leer_arrays(ruta_archivo)
+        return cls(datos["nodos"], datos["lat"], datos["lon"], datos["desplazamientos"],
+                   datos["destinos"], datos["pesos"], datos.get("elevacion"))
+
+    def indice(self, nodo: int) -> int:
+        """
+        Devuelve el índice interno de un nodo OSM.
+
+        Parameters
+        ----------
+        nodo : int
+            Identificador OSM del nodo.
+
+        Returns
+        -------
+        int
+            Posición del nodo en los arrays del grafo.
+
+        Raises
+        ------
+        KeyError
+            Si el nodo no pertenece al grafo.
+        """
+        i = int(np.searchsorted(self.nodos, nodo))
+        if i >= len(self.nodos) or self.nodos[i] != nodo:
+            raise KeyError(f"El nodo {nodo} no pertenece al grafo")
+        return i
+
+    def coordenadas(self, nodos: List[int]) -> List[Tuple[float, float]]:
+        """
+        Devuelve las coordenadas de una lista de nodos OSM.
+
+        Parameters
+        ----------
+        nodos : List[int]
+            Identificadores OSM de los nodos.
+
+        Returns
+        -------
+        List[Tuple[float, float]]
+            Lista de coordenadas (latitud, longitud).
+        """
+        indices = self.indices(nodos)
+        return list(zip(self.lat[indices].tolist(), self.lon[indices].tolist()))
+
+    def indices(self, nodos) -> np.ndarray:
+        """
+        Devuelve los índices internos de varios nodos OSM con una búsqueda binaria vectorizada.
+
+        Parameters
+        ----------
+        nodos : array_like of int
+            Identificadores OSM de los nodos.
+
+        Returns
+        -------
+        np.ndarray
+            Posición de cada nodo en los arrays del grafo.
+
+        Raises
+        ------
+        KeyError
+            Si algún nodo no pertenece al grafo.
+        """
+        nodos = np.asarray(nodos, dtype=np.int64).ravel()
+        indices = np.searchsorted(self.nodos, nodos)
+        validos = indices < len(self.nodos)
+        validos[validos] = self.nodos[indices[validos]] == nodos[validos]
+        if not validos.all():
+            raise KeyError(f"El nodo {int(nodos[~validos][0])} no pertenece al grafo")
+        return indices
+
+    def puntos(self, nodos) -> np.ndarray:
+        """
+        Devuelve latitud, longitud y elevación de una lista de nodos OSM.
+
+        Parameters
+        ----------
+        nodos : array_like of int
+            Identificadores OSM de los nodos.
+
+        Returns
+        -------
+        np.ndarray
+            Array (n, 3) con latitud, longitud y elevación (0 si el grafo no la incluye).
+        """
+        indices = self.indices(nodos)
+        elevacion = self.elevacion[indices] if self.elevacion is not None else np.zeros(len(indices))
+        return np.column_stack((self.lat[indices], self.lon[indices], elevacion)).astype(np.float64)
+
+    def _arbol_espacial(self) -> cKDTree:
+        """
+        Devuelve el índice espacial de los nodos, construyéndolo la primera vez.
+
+        Las coordenadas se proyectan de forma equirectangular respecto a la
+        latitud media del grafo, suficiente para distancias dentro de una ciudad.
+        """
+        if self._arbol is None:
+            with self._bloqueo_arbol:
+                if self._arbol is None:
+                    self._escala_lon = float(np.cos(np.radians(np.mean(self.lat))))
+                    self._arbol = cKDTree(np.column_stack((self.lat, self.lon * self._escala_lon)))
+        return self._arbol
+
+    def nodos_mas_cercanos(self, puntos: List[Tuple[float, float]]) -> List[int]:
+        """
+        Devuelve el nodo OSM más cercano a cada punto con una única consulta vectorizada.
+
+        Parameters
+        ----------
+        puntos : List[Tuple[float, float]]
+            Coordenadas (latitud, longitud) de los puntos a ajustar.
+
+        Returns
+        -------
+        List[int]
+            Identificadores OSM de los nodos más cercanos, en el mismo orden.
+        """
+        if not puntos:
+            return []
+        arbol = self._arbol_espacial()
+        coordenadas = np.asarray(puntos, dtype=np.float64).reshape(-1, 2)
+        _, indices = arbol.query(np.column_stack((coordenadas[:, 0], coordenadas[:, 1] * self._escala_lon)))
+        return self.nodos[indices].tolist()
+
+    def nodo_mas_cercano(self, lat: float, lon: float) -> int:
+        """
+        Devuelve el nodo OSM más cercano a unas coordenadas.
+
+        Parameters
+        ----------
+        lat : float
+            Latitud del punto.
+        lon : float
+            Longitud del punto.
+
+        Returns
+        -------
+        int
+            Identificador OSM del nodo más cercano.
+        """
+        return self.nodos_mas_cercanos([(lat, lon)])[0]
+
+    def factor_heuristica(self) -> float:
+        """
+        Devuelve el factor de escala de la heurística de A* para este grafo.
+
+        Es el menor cociente entre la longitud de una arista y la distancia en
+        línea recta entre sus extremos (como máximo 1). Multiplicar la distancia
+        ortodrómica por este factor garantiza una heurística admisible y
+        consistente. Como cada modo de transporte tiene su propio grafo, el
+        factor queda ajustado a cada modo. Se calcula una vez por grafo.
+
+        Returns
+        -------
+        float
+            Factor de escala entre 0 y 1.
+        """
+        if self._factor_heuristica is None:
+            origenes = np.repeat(np.arange(len(self.nodos)), np.diff(self.desplazamientos))
+            rectas = distancia_haversine(self.lat[origenes], self.lon[origenes],
+                                         self.lat[self.destinos], self.lon[self.destinos])
+            validas = rectas > 1e-3
+            factor = 1.0
+            if validas.any():
+                factor = min(1.0, float(np.min(self.pesos[validas] / rectas[validas])))
+            # Pequeño margen para absorber el redondeo de los pesos en float32
+            self._factor_heuristica = max(0.0, factor * (1 - 1e-4))
+        return self._factor_heuristica
+
+    def suma_control(self) -> str:
+        """
+        Devuelve el SHA-256 de los nodos y las aristas del grafo.
+
+        Identifica el contenido del grafo, de modo que los datos precalculados
+        sobre él (como su jerarquía de contracción) pueden comprobar que siguen
+        correspondiendo al grafo cargado. Se calcula una vez por grafo.
+
+        Returns
+        -------
+        str
+            Suma de control en hexadecimal.
+        """
+        if self._suma_control is None:
+            suma = hashlib.sha256()
+            for a in (self.nodos, self.desplazamientos, self.destinos, self.pesos):
+                suma.update(str(a.dtype).encode())
+                suma.update(np.ascontiguousarray(a).tobytes())
+            self._suma_control = suma.hexdigest()
+        return self._suma_control
+
+    def camino_mas_corto(self, origen: int, destino: int, algoritmo: str = "astar") -> Tuple[List[int], float]:
+        """
+        Calcula el camino mínimo entre dos nodos.
+
+        Por defecto usa A* con la distancia ortodrómica al destino como
+        heurística, que explora muchos menos nodos que Dijkstra en los tramos
+        largos. Ambos algoritmos devuelven un camino de longitud mínima.
+
+        Parameters
+        ----------
+        origen : int
+            Identificador OSM del nodo de inicio.
+        destino : int
+            Identificador OSM del nodo final.
+        algoritmo : str, optional
+            "astar" (por defecto) o "dijkstra".
+
+        Returns
+        -------
+        Tuple[List[int], float]
+            Lista de nodos OSM del camino y su longitud en metros.
+
+        Raises
+        ------
+        ValueError
+            Si el algoritmo no es válido o no existe ningún camino entre los dos nodos.
+        """
+        if algoritmo not in ("astar", "dijkstra"):
+            raise ValueError("Algoritmo no válido. Usa 'astar' o 'dijkstra'.")
+
+        i_origen = self.indice(origen)
+        i_destino = self.indice(destino)
+
+        desplazamientos = self.desplazamientos
+        destinos = self.destinos
+        pesos = self.pesos
+
+        if algoritmo == "astar":
+            escala = 2 * RADIO_TIERRA * self.factor_heuristica()
+            lat_destino = math.radians(float(self.lat[i_destino]))
+            lon_destino = math.radians(float(self.lon[i_destino]))
+            cos_destino = math.cos(lat_destino)
+            lat, lon = self.lat, self.lon
+
+            def heuristica(v: int) -> float:
+                lat_v = math.radians(float(lat[v]))
+                a = (math.sin((lat_v - lat_destino) / 2) ** 2 +
+                     math.cos(lat_v) * cos_destino * math.sin((math.radians(float(lon[v])) - lon_destino) / 2) ** 2)
+                return escala * math.asin(math.sqrt(a))
+        else:
+            def heuristica(v: int) -> float:
+                return 0.0
+
+        # Listas planas indexadas por nodo: más rápidas que diccionarios en el bucle principal
+        distancias: List[float] = [float('inf')] * len(self.nodos)
+        previos: List[int] = [-1] * len(self.nodos)
+        distancias[i_origen] = 0.0
+        cola: List[Tuple[float, float, int]] = [(heuristica(i_origen), 0.0, i_origen)]
+
+        while cola:
+            _, distancia, u = heapq.heappop(cola)
+            if distancia > distancias[u]:
+                continue
+            if u == i_destino:
+                break
+
+            inicio, fin = desplazamientos[u], desplazamientos[u + 1]
+            for v, peso in zip(destinos[inicio:fin].tolist(), pesos[inicio:fin].tolist()):
+                nueva = distancia + peso
+                if nueva < distancias[v]:
+                    distancias[v] = nueva
+                    previos[v] = u
+                    heapq.heappush(cola, (nueva + heuristica(v), nueva, v))
+        else:
+            raise ValueError(f"No existe camino entre los nodos {origen} y {destino}")
+
+        camino = [i_destino]
+        while camino[-1] != i_origen:
+            camino.append(previos[camino[-1]])
+        camino.reverse()
+
+        return self.nodos[camino].tolist(), distancias[i_destino]
+
+    def caminos_desde(self, origen: int, destinos: List[int]) -> Dict[int, Tuple[List[int], float]]:
+        """
+        Calcula con una única búsqueda de Dijkstra los caminos mínimos desde un nodo a varios.
+
+        La búsqueda termina en cuanto se han alcanzado todos los destinos.
+
+        Parameters
+        ----------
+        origen : int
+            Identificador OSM del nodo de inicio.
+        destinos : List[int]
+            Identificadores OSM de los nodos de destino.
+
+        Returns
+        -------
+        Dict[int, Tuple[List[int], float]]
+            Camino y longitud en metros para cada destino alcanzable. Los
+            destinos sin camino desde el origen no aparecen en el resultado.
+        """
+        i_origen = self.indice(origen)
+        distancias, previos, alcanzados = self._dijkstra_hasta(i_origen, {self.indice(d) for d in destinos})
+
+        resultado: Dict[int, Tuple[List[int], float]] = {}
+        for i_destino in alcanzados:
+            camino = [i_destino]
+            while camino[-1] != i_origen:
+                camino.append(previos[camino[-1]])
+            camino.reverse()
+            resultado[int(self.nodos[i_destino])] = (self.nodos[camino].tolist(), distancias[i_destino])
+        return resultado
+
+    def distancias_desde(self, origen: int, destinos: List[int]) -> Dict[int, float]:
+        """
+        Calcula con una única búsqueda de Dijkstra las distancias mínimas desde un nodo a varios.
+
+        Igual que caminos_desde, pero sin reconstruir los caminos.
+
+        Parameters
+        ----------
+        origen : int
+            Identificador OSM del nodo de inicio.
+        destinos : List[int]
+            Identificadores OSM de los nodos de destino.
+
+        Returns
+        -------
+        Dict[int, float]
+            Longitud en metros del camino mínimo a cada destino alcanzable.
+        """
+        distancias, _, alcanzados = self._dijkstra_hasta(self.indice(origen), {self.indice(d) for d in destinos})
+        return {int(self.nodos[i]): distancias[i] for i in alcanzados}
+
+    def _dijkstra_hasta(self, i_origen: int, pendientes: set) -> Tuple[List[float], List[int], List[int]]:
+        """Dijkstra desde un índice hasta asentar todos los de pendientes, que se van quitando del conjunto."""
+        desplazamientos = self.desplazamientos
+        destinos_aristas = self.destinos
+        pesos = self.pesos
+
+        distancias: List[float] = [float('inf')] * len(self.nodos)
+        previos: List[int] = [-1] * len(self.nodos)
+        distancias[i_origen] = 0.0
+        cola: List[Tuple[float, int]] = [(0.0, i_origen)]
+        alcanzados = []
+
+        while cola and pendientes:
+            distancia, u = heapq.heappop(cola)
+            if distancia > distancias[u]:
+                continue
+            if u in pendientes:
+                pendientes.discard(u)
+                alcanzados.append(u)
+
+            inicio, fin = desplazamientos[u], desplazamientos[u + 1]
+            for v, peso in zip(destinos_aristas[inicio:fin].tolist(), pesos[inicio:fin].tolist()):
+                nueva = distancia + peso
+                if nueva < distancias[v]:
+                    distancias[v] = nueva
+                    previos[v] = u
+                    heapq.heappush(cola, (nueva, v))
+        return distancias, previos, alcanzados
@@ -0,0 +1,379 @@
+"""
+Módulo de jerarquías de contracción para consultas de rutas muy rápidas.
+
+Una jerarquía de contracción se precalcula una sola vez por grafo: los nodos
+se ordenan por importancia y se "contraen" uno a uno, añadiendo atajos que
+conservan las distancias mínimas. Después, cada consulta es una búsqueda
+bidireccional que solo sube en la jerarquía y explora unos pocos cientos de
+nodos, en lugar de buena parte de la ciudad.
+
+Las jerarquías se guardan junto a los grafos en caché con el mismo formato
+binario mapeable en memoria. Para construirlas:
+
+    python jerarquia_contraccion.py [walk] [bike] [drive]
+
+"""
+
+import sys
+import heapq
+from typing import Dict, List, Tuple
+import numpy as np
+from grafo_compacto import GrafoCompacto, escribir_arrays, leer_arrays
+
+# Nodos asentados como máximo en cada búsqueda de caminos testigo durante la construcción
+LIMITE_TESTIGO = 100
+
+
+class JerarquiaContraccion:
+    """
+    Jerarquía de contracción asociada a un GrafoCompacto.
+
+    Guarda, en formato CSR, las aristas que suben en la jerarquía (búsqueda
+    hacia delante desde el origen) y las que bajan, invertidas (búsqueda hacia
+    atrás desde el destino). Cada arista indica el nodo intermedio del atajo
+    que representa, o -1 si es una arista original del grafo.
+
+    Attributes
+    ----------
+    grafo : GrafoCompacto
+        Grafo sobre el que se ha construido la jerarquía.
+    rango : np.ndarray
+        Posición de cada nodo en el orden de contracción.
+    subida : Tuple[np.ndarray, ...]
+        Desplazamientos, destinos, pesos y nodos intermedios de las aristas hacia nodos de mayor rango.
+    bajada : Tuple[np.ndarray, ...]
+        Lo mismo para las aristas que llegan desde nodos de mayor rango, invertidas.
+
+    Methods
+    -------
+    construir(grafo, limite_testigo)
+        Precalcula la jerarquía de un grafo.
+    guardar(ruta_archivo)
+        Serializa la jerarquía en el formato binario mapeable.
+    cargar(ruta_archivo, grafo)
+        Abre con mmap una jerarquía guardada para un grafo.
+    camino_mas_corto(origen, destino)
+        Calcula el camino mínimo entre dos nodos OSM.
+    """
+
+    def __init__(self, grafo: GrafoCompacto, rango: np.ndarray,
+                 subida: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+                 bajada: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> None:
+        """
+        Inicializa la jerarquía a partir de sus arrays.
+
+        Parameters
+        ----------
+        grafo : GrafoCompacto
+            Grafo de calles de la jerarquía.
+        rango : np.ndarray
+            Orden de contracción de cada nodo.
+        subida : Tuple[np.ndarray, ...]
+            Arrays CSR (desplazamientos, destinos, pesos, medios) de subida.
+        bajada : Tuple[np.ndarray, ...]
+            Arrays CSR (desplazamientos, destinos, pesos, medios) de bajada.
+        """
+        self.grafo: GrafoCompacto = grafo
+        self.rango: np.ndarray = rango
+        self.subida = subida
+        self.bajada = bajada
+
+    @classmethod
+    def construir(cls, grafo: GrafoCompacto, limite_testigo: int = LIMITE_TESTIGO) -> "JerarquiaContraccion":
+        """
+        Precalcula la jerarquía de contracción de un grafo.
+
+        Los nodos se contraen por orden de diferencia de aristas (atajos
+        añadidos menos aristas eliminadas) más el número de vecinos ya
+        contraídos, con actualización perezosa de prioridades.
+
+        Parameters
+        ----------
+        grafo : GrafoCompacto
+            Grafo de calles.
+        limite_testigo : int, optional
+            Nodos asentados como máximo en cada búsqueda de caminos testigo.
+            Un límite bajo acelera la construcción a cambio de algunos atajos
+            innecesarios, sin afectar a la exactitud de las consultas.
+
+        Returns
+        -------
+        JerarquiaContraccion
+            Jerarquía lista para consultas.
+        """
+        n = len(grafo)
+        salientes: List[Dict[int, float]] = [{} for _ in range(n)]
+        entrantes: List[Dict[int, float]] = [{} for _ in range(n)]
+        desplazamientos = grafo.desplazamientos.tolist()
+        destinos = grafo.destinos.tolist()
+        pesos = grafo.pesos.tolist()
+        for u in range(n):
+            for k in range(desplazamientos[u], desplazamientos[u + 1]):
+                salientes[u][destinos[k]] = pesos[k]
+                entrantes[destinos[k]][u] = pesos[k]
+
+        medios: Dict[Tuple[int, int], int] = {}
+        vecinos_contraidos = [0] * n
+
+        def testigos(u: int, excluido: int, objetivos: Dict[int, float]) -> Dict[int, float]:
+            # Búsqueda local desde u sin pasar por el nodo que se contrae
+            maximo = max(objetivos.values())
+            pendientes = len(objetivos)
+            distancias = {u: 0.0}
+            cola = [(0.0, u)]
+            asentados = 0
+            while cola and asentados < limite_testigo and pendientes:
+                d, x = heapq.heappop(cola)
+                if d > distancias[x]:
+                    continue
+                if d > maximo:
+                    break
+                asentados += 1
+                if x in objetivos:
+                    pendientes -= 1
+                for y, peso in salientes[x].items():
+                    if y == excluido:
+                        continue
+                    nueva = d + peso
+                    if nueva < distancias.get(y, float('inf')):
+                        distancias[y] = nueva
+                        heapq.heappush(cola, (nueva, y))
+            return distancias
+
+        def atajos(v: int) -> List[Tuple[int, int, float]]:
+            necesarios = []
+            for u, peso_u in entrantes[v].items():
+                candidatos = {w: peso_u + peso_w for w, peso_w in salientes[v].items() if w != u}
+                if not candidatos:
+                    continue
+                distancias = testigos(u, v, candidatos)
+                for w, longitud in candidatos.items():
+                    if distancias.get(w, float('inf')) > longitud:
+                        necesarios.append((u, w, longitud))
+            return necesarios
+
+        def prioridad(v: int, necesarios: List[Tuple[int, int, float]]) -> int:
+            return len(necesarios) - len(entrantes[v]) - len(salientes[v]) + vecinos_contraidos[v]
+
+        cola = [(prioridad(v, atajos(v)), v) for v in range(n)]
+        heapq.heapify(cola)
+        rango = np.zeros(n, dtype=np.int32)
+        aristas_subida: List[Tuple[int, int, float, int]] = []
+        aristas_bajada: List[Tuple[int, int, float, int]] = []
+        orden = 0
+
+        while cola:
+            _, v = heapq.heappop(cola)
+            # Actualización perezosa: si la prioridad ha empeorado, se vuelve a encolar
+            necesarios = atajos(v)
+            actual = prioridad(v, necesarios)
+            if cola and actual > cola[0][0]:
+                heapq.heappush(cola, (actual, v))
+                continue
+
+            for u, w, longitud in necesarios:
+                if longitud < salientes[u].get(w, float('inf')):
+                    salientes[u][w] = longitud
+                    entrantes[w][u] = longitud
+                    medios[(u, w)] = v
+
+            # Las aristas restantes de v llevan a nodos que se contraerán después (rango mayor)
+            for w, peso in salientes[v].items():
+                aristas_subida.append((v, w, peso, medios.get((v, w), -1)))
+                del entrantes[w][v]
+                vecinos_contraidos[w] += 1
+            for u, peso in entrantes[v].items():
+                aristas_bajada.append((v, u, peso, medios.get((u, v), -1)))
+                del salientes[u][v]
+                vecinos_contraidos[u] += 1
+            salientes[v] = {}
+            entrantes[v] = {}
+
+            rango[v] = orden
+            orden += 1
+
+        return cls(grafo, rango, cls._csr(aristas_subida, n), cls._csr(aristas_bajada, n))
+
+    @staticmethod
+    def _csr(aristas: List[Tuple[int, int, float, int]], n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        aristas.sort()
+        origenes = np.array([a[0] for a in aristas], dtype=np.int64)
+        desplazamientos = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origenes, minlength=n), out=desplazamientos[1:])
+        return (desplazamientos,
+                np.array([a[1] for a in aristas], dtype=np.int32),
+                np.array([a[2] for a in aristas], dtype=np.float64),
+                np.array([a[3] for a in aristas], dtype=np.int32))
+
+    def guardar(self, ruta_archivo: str) -> None:
+        """
+        Serializa la jerarquía en el formato binario mapeable.
+
+        Parameters
+        ----------
+        ruta_archivo : str
+            Ruta del archivo de destino.
+        """
+        arrays = {"rango": self.rango}
+        for prefijo, csr in (("subida", self.subida), ("bajada", self.bajada)):
+            for nombre, a in zip(("desplazamientos", "destinos", "pesos", "medios"), csr):
+                arrays[f"{prefijo}_{nombre}"] = a
+        metadatos = {"nodos": len(self.grafo), "aristas": len(self.grafo.destinos),
+                     "suma_control": self.grafo.suma_control()}
+        escribir_arrays(ruta_archivo, arrays, metadatos)
+
+    @classmethod
+    def cargar(cls, ruta_archivo: str, grafo: GrafoCompacto) -> "JerarquiaContraccion":
+        """
+        Abre con mmap una jerarquía guardada para un grafo.
+
+        Parameters
+        ----------
+        ruta_archivo : str
+            Ruta del archivo de la jerarquía.
+        grafo : GrafoCompacto
+            Grafo sobre el que se construyó.
+
+        Returns
+        -------
+        JerarquiaContraccion
+            Jerarquía de solo lectura respaldada por el archivo.
+
+        Raises
+        ------
+        ValueError
+            Si la jerarquía no corresponde al grafo indicado: se compara la suma
+            de control del grafo, no solo su número de nodos y aristas.
+        """
+        arrays, metadatos = leer_arrays(ruta_archivo)
+        if (metadatos.get("nodos") != len(grafo) or metadatos.get("aristas") != len(grafo.destinos)
+                or metadatos.get("suma_control") != grafo.suma_control()):
+            raise ValueError(f"La jerarquía '{ruta_archivo}' no corresponde al grafo actual")
+        csr = [tuple(arrays[f"{prefijo}_{nombre}"] for nombre in ("desplazamientos", "destinos", "pesos", "medios"))
+               for prefijo in ("subida", "bajada")]
+        return cls(grafo, arrays["rango"], csr[0], csr[1])
+
+    def camino_mas_corto(self, origen: int, destino: int) -> Tuple[List[int], float]:
+        """
+        Calcula el camino mínimo entre dos nodos con una búsqueda bidireccional ascendente.
+
+        Parameters
+        ----------
+        origen : int
+            Identificador OSM del nodo de inicio.
+        destino : int
+            Identificador OSM del nodo final.
+
+        Returns
+        -------
+        Tuple[List[int], float]
+            Lista de nodos OSM del camino y su longitud en metros.
+
+        Raises
+        ------
+        ValueError
+            Si no existe ningún camino entre los dos nodos.
+        """
+        i_origen = self.grafo.indice(origen)
+        i_destino = self.grafo.indice(destino)
+
+        # Búsqueda 0: hacia delante por la subida; búsqueda 1: hacia atrás por la bajada.
+        # Cada búsqueda usa las aristas de la otra para detectar nodos "atascados".
+        busquedas = (self.subida, self.bajada)
+        distancias: Tuple[Dict[int, float], Dict[int, float]] = ({i_origen: 0.0}, {i_destino: 0.0})
+        previos: Tuple[Dict[int, Tuple[int, int]], Dict[int, Tuple[int, int]]] = ({}, {})
+        colas: Tuple[list, list] = ([(0.0, i_origen)], [(0.0, i_destino)])
+        mejor = 0.0 if i_origen == i_destino else float('inf')
+        encuentro = i_origen if i_origen == i_destino else -1
+
+        while any(cola and cola[0][0] < mejor for cola in colas):
+            for lado in (0, 1):
+                cola = colas[lado]
+                if not cola or cola[0][0] >= mejor:
+                    continue
+                distancia, u = heapq.heappop(cola)
+                if distancia > distancias[lado][u]:
+                    continue
+
+                otra = distancias[1 - lado].get(u)
+                if otra is not None and distancia + otra < mejor:
+                    mejor = distancia + otra
+                    encuentro = u
+
+                # Stall-on-demand: si un nodo de mayor rango ya llega a u por un camino
+                # más corto, la distancia de u no es óptima y no merece la pena expandirlo
+                desplazamientos, destinos, pesos, _ = busquedas[1 - lado]
+                inicio, fin = desplazamientos[u], desplazamientos[u + 1]
+                if any(distancias[lado].get(v, float('inf')) + peso < distancia
+                       for v, peso in zip(destinos[inicio:fin].tolist(), pesos[inicio:fin].tolist())):
+                    continue
+
+                desplazamientos, destinos, pesos, medios = busquedas[lado]
+                inicio, fin = desplazamientos[u], desplazamientos[u + 1]
+                for v, peso, medio in zip(destinos[inicio:fin].tolist(), pesos[inicio:fin].tolist(),
+                                          medios[inicio:fin].tolist()):
+                    nueva = distancia + peso
+                    if nueva < distancias[lado].get(v, float('inf')):
+                        distancias[lado][v] = nueva
+                        previos[lado][v] = (u, medio)
+                        heapq.heappush(cola, (nueva, v))
+
+        if encuentro == -1:
+            raise ValueError(f"No existe camino entre los nodos {origen} y {destino}")
+
+        # Aristas del camino en la jerarquía: origen -> encuentro -> destino
+        aristas: List[Tuple[int, int, int]] = []
+        v = encuentro
+        while v != i_origen:
+            u, medio = previos[0][v]
+            aristas.append((u, v, medio))
+            v = u
+        aristas.reverse()
+        v = encuentro
+        while v != i_destino:
+            w, medio = previos[1][v]
+            aristas.append((v, w, medio))
+            v = w
+
+        camino = [i_origen]
+        for arista in aristas:
+            camino.extend(self._desempaquetar(*arista))
+        return self.grafo.nodos[camino].tolist(), mejor
+
+    def _desempaquetar(self, u: int, w: int, medio: int) -> List[int]:
+        """
+        Sustituye recursivamente un atajo por los nodos del camino original (sin incluir u).
+        """
+        resultado: List[int] = []
+        pila = [(u, w, medio)]
+        while pila:
+            a, b, m = pila.pop()
+            if m == -1:
+                resultado.append(b)
+            else:
+                # Se apila primero la segunda mitad para procesar antes la primera
+                pila.append((m, b, self._medio(m, b)))
+                pila.append((a, m, self._medio(a, m)))
+        return resultado
+
+    def _medio(self, u: int, w: int) -> int:
+        """
+        Devuelve el nodo intermedio de la arista u -> w de la jerarquía (-1 si es original).
+        """
+        if self.rango[u] < self.rango[w]:
+            desplazamientos, destinos, _, medios = self.subida
+            origen, buscado = u, w
+        else:
+            desplazamientos, destinos, _, medios = self.bajada
+            origen, buscado = w, u
+        inicio, fin = desplazamientos[origen], desplazamientos[origen + 1]
+        posicion = inicio + destinos[inicio:fin].tolist().index(buscado)
+        return int(medios[posicion])
+
+
+if __name__ == "__main__":
+    from grafo_cache import almacen_grafos, MODOS_TRANSPORTE, TESELA_ALICANTE
+
+    for modo in sys.argv[1:] or MODOS_TRANSPORTE:
+        almacen_grafos.construir_jerarquia(modo, TESELA_ALICANTE)
+        print(f"Jerarquía de contracción de {modo}/{TESELA_ALICANTE} guardada")
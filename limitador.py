@@ -0,0 +1,109 @@
+"""
+Módulo con el limitador de tasa compartido para servicios externos.
+
+Implementa un cubo de fichas (token bucket): las peticiones consumen una ficha
+y las fichas se reponen a una tasa fija hasta una capacidad máxima. Solo se
+espera cuando la petición superaría la cuota del servicio, de modo que la
+primera petición tras un periodo de inactividad sale inmediatamente.
+
+Cada petición reserva su turno bajo un bloqueo, por lo que los hilos
+concurrentes se atienden en orden de llegada en lugar de competir entre sí.
+Las corrutinas de asyncio comparten el mismo cubo de fichas y esperan su
+turno sin bloquear el bucle de eventos.
+
+"""
+
+import time
+import asyncio
+import threading
+
+
+class LimitadorTasa:
+    """
+    Limitador de tasa de tipo cubo de fichas, seguro entre hilos.
+
+    Attributes
+    ----------
+    tasa : float
+        Fichas repuestas por segundo (peticiones por segundo permitidas).
+    capacidad : float
+        Número máximo de fichas acumuladas (ráfaga permitida).
+
+    Methods
+    -------
+    reservar()
+        Reserva un turno y devuelve los segundos que hay que esperar.
+    esperar()
+        Bloquea el hilo hasta que la petición esté permitida.
+    esperar_async()
+        Suspende la corrutina hasta que la petición esté permitida.
+    """
+
+    def __init__(self, tasa: float, capacidad: float = 1) -> None:
+        """
+        Inicializa el limitador con el cubo lleno.
+
+        Parameters
+        ----------
+        tasa : float
+            Peticiones por segundo permitidas.
+        capacidad : float, optional
+            Ráfaga máxima de peticiones, por defecto 1.
+
+        Raises
+        ------
+        ValueError
+            Si la tasa o la capacidad no son positivas.
+        """
+        if tasa <= 0 or capacidad <= 0:
+            raise ValueError("La tasa y la capacidad del limitador deben ser positivas.")
+        self.tasa: float = tasa
+        self.capacidad: float = capacidad
+        self._fichas: float = capacidad
+        self._ultima: float = time.monotonic()
+        self._bloqueo: threading.Lock = threading.Lock()
+
+    def reservar(self) -> float:
+        """
+        Reserva el siguiente turno disponible.
+
+        La ficha se consume en el momento de la reserva; si no hay fichas, el
+        saldo queda negativo y la espera devuelta cubre a todas las reservas
+        anteriores, lo que mantiene el orden de llegada.
+
+        Returns
+        -------
+        float
+            Segundos que hay que esperar antes de hacer la petición (0 si puede hacerse ya).
+        """
+        with self._bloqueo:
+            ahora = time.monotonic()
+            self._fichas = min(self.capacidad, self._fichas + (ahora - self._ultima) * self.tasa)
+            self._ultima = ahora
+            self._fichas -= 1
+            if self._fichas >= 0:
+                return 0.0
+            return -self._fichas / self.tasa
+
+    def esperar(self) -> None:
+        """
+        Bloquea el hilo actual hasta que su petición esté dentro de la cuota.
+        """
+        espera = self.reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+    async def esperar_async(self) -> None:
+        """
+        Suspende la corrutina actual hasta que su petición esté dentro de la cuota.
+
+        La reserva es la misma que en esperar(), por lo que hilos y corrutinas
+        comparten la cuota del servicio.
+        """
+        espera = self.reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+# Política de uso de Nominatim: como máximo una petición por segundo
+limitador_nominatim = LimitadorTasa(tasa=1.0, capacidad=1)
@@ -26,10 +26,15 @@ from datetime import datetime
 import sqlite3
 import requests
 from flask_cors import CORS
-from ruta import Ruta
-from utils import exportar_pdf, exportar_gpx, generar_mapa, exportar_png_desde_html
+from ruta import Ruta, calcular_matriz, eliminar_repetidos, geocodificar_puntos
+from artefactos import archivo_publico, eliminar_artefactos
+from exportacion import artefacto_bajo_demanda
 import logging
 from servicio_clima import ServicioOpenWeatherMap, GestorClima
+from grafo_cache import almacen_grafos
+from geocodificador import Geocodificador
+from precalentamiento_geocodificacion import iniciar_precalentamiento
+from trazas import estadisticas_etapas, medir, traza
 
 # Configuración de rutas 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -43,7 +48,8 @@ for directory in [STATIC_DIR, RUTAS_DIR]:
         os.makedirs(directory)
 
 # Inicialización de la aplicación Flask
-app = Flask(__name__, static_folder=STATIC_DIR)
+# Sin carpeta estática de Flask: /static la sirve serve_static, que genera bajo demanda los archivos de las rutas
+app = Flask(__name__, static_folder=None)
 CORS(app)  
 
 # Configuración de la base de datos
@@ -311,12 +317,13 @@ class RutaManual:
 
     Métodos
     -------
-    crear_ruta_desde_datos(origen, destino, modo='walk', nombre=None, puntos_intermedios=None, username=None)
+    crear_ruta_desde_datos(origen, destino, modo='walk', nombre=None, puntos_intermedios=None, username=None, optimizar_orden=False)
         Crea una nueva ruta a partir de puntos geográficos
     """
 
     @staticmethod
-    def crear_ruta_desde_datos(origen, destino, modo='walk', nombre=None, puntos_intermedios=None, username=None):
+    @medir("crear_ruta")
+    def crear_ruta_desde_datos(origen, destino, modo='walk', nombre=None, puntos_intermedios=None, username=None, optimizar_orden=False):
         if puntos_intermedios is None:
             puntos_intermedios = []
 
@@ -335,7 +342,8 @@ class RutaManual:
             origen=origen,
             puntos_intermedios=puntos_intermedios,
             destino=destino,
-            modo_transporte=modo
+            modo_transporte=modo,
+            optimizar_orden=optimizar_orden
         )
 
         # Validar geocodificación
@@ -345,21 +353,10 @@ class RutaManual:
 
         ruta.guardar_en_json()
 
-        # Exportar archivos
-        try:
-            pdf_filename = exportar_pdf(ruta.distancias, ruta.tiempos_estimados, ruta.modo_transporte, ruta.nombre, ruta.origen, ruta.puntos_intermedios, ruta.destino)
-            if not pdf_filename:
-                raise RuntimeError("No se generó el archivo PDF")
-            gpx_filename = exportar_gpx(ruta.rutas, ruta.grafo, ruta.timestamp)
-            if not gpx_filename:
-                raise RuntimeError("No se generó el archivo GPX")
-            html_filename = generar_mapa(ruta.origen, ruta.puntos_intermedios, ruta.destino, ruta.rutas, ruta.grafo, ruta.timestamp)
-            if not html_filename:
-                raise RuntimeError("No se generó el archivo HTML")
-            exportar_png_desde_html(html_filename, f"static/{ruta.nombre}.png")
-        except Exception as e:
-            logging.error(f"Error al exportar archivos: {e}")
-            raise RuntimeError(f"Error al exportar archivos: {e}")
+        # Los archivos se generan la primera vez que se piden, a partir de la geometría guardada
+        pdf_filename, gpx_filename, html_filename = (
+            f"static/{archivo_publico(ruta.nombre, formato)}" for formato in ("pdf", "gpx", "html")
+        )
 
         # Devuelve un diccionario con la información de la ruta y los archivos generados
         return {
@@ -367,10 +364,11 @@ class RutaManual:
             "origen": origen,
             "destino": destino,
             "modo": modo,
-            "puntos_intermedios": puntos_intermedios,
+            "puntos_intermedios": ruta.puntos_intermedios_nombres if optimizar_orden else puntos_intermedios,
             "archivos": {
                 "pdf": pdf_filename,
                 "gpx": gpx_filename,
+                "gpx_lite": f"static/{archivo_publico(ruta.nombre, 'gpx_lite')}",
                 "html": html_filename
             }
         }
@@ -383,14 +381,18 @@ class RutaAuto:
 
     Métodos
     -------
-    generar_rutas_desde_direcciones(direcciones, cantidad=5, username=None)
+    generar_rutas_desde_direcciones(direcciones, cantidad=5, username=None, optimizar_orden=False)
         Genera múltiples rutas a partir de una lista de direcciones
     """
 
-    def generar_rutas_desde_direcciones(self, direcciones, cantidad=5, username=None):
-        if not direcciones or len(direcciones) < 2:
+    def generar_rutas_desde_direcciones(self, direcciones, cantidad=5, username=None, optimizar_orden=False):
+        # Las direcciones repetidas (p. ej. "Pl. Luceros" y "Plaza de los Luceros") solo cuentan una vez
+        direcciones = eliminar_repetidos(direcciones or [])
+        if len(direcciones) < 2:
             return ["Se requieren al menos dos direcciones"]
 
+        # Geocodificar cada dirección una sola vez para todas las rutas generadas
+        direcciones = geocodificar_puntos(direcciones, Geocodificador(asincrono=True))
         rutas_generadas = []
 
         for i in range(min(cantidad, len(direcciones) - 1)):
@@ -410,7 +412,8 @@ class RutaAuto:
                     puntos_intermedios=puntos_intermedios,
                     modo=modo,
                     nombre=nombre,
-                    username=username
+                    username=username,
+                    optimizar_orden=optimizar_orden
                 )
                 rutas_generadas.append(f"Ruta '{nombre}' creada exitosamente")
             except Exception as e:
@@ -432,6 +435,31 @@ gestor = GestorRutas()
 servicio_clima = ServicioOpenWeatherMap()
 gestor_clima = GestorClima(servicio_clima)
 
+# Textos aceptados para los parámetros booleanos que no llegan como true/false de JSON
+VALORES_BOOLEANOS = {"true": True, "1": True, "si": True, "sí": True,
+                     "false": False, "0": False, "no": False}
+
+def leer_booleano(datos, clave, por_defecto=False):
+    """
+    Lee un parámetro booleano del cuerpo JSON de una petición.
+
+    Se acepta un booleano de JSON, 0/1 o uno de los textos de VALORES_BOOLEANOS;
+    cualquier otro valor es un error, para que "false" no se lea como verdadero.
+
+    Raises
+    ------
+    ValueError
+        Si el valor no es un booleano reconocible.
+    """
+    valor = datos.get(clave, por_defecto)
+    if isinstance(valor, bool):
+        return valor
+    if isinstance(valor, int) and valor in (0, 1):
+        return bool(valor)
+    if isinstance(valor, str) and valor.strip().lower() in VALORES_BOOLEANOS:
+        return VALORES_BOOLEANOS[valor.strip().lower()]
+    raise ValueError(f"El parámetro '{clave}' debe ser true o false")
+
 # Ruta principal
 @app.route('/')
 def home():
@@ -448,15 +476,37 @@ def home():
         "version": "1.1.0"
     })
 
+def servir_archivo(filename):
+    """Sirve el archivo de una ruta, generándolo bajo demanda, o un archivo de 'static'.
+
+    Los archivos de las rutas (PDF, GPX y mapa HTML) no se generan al crear la
+    ruta sino la primera vez que se piden, y se guardan en la caché de artefactos.
+    Se buscan antes que en 'static', donde pueden quedar archivos generados por
+    versiones anteriores para una ruta con el mismo nombre; esos solo se sirven
+    si la ruta no tiene geometría guardada.
+    """
+    try:
+        archivo = artefacto_bajo_demanda(filename)
+    except Exception as e:
+        logging.error(f"Error al generar el archivo {filename}: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"Error al generar el archivo: {str(e)}"
+        }), 500
+    if archivo is None:
+        return send_from_directory(STATIC_DIR, filename)
+    return send_from_directory(os.path.dirname(archivo), os.path.basename(archivo),
+                               download_name=filename)
+
 # Endpoint para servir archivos estáticos 
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    return send_from_directory(STATIC_DIR, filename)
+    return servir_archivo(filename)
 
 # Endpoint para servir archivos HTML desde la carpeta 'static'
 @app.route('/html/<path:filename>')
 def serve_html(filename):
-    return send_from_directory(STATIC_DIR, filename)
+    return servir_archivo(filename)
 
 # Endpoints de Usuarios
 @app.route('/api/usuarios/login', methods=['POST'])
@@ -575,6 +625,7 @@ def eliminar_usuario(username):
             ruta_path = os.path.join(RUTAS_DIR, f"{ruta.nombre_ruta}.json")
             if os.path.exists(ruta_path):
                 os.remove(ruta_path)
+            eliminar_artefactos(ruta.nombre_ruta)
             db.session.delete(ruta)
         # Eliminar el usuario
         db.session.delete(usuario)
@@ -683,6 +734,7 @@ def eliminar_ruta_usuario(username, nombre_ruta):
             os.remove(pdf_path)
         if os.path.exists(html_path):
             os.remove(html_path)
+        eliminar_artefactos(nombre_ruta)
             
         # Eliminar la relación
         db.session.delete(relacion)
@@ -824,39 +876,69 @@ def filtrar_rutas():
 def crear_ruta():
     try:
         datos = request.get_json(force=True)
-        ruta = RutaManual.crear_ruta_desde_datos(
-            origen=datos['origen'],
-            puntos_intermedios=datos.get('puntos_intermedios', []),
-            destino=datos['destino'],
-            modo=datos.get('modo', 'walk'),
-            nombre=datos.get('nombre'),
-            username=datos.get('username')
-        )
+        try:
+            optimizar_orden = leer_booleano(datos, 'optimizar_orden')
+            devolver_traza = leer_booleano(datos, 'traza')
+        except ValueError as ve:
+            return jsonify({
+                "status": "error",
+                "message": str(ve)
+            }), 400
+        # Tiempos de cada etapa de la creación, devueltos si se piden con "traza": true
+        with traza() as traza_ruta:
+            ruta = RutaManual.crear_ruta_desde_datos(
+                origen=datos['origen'],
+                puntos_intermedios=datos.get('puntos_intermedios', []),
+                destino=datos['destino'],
+                modo=datos.get('modo', 'walk'),
+                nombre=datos.get('nombre'),
+                username=datos.get('username'),
+                optimizar_orden=optimizar_orden
+            )
         
         if ruta and datos.get('username'):
             Usuario.agregar_ruta(datos['username'], ruta['nombre'])
             
-        return jsonify({
+        respuesta = {
             "status": "success",
             "data": ruta
-        })
+        }
+        if devolver_traza:
+            respuesta["traza"] = traza_ruta.a_dict()
+        return jsonify(respuesta)
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": f"Error al crear ruta: {str(e)}"
         }), 500
 
+# Endpoint con el histograma de duración de cada etapa de la creación de rutas desde el arranque
+@app.route('/api/metricas/etapas', methods=['GET'])
+def obtener_metricas_etapas():
+    return jsonify({
+        "status": "success",
+        "data": estadisticas_etapas.resumen()
+    })
+
 @app.route('/api/rutas/auto', methods=['POST'])
 def crear_rutas_automaticas():
     try:
         datos = request.get_json(force=True)
+        try:
+            optimizar_orden = leer_booleano(datos, 'optimizar_orden')
+        except ValueError as ve:
+            return jsonify({
+                "status": "error",
+                "message": str(ve)
+            }), 400
         ruta_auto = RutaAuto()
         rutas = []
         nombres_creadas = []
         resultados = ruta_auto.generar_rutas_desde_direcciones(
             direcciones=datos['direcciones'],
             cantidad=datos.get('cantidad', 1),
-            username=datos.get('username')
+            username=datos.get('username'),
+            optimizar_orden=optimizar_orden
         )
         for resultado in resultados:
             rutas.append(resultado)
@@ -878,6 +960,41 @@ def crear_rutas_automaticas():
             "message": f"Error al crear rutas automáticas: {str(e)}"
         }), 500
 
+@app.route('/api/matriz', methods=['POST'])
+def calcular_matriz_distancias():
+    try:
+        datos = request.get_json(force=True)
+        if not isinstance(datos, dict):
+            return jsonify({
+                "status": "error",
+                "message": "El cuerpo de la petición debe ser un objeto JSON"
+            }), 400
+        origenes = datos.get('origenes')
+        destinos = datos.get('destinos')
+        if not origenes or not destinos:
+            return jsonify({
+                "status": "error",
+                "message": "Se requieren los parámetros 'origenes' y 'destinos'"
+            }), 400
+
+        # 'modo' como en /api/rutas; 'modo_transporte' se acepta por compatibilidad
+        modo = datos.get('modo', datos.get('modo_transporte', 'walk'))
+        matriz = calcular_matriz(origenes, destinos, modo)
+        return jsonify({
+            "status": "success",
+            "data": matriz
+        })
+    except ValueError as ve:
+        return jsonify({
+            "status": "error",
+            "message": str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Error al calcular la matriz: {str(e)}"
+        }), 500
+
 # Endpoint de Clima
 @app.route('/api/clima', methods=['GET'])
 def consultar_clima():
@@ -946,10 +1063,43 @@ def inicializar_db():
             print(f"❌ Error al inicializar la base de datos: {str(e)}")
             raise
 
+def precargar_grafos():
+    """Carga en memoria los grafos de Alicante para cada modo de transporte.
+
+    Los grafos de toda la ciudad (walk, bike y drive) se leen de la caché en
+    disco, o se descargan la primera vez, y quedan residentes en el proceso,
+    de modo que las peticiones de creación de rutas no descargan ningún grafo.
+
+    Notas
+    -----
+    Un fallo en la precarga no impide arrancar la aplicación: el grafo que
+    falte se cargará con la primera ruta que lo necesite.
+    """
+    try:
+        almacen_grafos.precargar()
+        print("✅ Grafos de Alicante cargados en memoria")
+    except Exception as e:
+        print(f"❌ Error al precargar los grafos: {str(e)}")
+
+
+def precalentar_geocodificacion():
+    """Geocodifica en segundo plano las direcciones de las rutas guardadas.
+
+    Las direcciones de los archivos de RUTAS_DIR que aún no están en la caché
+    de geocodificación se consultan en un hilo aparte, respetando el límite de
+    tasa de Nominatim, sin retrasar el arranque de la aplicación. Con varios
+    procesos de la aplicación, solo uno de ellos lo hace.
+    """
+    iniciar_precalentamiento(RUTAS_DIR)
+
 
 if __name__ == '__main__':
     inicializar_db()
+    precargar_grafos()
+    precalentar_geocodificacion()
     #Ejecución local (descomentar)
     #app.run(debug=True, port=5000)
 else:
-    inicializar_db()
\ No newline at end of file
+    inicializar_db()
+    precargar_grafos()
+    precalentar_geocodificacion()
\ No newline at end of file
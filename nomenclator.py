@@ -0,0 +1,385 @@
+"""
+Módulo con el nomenclátor local de calles y lugares de Alicante.
+
+El nomenclátor asocia los nombres de las calles y de los puntos de interés de
+OpenStreetMap con sus coordenadas, de modo que las direcciones más habituales
+(p. ej. "Mercado Central" o "Playa del Postiguet") se resuelven sin conexión y
+en menos de un milisegundo. El Geocodificador lo consulta antes que Nominatim.
+
+Los nombres de las calles se extraen del grafo de Alicante cuando se descarga,
+o con 'python grafo_cache.py' si el grafo ya estaba en caché (ver
+grafo_cache.py). Para añadir además los puntos de interés:
+
+    python nomenclator.py
+
+La búsqueda admite pequeñas diferencias de escritura mediante un índice
+invertido de trigramas: solo se comparan con la consulta los nombres que
+comparten alguno de sus trigramas menos frecuentes, y como mucho
+MAX_CANDIDATOS de ellos. La búsqueda inversa (de coordenadas a nombre) usa un índice
+espacial (KD-tree) de los puntos con nombre, construido en la primera consulta.
+
+"""
+
+import os
+import json
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import networkx as nx
+from scipy.spatial import cKDTree
+from cache_geocodificacion import clave_consulta
+
+# Archivo del nomenclátor de Alicante, junto a los grafos en caché
+ARCHIVO_NOMENCLATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_grafos", "nomenclator_alicante.json")
+
+# Similitud mínima (coeficiente de Dice sobre trigramas) para aceptar una coincidencia aproximada
+UMBRAL_SIMILITUD = 0.75
+
+# Número máximo de nombres comparados con una consulta en la búsqueda aproximada
+MAX_CANDIDATOS = 2000
+
+# Distancia máxima (en metros) a la que se acepta un nombre en la búsqueda inversa
+DISTANCIA_MAXIMA_INVERSA = 150
+
+# Metros por grado de latitud, para convertir distancias del índice espacial
+METROS_POR_GRADO = 111320
+
+# Mención a la ciudad que se ignora al final de una consulta (ya en forma canónica)
+SUFIJOS_CIUDAD = (" alicante",)
+
+# Etiquetas de OSM de los puntos de interés incluidos en el nomenclátor
+ETIQUETAS_PUNTOS_INTERES = {
+    "amenity": True, "tourism": True, "leisure": True, "historic": True,
+    "shop": ["mall", "department_store"], "natural": ["beach"], "building": ["stadium"],
+}
+
+
+def _trigramas(texto: str) -> Set[str]:
+    relleno = f"  {texto} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class Nomenclator:
+    """
+    Nomenclátor de nombres de calles y lugares con búsqueda exacta y aproximada.
+
+    Cada nombre puede aparecer en varios puntos (p. ej. todos los nodos de
+    una calle); la búsqueda devuelve el punto más próximo al centro de todos
+    ellos, que siempre está sobre la propia calle o lugar.
+
+    Attributes
+    ----------
+    nombres : List[str]
+        Nombres distintos del nomenclátor.
+    coordenadas : List[Tuple[float, float]]
+        Coordenadas (latitud, longitud) representativas de cada nombre.
+    lat : np.ndarray
+        Latitud de cada punto con nombre.
+    lon : np.ndarray
+        Longitud de cada punto con nombre.
+    id_nombre : np.ndarray
+        Posición en nombres del nombre de cada punto.
+
+    Methods
+    -------
+    desde_networkx(grafo)
+        Extrae los nombres de las calles de un grafo de OSMnx.
+    buscar(direccion)
+        Devuelve las coordenadas de una dirección, si está en el nomenclátor.
+    nombres_mas_cercanos(puntos, distancia_maxima)
+        Devuelve el nombre más cercano a cada punto, si lo hay.
+    guardar(ruta_archivo)
+        Guarda las entradas del nomenclátor en un archivo JSON.
+    cargar(ruta_archivo)
+        Carga un nomenclátor guardado con guardar().
+    """
+
+    def __init__(self, entradas: Iterable[Tuple[str, float, float]]) -> None:
+        """
+        Construye el nomenclátor y su índice de trigramas.
+
+        Parameters
+        ----------
+        entradas : Iterable[Tuple[str, float, float]]
+            Ternas (nombre, latitud, longitud). Un mismo nombre puede repetirse.
+        """
+        self.nombres: List[str] = []
+        self._por_clave: Dict[str, int] = {}
+        ids: List[int] = []
+        latitudes: List[float] = []
+        longitudes: List[float] = []
+        for nombre, lat, lon in entradas:
+            clave = clave_consulta(nombre)
+            if not clave:
+                continue
+            if clave not in self._por_clave:
+                self._por_clave[clave] = len(self.nombres)
+                self.nombres.append(nombre)
+            ids.append(self._por_clave[clave])
+            latitudes.append(lat)
+            longitudes.append(lon)
+
+        self.lat: np.ndarray = np.array(latitudes, dtype=np.float64)
+        self.lon: np.ndarray = np.array(longitudes, dtype=np.float64)
+        self.id_nombre: np.ndarray = np.array(ids, dtype=np.int32)
+        self.coordenadas: List[Tuple[float, float]] = self._representativos()
+
+        self._trigramas: List[Set[str]] = [set() for _ in self.nombres]
+        self._indice: Dict[str, List[int]] = {}
+        for clave, i in self._por_clave.items():
+            self._trigramas[i] = _trigramas(clave)
+            for trigrama in self._trigramas[i]:
+                self._indice.setdefault(trigrama, []).append(i)
+
+        # Índice espacial de los puntos con nombre (KD-tree), construido en la primera búsqueda inversa
+        self._arbol: Optional[cKDTree] = None
+        self._escala_lon: float = 1.0
+        self._bloqueo_arbol: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    @classmethod
+    def desde_networkx(cls, grafo: nx.MultiDiGraph) -> "Nomenclator":
+        """
+        Construye el nomenclátor con los nombres de las calles de un grafo de OSMnx.
+
+        Parameters
+        ----------
+        grafo : nx.MultiDiGraph
+            Grafo de calles con el atributo 'name' en las aristas.
+
+        Returns
+        -------
+        Nomenclator
+            Nomenclátor con un punto por cada nodo de cada calle con nombre.
+        """
+        vistos: Set[Tuple[str, int]] = set()
+        entradas: List[Tuple[str, float, float]] = []
+        for u, v, datos in grafo.edges(data=True):
+            nombres = datos.get("name")
+            if not nombres:
+                continue
+            for nombre in (nombres if isinstance(nombres, list) else [nombres]):
+                for nodo in (u, v):
+                    if (nombre, nodo) not in vistos:
+                        vistos.add((nombre, nodo))
+                        entradas.append((nombre, grafo.nodes[nodo]["y"], grafo.nodes[nodo]["x"]))
+        return cls(entradas)
+
+    def buscar(self, direccion: str) -> Optional[Tuple[float, float]]:
+        """
+        Busca una dirección en el nomenclátor.
+
+        Primero se prueba la coincidencia exacta del nombre y después la
+        aproximada por trigramas. Las direcciones con número de portal solo
+        se aceptan por coincidencia exacta, ya que el nomenclátor no conoce
+        la posición de cada portal.
+
+        Parameters
+        ----------
+        direccion : str
+            Dirección a buscar.
+
+        Returns
+        -------
+        Optional[Tuple[float, float]]
+            Coordenadas (latitud, longitud), o None si no hay una coincidencia fiable.
+        """
+        clave = clave_consulta(direccion)
+        variantes = [clave] + [clave[:-len(s)].strip() for s in SUFIJOS_CIUDAD if clave.endswith(s)]
+        for variante in variantes:
+            if variante in self._por_clave:
+                return self.coordenadas[self._por_clave[variante]]
+        if any(c.isdigit() for c in clave):
+            return None
+
+        mejor, mejor_similitud = None, UMBRAL_SIMILITUD
+        for variante in variantes:
+            trigramas = _trigramas(variante)
+            for i in self._candidatos(trigramas):
+                similitud = 2 * len(trigramas & self._trigramas[i]) / (len(trigramas) + len(self._trigramas[i]))
+                if similitud >= mejor_similitud:
+                    mejor, mejor_similitud = i, similitud
+        return self.coordenadas[mejor] if mejor is not None else None
+
+    def _candidatos(self, trigramas: Set[str]) -> Set[int]:
+        """
+        Devuelve los nombres que pueden alcanzar UMBRAL_SIMILITUD con una consulta.
+
+        Para alcanzar el umbral, un nombre debe compartir al menos
+        UMBRAL_SIMILITUD * n / (2 - UMBRAL_SIMILITUD) de los n trigramas de la
+        consulta, así que comparte alguno de los n - minimo + 1 menos
+        frecuentes. Solo se recorren las listas del índice de esos trigramas,
+        de la más corta a la más larga, hasta reunir MAX_CANDIDATOS nombres;
+        los trigramas muy comunes (p. ej. los de "calle") no se recorren.
+        """
+        minimo = max(1, math.ceil(UMBRAL_SIMILITUD * len(trigramas) / (2 - UMBRAL_SIMILITUD) - 1e-9))
+        raros = sorted(trigramas, key=lambda t: len(self._indice.get(t, ())))[:len(trigramas) - minimo + 1]
+        candidatos: Set[int] = set()
+        for trigrama in raros:
+            candidatos.update(self._indice.get(trigrama, ()))
+            if len(candidatos) >= MAX_CANDIDATOS:
+                break
+        return candidatos
+
+    def _arbol_espacial(self) -> cKDTree:
+        """
+        Devuelve el índice espacial de los puntos con nombre, construyéndolo la primera vez.
+
+        Las coordenadas se proyectan de forma equirectangular respecto a la
+        latitud media, igual que en el índice de nodos del GrafoCompacto.
+        """
+        if self._arbol is None:
+            with self._bloqueo_arbol:
+                if self._arbol is None:
+                    self._escala_lon = float(np.cos(np.radians(np.mean(self.lat)))) if len(self.lat) else 1.0
+                    self._arbol = cKDTree(np.column_stack((self.lat, self.lon * self._escala_lon)).reshape(-1, 2))
+        return self._arbol
+
+    def nombres_mas_cercanos(self, puntos: List[Tuple[float, float]],
+                             distancia_maxima: float = DISTANCIA_MAXIMA_INVERSA) -> List[Optional[str]]:
+        """
+        Devuelve el nombre de la calle o lugar más cercano a cada punto.
+
+        Todos los puntos se resuelven con una única consulta vectorizada al
+        índice espacial, sin ninguna petición de red.
+
+        Parameters
+        ----------
+        puntos : List[Tuple[float, float]]
+            Coordenadas (latitud, longitud) de los puntos.
+        distancia_maxima : float, optional
+            Distancia máxima en metros, por defecto DISTANCIA_MAXIMA_INVERSA.
+
+        Returns
+        -------
+        List[Optional[str]]
+            Nombre más cercano a cada punto, o None si no hay ninguno a menos
+            de la distancia máxima.
+        """
+        if not puntos:
+            return []
+        if not len(self.lat):
+            return [None] * len(puntos)
+        arbol = self._arbol_espacial()
+        coordenadas = np.asarray(puntos, dtype=np.float64).reshape(-1, 2)
+        _, indices = arbol.query(np.column_stack((coordenadas[:, 0], coordenadas[:, 1] * self._escala_lon)),
+                                 distance_upper_bound=distancia_maxima / METROS_POR_GRADO)
+        # Los puntos sin vecino dentro de la distancia máxima reciben el índice len(self.lat)
+        return [self.nombres[self.id_nombre[i]] if i < len(self.lat) else None for i in indices.tolist()]
+
+    def guardar(self, ruta_archivo: str) -> None:
+        """
+        Guarda las entradas del nomenclátor en un archivo JSON.
+
+        Parameters
+        ----------
+        ruta_archivo : str
+            Ruta del archivo de destino.
+        """
+        entradas = [[self.nombres[i], lat, lon] for i, lat, lon in
+                    zip(self.id_nombre.tolist(), self.lat.tolist(), self.lon.tolist())]
+        with open(ruta_archivo, "w", encoding="utf-8") as archivo:
+            json.dump({"entradas": entradas}, archivo, ensure_ascii=False)
+
+    @classmethod
+    def cargar(cls, ruta_archivo: str) -> "Nomenclator":
+        """
+        Carga un nomenclátor guardado con guardar().
+
+        Parameters
+        ----------
+        ruta_archivo : str
+            Ruta del archivo JSON.
+
+        Returns
+        -------
+        Nomenclator
+            Nomenclátor con las entradas del archivo.
+        """
+        with open(ruta_archivo, "r", encoding="utf-8") as archivo:
+            return cls((nombre, lat, lon) for nombre, lat, lon in json.load(archivo)["entradas"])
+
+    def _representativos(self) -> List[Tuple[float, float]]:
+        # Para cada nombre, su punto más cercano al centroide de todos sus puntos
+        n = len(self.nombres)
+        cuenta = np.maximum(np.bincount(self.id_nombre, minlength=n), 1)
+        centro_lat = np.bincount(self.id_nombre, weights=self.lat, minlength=n) / cuenta
+        centro_lon = np.bincount(self.id_nombre, weights=self.lon, minlength=n) / cuenta
+        distancia = (self.lat - centro_lat[self.id_nombre]) ** 2 + (self.lon - centro_lon[self.id_nombre]) ** 2
+
+        mejor = np.full(n, -1, dtype=np.int64)
+        orden = np.lexsort((distancia, self.id_nombre))
+        primeros = np.ones(len(orden), dtype=bool)
+        primeros[1:] = self.id_nombre[orden][1:] != self.id_nombre[orden][:-1]
+        mejor[self.id_nombre[orden][primeros]] = orden[primeros]
+        return [(float(self.lat[i]), float(self.lon[i])) for i in mejor]
+
+
+_nomenclator: Optional[Nomenclator] = None
+# Fecha de modificación y tamaño del último archivo que no se pudo cargar
+_firma_fallida: Optional[Tuple[int, int]] = None
+_bloqueo = threading.Lock()
+
+
+def obtener_nomenclator(ruta_archivo: str = ARCHIVO_NOMENCLATOR) -> Optional[Nomenclator]:
+    """
+    Devuelve el nomenclátor de Alicante compartido por todo el proceso.
+
+    Si el archivo no se puede cargar, no se vuelve a intentar (ni a avisar)
+    hasta que el archivo cambie.
+
+    Parameters
+    ----------
+    ruta_archivo : str, optional
+        Archivo del nomenclátor, por defecto ARCHIVO_NOMENCLATOR.
+
+    Returns
+    -------
+    Optional[Nomenclator]
+        Nomenclátor cargado, o None si todavía no se ha generado o no se puede cargar.
+    """
+    global _nomenclator, _firma_fallida
+    if _nomenclator is not None:
+        return _nomenclator
+    try:
+        estado = os.stat(ruta_archivo)
+    except OSError:
+        return None
+    firma = (estado.st_mtime_ns, estado.st_size)
+    if firma == _firma_fallida:
+        return None
+    with _bloqueo:
+        if _nomenclator is None and firma != _firma_fallida:
+            try:
+                _nomenclator = Nomenclator.cargar(ruta_archivo)
+            except Exception as e:
+                print(f"Error al cargar el nomenclátor '{ruta_archivo}': {e}")
+                _firma_fallida = firma
+    return _nomenclator
+
+
+if __name__ == "__main__":
+    # Genera el nomenclátor con las calles del grafo de Alicante y los puntos de interés de OSM
+    import osmnx as ox
+    from shapely.geometry import box
+    from geocodificador import LIMITES_ALICANTE
+
+    lat_min, lat_max, lon_min, lon_max = LIMITES_ALICANTE
+    poligono = box(lon_min, lat_min, lon_max, lat_max)
+    calles = Nomenclator.desde_networkx(ox.graph_from_polygon(poligono, network_type="walk"))
+
+    entradas = [(calles.nombres[i], lat, lon) for i, lat, lon in
+                zip(calles.id_nombre.tolist(), calles.lat.tolist(), calles.lon.tolist())]
+    lugares = ox.features_from_polygon(poligono, tags=ETIQUETAS_PUNTOS_INTERES)
+    for nombre, geometria in zip(lugares.get("name", []), lugares.geometry):
+        if isinstance(nombre, str) and nombre:
+            centro = geometria.centroid
+            entradas.append((nombre, centro.y, centro.x))
+
+    nomenclator = Nomenclator(entradas)
+    os.makedirs(os.path.dirname(ARCHIVO_NOMENCLATOR), exist_ok=True)
+    nomenclator.guardar(ARCHIVO_NOMENCLATOR)
+    print(f"Nomenclátor guardado en '{ARCHIVO_NOMENCLATOR}': {len(nomenclator)} nombres")
@@ -0,0 +1,91 @@
+"""
+Módulo con la normalización de direcciones y su clave canónica.
+
+Las distintas formas de escribir una misma dirección ("Plaza de los Luceros",
+"plaza de los luceros ", "Pl. Luceros") producen la misma clave canónica, que
+es la que usan la caché de geocodificación, el nomenclátor, la geocodificación
+por lotes y la eliminación de direcciones repetidas en las rutas.
+
+La normalización elimina tildes y diacríticos, pasa a minúsculas, expande las
+abreviaturas habituales de los tipos de vía, quita los artículos y
+preposiciones y colapsa los espacios.
+
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# Abreviaturas de tipos de vía, que solo se expanden al principio de la dirección
+ABREVIATURAS_VIA = {
+    "c": "calle", "cl": "calle", "cll": "calle", "cal": "calle",
+    "av": "avenida", "avd": "avenida", "avda": "avenida",
+    "pl": "plaza", "pza": "plaza", "plz": "plaza", "plza": "plaza",
+    "po": "paseo", "ps": "paseo", "pso": "paseo",
+    "ctra": "carretera", "cra": "carretera",
+    "gv": "gran via", "gta": "glorieta", "rbla": "rambla",
+    "urb": "urbanizacion", "pje": "pasaje", "trv": "travesia",
+}
+
+# Abreviaturas que se expanden en cualquier posición
+ABREVIATURAS = {
+    "sta": "santa", "sto": "santo",
+    "ntra": "nuestra", "sra": "senora", "dr": "doctor", "hosp": "hospital",
+}
+
+# Artículos y preposiciones que no distinguen una dirección de otra
+PALABRAS_VACIAS = {"de", "del", "la", "las", "los", "el", "l", "d", "y", "en"}
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+
+def _plegar(texto: str) -> str:
+    # Minúsculas sin tildes ni diacríticos ("º" y "ª" pasan a "o" y "a")
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def palabras_direccion(direccion: str) -> List[str]:
+    """
+    Divide una dirección en palabras normalizadas.
+
+    Parameters
+    ----------
+    direccion : str
+        Dirección tal y como la escribe el usuario.
+
+    Returns
+    -------
+    List[str]
+        Palabras sin tildes, en minúsculas y con las abreviaturas expandidas.
+        Se conservan los artículos y preposiciones.
+    """
+    # "C/San Vicente": la barra del tipo de vía separa palabras igual que un espacio
+    palabras = _NO_ALFANUMERICO.sub(" ", _plegar(direccion)).split()
+    resultado: List[str] = []
+    for i, palabra in enumerate(palabras):
+        if i == 0 and palabra in ABREVIATURAS_VIA:
+            resultado.extend(ABREVIATURAS_VIA[palabra].split())
+        else:
+            resultado.append(ABREVIATURAS.get(palabra, palabra))
+    return resultado
+
+
+def clave_canonica(direccion: str) -> str:
+    """
+    Calcula la clave canónica de una dirección.
+
+    Parameters
+    ----------
+    direccion : str
+        Dirección tal y como la escribe el usuario.
+
+    Returns
+    -------
+    str
+        Palabras normalizadas de la dirección, sin artículos ni preposiciones
+        (salvo que no quede ninguna otra) y separadas por un espacio.
+    """
+    palabras = palabras_direccion(direccion)
+    significativas = [p for p in palabras if p not in PALABRAS_VACIAS]
+    return " ".join(significativas or palabras)
@@ -0,0 +1,155 @@
+"""
+Módulo para optimizar el orden de visita de los puntos intermedios de una ruta.
+
+A partir de la matriz de distancias entre el origen, los puntos intermedios y
+el destino, busca el orden de los intermedios que minimiza la distancia total
+de la ruta: de forma exacta (programación dinámica de Held-Karp) cuando hay
+pocos puntos y con heurísticas de mejora local (2-opt y Or-opt) cuando hay más.
+
+"""
+
+from typing import List
+
+# Número máximo de puntos intermedios para los que se calcula el orden exacto
+LIMITE_EXACTO = 8
+
+
+def coste_recorrido(matriz: List[List[float]], orden: List[int]) -> float:
+    """
+    Calcula la distancia total de origen a destino visitando los intermedios en el orden dado.
+
+    Parameters
+    ----------
+    matriz : List[List[float]]
+        Matriz de distancias; el índice 0 es el origen y el último el destino.
+    orden : List[int]
+        Índices de la matriz (1..k) de los puntos intermedios, en orden de visita.
+
+    Returns
+    -------
+    float
+        Distancia total del recorrido.
+    """
+    recorrido = [0] + orden + [len(matriz) - 1]
+    return sum(matriz[a][b] for a, b in zip(recorrido, recorrido[1:]))
+
+
+def ordenar_intermedios(matriz: List[List[float]]) -> List[int]:
+    """
+    Devuelve el orden de visita de los puntos intermedios que minimiza la distancia total.
+
+    Parameters
+    ----------
+    matriz : List[List[float]]
+        Matriz (k + 2) x (k + 2) de distancias entre el origen (índice 0), los
+        k puntos intermedios (índices 1..k) y el destino (índice k + 1).
+        Puede ser asimétrica; los pares sin camino valen infinito.
+
+    Returns
+    -------
+    List[int]
+        Posiciones (0..k-1) de los puntos intermedios en el nuevo orden.
+    """
+    k = len(matriz) - 2
+    if k <= 1:
+        return list(range(k))
+
+    original = list(range(1, k + 1))
+    if k <= LIMITE_EXACTO:
+        orden = _orden_exacto(matriz, k)
+    else:
+        orden = _mejorar(matriz, _vecino_mas_cercano(matriz, k))
+
+    # Si no se encuentra un recorrido mejor (p. ej. por pares sin camino) se conserva el original
+    if not coste_recorrido(matriz, orden) < coste_recorrido(matriz, original):
+        orden = original
+    return [i - 1 for i in orden]
+
+
+def _orden_exacto(matriz: List[List[float]], k: int) -> List[int]:
+    """
+    Orden óptimo mediante programación dinámica de Held-Karp en O(2^k · k^2).
+    """
+    infinito = float('inf')
+    destino = k + 1
+    completo = (1 << k) - 1
+    # coste[mascara][j]: menor distancia saliendo del origen, visitando la máscara y terminando en j
+    coste = [[infinito] * (k + 1) for _ in range(1 << k)]
+    previo = [[0] * (k + 1) for _ in range(1 << k)]
+    for j in range(1, k + 1):
+        coste[1 << (j - 1)][j] = matriz[0][j]
+
+    for mascara in range(1, completo + 1):
+        for j in range(1, k + 1):
+            bit_j = 1 << (j - 1)
+            if not mascara & bit_j or coste[mascara][j] == infinito:
+                continue
+            for siguiente in range(1, k + 1):
+                bit = 1 << (siguiente - 1)
+                if mascara & bit:
+                    continue
+                nuevo = coste[mascara][j] + matriz[j][siguiente]
+                if nuevo < coste[mascara | bit][siguiente]:
+                    coste[mascara | bit][siguiente] = nuevo
+                    previo[mascara | bit][siguiente] = j
+
+    ultimo = min(range(1, k + 1), key=lambda j: coste[completo][j] + matriz[j][destino])
+    orden = []
+    mascara = completo
+    while mascara:
+        orden.append(ultimo)
+        anterior = previo[mascara][ultimo]
+        mascara ^= 1 << (ultimo - 1)
+        ultimo = anterior
+    orden.reverse()
+    return orden
+
+
+def _vecino_mas_cercano(matriz: List[List[float]], k: int) -> List[int]:
+    """
+    Construye un orden inicial visitando siempre el punto pendiente más cercano.
+    """
+    pendientes = set(range(1, k + 1))
+    orden = []
+    actual = 0
+    while pendientes:
+        actual = min(pendientes, key=lambda j: matriz[actual][j])
+        pendientes.remove(actual)
+        orden.append(actual)
+    return orden
+
+
+def _mejorar(matriz: List[List[float]], orden: List[int]) -> List[int]:
+    """
+    Aplica movimientos 2-opt y Or-opt mientras reduzcan la distancia total.
+
+    Como la matriz puede ser asimétrica, cada movimiento se evalúa recalculando
+    el coste completo del recorrido.
+    """
+    mejor_coste = coste_recorrido(matriz, orden)
+    mejora = True
+    while mejora:
+        mejora = False
+
+        # 2-opt: invertir un tramo del recorrido
+        for i in range(len(orden) - 1):
+            for j in range(i + 1, len(orden)):
+                candidato = orden[:i] + orden[i:j + 1][::-1] + orden[j + 1:]
+                coste = coste_recorrido(matriz, candidato)
+                if coste < mejor_coste:
+                    orden, mejor_coste, mejora = candidato, coste, True
+
+        # Or-opt: mover un bloque de 1 a 3 puntos consecutivos a otra posición
+        for longitud in (1, 2, 3):
+            for i in range(len(orden) - longitud + 1):
+                bloque = orden[i:i + longitud]
+                resto = orden[:i] + orden[i + longitud:]
+                for j in range(len(resto) + 1):
+                    if j == i:
+                        continue
+                    candidato = resto[:j] + bloque + resto[j:]
+                    coste = coste_recorrido(matriz, candidato)
+                    if coste < mejor_coste:
+                        orden, mejor_coste, mejora = candidato, coste, True
+                        break
+    return orden
@@ -0,0 +1,172 @@
+"""
+Módulo para precalentar la caché de geocodificación con las rutas guardadas.
+
+Recorre los archivos JSON de la carpeta 'rutas/', extrae las direcciones de su
+origen, destino y puntos intermedios y las geocodifica una a una, de modo que
+tras un despliegue las primeras peticiones encuentran la caché ya llena en
+lugar de esperar a Nominatim por cada dirección.
+
+Las direcciones ya presentes en la caché o en el nomenclátor no generan
+ninguna consulta. Las demás se consultan de una en una a través del
+limitador de tasa compartido, por lo que el precalentamiento nunca reserva más
+de un turno por delante de las peticiones de los usuarios.
+
+Cuando la aplicación se sirve con varios procesos, cada uno importa miapp.py,
+pero solo el que consigue el bloqueo de ARCHIVO_BLOQUEO hace el
+precalentamiento; los demás lo omiten. Para lanzarlo a mano:
+
+    python precalentamiento_geocodificacion.py [directorio_rutas]
+
+"""
+
+import os
+import re
+import sys
+import json
+import threading
+from typing import List, Optional
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+from geocodificador import Geocodificador
+from normalizacion_direcciones import clave_canonica
+
+# Archivo cuyo bloqueo reparte el precalentamiento entre los procesos de la aplicación
+ARCHIVO_BLOQUEO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "precalentamiento_geocodificacion.lock")
+
+# Nombres que son coordenadas escritas como texto, p. ej. "(38.345, -0.49)"
+_COORDENADAS = re.compile(r"^\s*[\(\[]?\s*-?\d+(\.\d+)?\s*,\s*-?\d+(\.\d+)?\s*[\)\]]?\s*$")
+
+
+def direcciones_de_rutas(directorio: str = "rutas") -> List[str]:
+    """
+    Extrae las direcciones distintas de las rutas guardadas en un directorio.
+
+    Parameters
+    ----------
+    directorio : str, optional
+        Carpeta con los archivos JSON de las rutas, por defecto 'rutas'.
+
+    Returns
+    -------
+    List[str]
+        Direcciones de origen, destino y puntos intermedios, sin repetidas
+        (por clave canónica) ni coordenadas escritas como texto.
+    """
+    direcciones: List[str] = []
+    vistas = set()
+    if not os.path.exists(directorio):
+        return direcciones
+
+    for nombre_archivo in sorted(os.listdir(directorio)):
+        if not nombre_archivo.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directorio, nombre_archivo), "r", encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+        except Exception:
+            continue
+        if not isinstance(datos, dict):
+            continue
+
+        intermedios = datos.get("puntos_intermedios")
+        candidatas = [datos.get("origen"), datos.get("destino")]
+        candidatas += intermedios if isinstance(intermedios, list) else []
+        for direccion in candidatas:
+            if not isinstance(direccion, str) or not direccion.strip() or _COORDENADAS.match(direccion):
+                continue
+            clave = clave_canonica(direccion)
+            if clave not in vistas:
+                vistas.add(clave)
+                direcciones.append(direccion)
+    return direcciones
+
+
+def precalentar_cache(directorio: str = "rutas", geocodificador: Optional[Geocodificador] = None) -> int:
+    """
+    Geocodifica las direcciones de las rutas guardadas para dejarlas en la caché.
+
+    Parameters
+    ----------
+    directorio : str, optional
+        Carpeta con los archivos JSON de las rutas, por defecto 'rutas'.
+    geocodificador : Geocodificador, optional
+        Geocodificador usado, por defecto uno nuevo con la caché compartida.
+
+    Returns
+    -------
+    int
+        Número de direcciones encontradas (con coordenadas) de las procesadas.
+    """
+    geocodificador = geocodificador if geocodificador is not None else Geocodificador()
+    encontradas = 0
+    for direccion in direcciones_de_rutas(directorio):
+        if geocodificador.obtener_coordenadas(direccion) is not None:
+            encontradas += 1
+    return encontradas
+
+
+def _tomar_bloqueo(archivo_bloqueo: str) -> Optional[int]:
+    """
+    Toma sin esperar el bloqueo exclusivo del archivo indicado.
+
+    Returns
+    -------
+    Optional[int]
+        Descriptor del archivo, que mantiene el bloqueo hasta cerrarse, o None
+        si el bloqueo lo tiene otro proceso.
+    """
+    descriptor = os.open(archivo_bloqueo, os.O_CREAT | os.O_RDWR, 0o644)
+    if fcntl is None:
+        return descriptor
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(descriptor)
+        return None
+    return descriptor
+
+
+def iniciar_precalentamiento(directorio: str = "rutas",
+                             archivo_bloqueo: str = ARCHIVO_BLOQUEO) -> Optional[threading.Thread]:
+    """
+    Lanza el precalentamiento de la caché en un hilo en segundo plano.
+
+    Solo se lanza si ningún otro proceso lo está haciendo: el hilo mantiene el
+    bloqueo del archivo indicado mientras dura el precalentamiento.
+
+    Parameters
+    ----------
+    directorio : str, optional
+        Carpeta con los archivos JSON de las rutas, por defecto 'rutas'.
+    archivo_bloqueo : str, optional
+        Archivo de bloqueo compartido por los procesos, por defecto ARCHIVO_BLOQUEO.
+
+    Returns
+    -------
+    Optional[threading.Thread]
+        Hilo (daemon) que hace el precalentamiento, o None si ya lo hace otro proceso.
+    """
+    descriptor = _tomar_bloqueo(archivo_bloqueo)
+    if descriptor is None:
+        print("ℹ️ La caché de geocodificación ya se está precalentando en otro proceso")
+        return None
+
+    def tarea() -> None:
+        try:
+            encontradas = precalentar_cache(directorio)
+            print(f"✅ Caché de geocodificación precalentada: {encontradas} direcciones")
+        except Exception as e:
+            print(f"❌ Error al precalentar la caché de geocodificación: {str(e)}")
+        finally:
+            os.close(descriptor)
+
+    hilo = threading.Thread(target=tarea, name="precalentamiento_geocodificacion", daemon=True)
+    hilo.start()
+    return hilo
+
+
+if __name__ == "__main__":
+    directorio_rutas = sys.argv[1] if len(sys.argv) > 1 else "rutas"
+    print(f"Direcciones encontradas: {precalentar_cache(directorio_rutas)}")
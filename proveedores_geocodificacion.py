@@ -0,0 +1,276 @@
+"""
+Módulo con los proveedores de geocodificación usados por el Geocodificador.
+
+Cada proveedor sabe convertir una dirección de Alicante en coordenadas, de
+forma síncrona y asíncrona. El Geocodificador añade por encima la caché, el
+nomenclátor y el limitador de tasa, de modo que el proveedor se puede cambiar
+sin tocar el resto de la aplicación:
+
+- ProveedorNominatim: servicio Nominatim de OpenStreetMap (por defecto).
+- ProveedorNomenclator: nomenclátor local, sin ninguna petición de red.
+- ProveedorServidorLocal: servidor HTTP local compatible con Nominatim (ver
+  servidor_geocodificacion_local.py), para pruebas y ensayos de carga sin conexión.
+
+El proveedor por defecto de todo el proceso se cambia con
+establecer_proveedor_por_defecto().
+
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Tuple
+from geopy.adapters import AioHTTPAdapter
+from geopy.geocoders import Nominatim
+from geopy.location import Location
+from cache_geocodificacion import PROVEEDOR_NOMINATIM
+from limitador import LimitadorTasa, limitador_nominatim
+from nomenclator import Nomenclator, obtener_nomenclator
+
+# Dominio del servicio público de Nominatim
+DOMINIO_NOMINATIM = "nominatim.openstreetmap.org"
+
+# Dirección (host:puerto) por defecto del servidor de geocodificación local
+DIRECCION_SERVIDOR_LOCAL = "127.0.0.1:8088"
+
+
+class ProveedorGeocodificacionInterface(ABC):
+    """
+    Interfaz abstracta para los proveedores de geocodificación.
+
+    Esta interfaz define el contrato que deben implementar todos los proveedores.
+
+    Attributes
+    ----------
+    nombre : str
+        Identificador del proveedor; forma parte de la clave de la caché de
+        geocodificación, para que sus resultados no se mezclen con los de otros.
+    limitador : LimitadorTasa or None
+        Limitador de tasa que exige el servicio, o None si no tiene cuota.
+
+    Methods
+    -------
+    geocodificar(direccion: str) -> Optional[Tuple[float, float]]
+        Obtiene las coordenadas de una dirección
+    cliente_async()
+        Abre el cliente que se comparte entre varias consultas asíncronas
+    geocodificar_async(direccion: str, cliente) -> Optional[Tuple[float, float]]
+        Obtiene las coordenadas de una dirección sin bloquear el bucle de eventos
+    """
+
+    limitador: Optional[LimitadorTasa] = None
+
+    @property
+    def nombre(self) -> str:
+        return type(self).__name__
+
+    @abstractmethod
+    def geocodificar(self, direccion: str) -> Optional[Tuple[float, float]]:
+        """
+        Obtiene las coordenadas de una dirección de Alicante.
+
+        Parameters
+        ----------
+        direccion : str
+            Dirección a geocodificar
+
+        Returns
+        -------
+        Optional[Tuple[float, float]]
+            Tupla (latitud, longitud) o None si no se encuentra
+
+        Raises
+        ------
+        Exception
+            Si hay un error al consultar el servicio
+        """
+        pass
+
+    @asynccontextmanager
+    async def cliente_async(self) -> AsyncIterator[Any]:
+        """
+        Abre el cliente que se pasa a geocodificar_async() y lo cierra al terminar.
+
+        Por defecto el cliente es el propio proveedor.
+        """
+        yield self
+
+    async def geocodificar_async(self, direccion: str, cliente: Any) -> Optional[Tuple[float, float]]:
+        """
+        Obtiene las coordenadas de una dirección sin bloquear el bucle de eventos.
+
+        Por defecto ejecuta geocodificar() en un hilo aparte.
+
+        Parameters
+        ----------
+        direccion : str
+            Dirección a geocodificar
+        cliente : Any
+            Cliente abierto con cliente_async()
+
+        Returns
+        -------
+        Optional[Tuple[float, float]]
+            Tupla (latitud, longitud) o None si no se encuentra
+        """
+        return await asyncio.to_thread(self.geocodificar, direccion)
+
+
+class ProveedorNominatim(ProveedorGeocodificacionInterface):
+    """
+    Proveedor que consulta el servicio Nominatim de OpenStreetMap.
+
+    Attributes
+    ----------
+    user_agent : str
+        Nombre para las peticiones a Nominatim
+    timeout : int
+        Tiempo máximo de espera en segundos
+    dominio : str
+        Dominio (y puerto) del servicio
+    esquema : str
+        "https" o "http"
+    geolocator : Nominatim
+        Cliente síncrono de geopy
+    limitador : LimitadorTasa or None
+        Limitador de tasa aplicado a las consultas
+    """
+
+    def __init__(self, user_agent: str = "PII_UA", timeout: int = 10,
+                 dominio: str = DOMINIO_NOMINATIM, esquema: str = "https",
+                 limitador: Optional[LimitadorTasa] = limitador_nominatim) -> None:
+        """
+        Inicializa el proveedor de Nominatim.
+
+        Parameters
+        ----------
+        user_agent : str, optional
+            Nombre para las peticiones a Nominatim, por defecto "PII_UA"
+        timeout : int, optional
+            Tiempo máximo de espera en segundos, por defecto 10
+        dominio : str, optional
+            Dominio del servicio, por defecto el público de OpenStreetMap
+        esquema : str, optional
+            Esquema de las peticiones, por defecto "https"
+        limitador : LimitadorTasa, optional
+            Limitador de tasa, por defecto el de Nominatim compartido por todo el proceso
+        """
+        self.user_agent: str = user_agent
+        self.timeout: int = timeout
+        self.dominio: str = dominio
+        self.esquema: str = esquema
+        self.limitador: Optional[LimitadorTasa] = limitador
+        self.geolocator: Nominatim = Nominatim(user_agent=user_agent, timeout=timeout,
+                                               domain=dominio, scheme=esquema)
+
+    @property
+    def nombre(self) -> str:
+        # Solo el servicio público comparte las entradas sin prefijo de la caché
+        if (self.esquema, self.dominio) == ("https", DOMINIO_NOMINATIM):
+            return PROVEEDOR_NOMINATIM
+        return f"nominatim:{self.esquema}://{self.dominio}"
+
+    def geocodificar(self, direccion: str) -> Optional[Tuple[float, float]]:
+        ubicacion: Optional[Location] = self.geolocator.geocode(self._consulta(direccion))
+        return (ubicacion.latitude, ubicacion.longitude) if ubicacion else None
+
+    def cliente_async(self) -> Nominatim:
+        # Cliente de Nominatim sobre aiohttp; debe usarse con "async with" para cerrar su sesión
+        return Nominatim(user_agent=self.user_agent, timeout=self.timeout, domain=self.dominio,
+                         scheme=self.esquema, adapter_factory=AioHTTPAdapter)
+
+    async def geocodificar_async(self, direccion: str, cliente: Nominatim) -> Optional[Tuple[float, float]]:
+        ubicacion: Optional[Location] = await cliente.geocode(self._consulta(direccion))
+        return (ubicacion.latitude, ubicacion.longitude) if ubicacion else None
+
+    @staticmethod
+    def _consulta(direccion: str) -> str:
+        return f"{direccion}, Alicante, Spain"
+
+
+class ProveedorNomenclator(ProveedorGeocodificacionInterface):
+    """
+    Proveedor que solo consulta el nomenclátor local, sin ninguna petición de red.
+
+    Attributes
+    ----------
+    nomenclator : Nomenclator or None
+        Nomenclátor consultado; si es None se usa el de Alicante compartido por el proceso
+    """
+
+    def __init__(self, nomenclator: Optional[Nomenclator] = None) -> None:
+        """
+        Inicializa el proveedor del nomenclátor.
+
+        Parameters
+        ----------
+        nomenclator : Nomenclator, optional
+            Nomenclátor local, por defecto el de Alicante compartido por todo el proceso
+        """
+        self.nomenclator: Optional[Nomenclator] = nomenclator
+
+    @property
+    def nombre(self) -> str:
+        return "nomenclator"
+
+    def geocodificar(self, direccion: str) -> Optional[Tuple[float, float]]:
+        nomenclator = self.nomenclator if self.nomenclator is not None else obtener_nomenclator()
+        return nomenclator.buscar(direccion) if nomenclator is not None else None
+
+    async def geocodificar_async(self, direccion: str, cliente: Any) -> Optional[Tuple[float, float]]:
+        # La búsqueda es local y no bloquea, no hace falta otro hilo
+        return self.geocodificar(direccion)
+
+
+class ProveedorServidorLocal(ProveedorNominatim):
+    """
+    Proveedor que consulta un servidor de geocodificación local compatible con Nominatim.
+
+    No aplica ningún limitador de tasa, de modo que sirve para medir la
+    aplicación con muchas consultas concurrentes.
+    """
+
+    def __init__(self, direccion: str = DIRECCION_SERVIDOR_LOCAL, timeout: int = 10) -> None:
+        """
+        Inicializa el proveedor del servidor local.
+
+        Parameters
+        ----------
+        direccion : str, optional
+            Host y puerto del servidor, por defecto DIRECCION_SERVIDOR_LOCAL
+        timeout : int, optional
+            Tiempo máximo de espera en segundos, por defecto 10
+        """
+        super().__init__(timeout=timeout, dominio=direccion, esquema="http", limitador=None)
+
+    @property
+    def nombre(self) -> str:
+        return f"servidor_local:{self.dominio}"
+
+
+_proveedor_por_defecto: Optional[ProveedorGeocodificacionInterface] = None
+
+
+def establecer_proveedor_por_defecto(proveedor: Optional[ProveedorGeocodificacionInterface]) -> None:
+    """
+    Cambia el proveedor que usan los Geocodificador creados sin indicar uno.
+
+    Parameters
+    ----------
+    proveedor : ProveedorGeocodificacionInterface or None
+        Proveedor para todo el proceso, o None para volver a Nominatim.
+    """
+    global _proveedor_por_defecto
+    _proveedor_por_defecto = proveedor
+
+
+def obtener_proveedor_por_defecto() -> Optional[ProveedorGeocodificacionInterface]:
+    """
+    Devuelve el proveedor establecido para todo el proceso.
+
+    Returns
+    -------
+    Optional[ProveedorGeocodificacionInterface]
+        Proveedor por defecto, o None si se usa Nominatim.
+    """
+    return _proveedor_por_defecto
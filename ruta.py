@@ -1,12 +1,243 @@
 import json
 from datetime import datetime
-from typing import List, Optional
-import osmnx as ox
-import networkx as nx
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
 import time
+import numpy as np
 from geocodificador import Geocodificador
+from normalizacion_direcciones import clave_canonica
+from grafo_cache import almacen_grafos
+from grafo_compacto import GrafoCompacto
+from artefactos import GeometriaRuta
+from exportacion import FORMATOS_EXPORTACION, planificador_exportacion
+from optimizador_orden import ordenar_intermedios
+from trazas import etapa
 from utils import *
 
+# Velocidad media (km/h) usada para estimar el tiempo de cada tramo según el modo de transporte
+VELOCIDAD_TRAMO = {'walk': 5, 'bike': 15, 'drive': 60}
+
+
+def direccion_de_punto(punto) -> Optional[str]:
+    """
+    Devuelve la dirección que hay que geocodificar para un punto, si la hay.
+
+    Parameters
+    ----------
+    punto : str, tuple, list or dict
+        Dirección, par (lat, lon) o diccionario con 'lat' y 'lng' o con 'direccion'.
+
+    Returns
+    -------
+    Optional[str]
+        Dirección del punto, o None si ya trae sus coordenadas.
+    """
+    if isinstance(punto, str):
+        return punto
+    if isinstance(punto, dict) and not ('lat' in punto and 'lng' in punto) and 'direccion' in punto:
+        return punto['direccion']
+    return None
+
+
+def eliminar_repetidos(puntos: list) -> list:
+    """
+    Quita de una lista de puntos los que repiten una dirección o unas coordenadas anteriores.
+
+    Las direcciones se comparan por su clave canónica, de modo que "Plaza de
+    los Luceros" y "Pl. Luceros" cuentan como el mismo punto.
+
+    Parameters
+    ----------
+    puntos : list
+        Puntos como direcciones, pares (lat, lon) o diccionarios.
+
+    Returns
+    -------
+    list
+        Los puntos sin repetidos, en su orden original.
+    """
+    vistos = set()
+    resultado = []
+    for punto in puntos:
+        direccion = direccion_de_punto(punto)
+        if direccion is not None:
+            clave = clave_canonica(direccion)
+        elif isinstance(punto, dict):
+            clave = (punto.get('lat'), punto.get('lng'))
+        else:
+            clave = tuple(punto) if isinstance(punto, (tuple, list)) else punto
+        if clave not in vistos:
+            vistos.add(clave)
+            resultado.append(punto)
+    return resultado
+
+
+def resolver_puntos(puntos: list, geocodificador: Geocodificador) -> List[Optional[Tuple[float, float]]]:
+    """
+    Obtiene las coordenadas de varios puntos geocodificando sus direcciones en un solo lote.
+
+    Parameters
+    ----------
+    puntos : list
+        Puntos como direcciones, pares (lat, lon) o diccionarios con 'lat' y
+        'lng' o con 'direccion'.
+    geocodificador : Geocodificador
+        Geocodificador usado para las direcciones.
+
+    Returns
+    -------
+    List[Optional[Tuple[float, float]]]
+        Coordenadas (latitud, longitud) de cada punto, o None si no se pueden obtener.
+    """
+    direcciones = [d for d in map(direccion_de_punto, puntos) if d is not None]
+    resueltas = geocodificador.obtener_coordenadas_lote(direcciones) if direcciones else {}
+
+    coordenadas: List[Optional[Tuple[float, float]]] = []
+    for punto in puntos:
+        direccion = direccion_de_punto(punto)
+        if direccion is not None:
+            coordenadas.append(resueltas[direccion])
+        elif isinstance(punto, (tuple, list)) and len(punto) == 2 and all(isinstance(x, (float, int)) for x in punto):
+            coordenadas.append((float(punto[0]), float(punto[1])))
+        elif isinstance(punto, dict) and 'lat' in punto and 'lng' in punto:
+            coordenadas.append((float(punto['lat']), float(punto['lng'])))
+        else:
+            coordenadas.append(None)
+    return coordenadas
+
+
+def nombrar_puntos(puntos: list, coordenadas: List[Tuple[float, float]],
+                   geocodificador: Geocodificador) -> List[str]:
+    """
+    Obtiene un nombre legible para cada punto de una ruta.
+
+    Los puntos con dirección conservan su dirección; los que solo traen
+    coordenadas se nombran con la calle o lugar más cercano mediante una única
+    geocodificación inversa local y, si no hay ninguno cerca, con sus coordenadas.
+
+    Parameters
+    ----------
+    puntos : list
+        Puntos como direcciones, pares (lat, lon) o diccionarios.
+    coordenadas : List[Tuple[float, float]]
+        Coordenadas ya resueltas de cada punto.
+    geocodificador : Geocodificador
+        Geocodificador usado para la búsqueda inversa.
+
+    Returns
+    -------
+    List[str]
+        Nombre de cada punto, en el mismo orden.
+    """
+    direcciones = [(p.get('direccion') or None) if isinstance(p, dict) else direccion_de_punto(p) for p in puntos]
+    sin_nombre = [i for i, d in enumerate(direcciones) if d is None]
+    cercanos = geocodificador.obtener_nombres([coordenadas[i] for i in sin_nombre]) if sin_nombre else []
+    for i, nombre in zip(sin_nombre, cercanos):
+        direcciones[i] = nombre or str(coordenadas[i])
+    return direcciones
+
+
+def geocodificar_puntos(puntos: list, geocodificador: Geocodificador) -> list:
+    """
+    Sustituye las direcciones de una lista de puntos por diccionarios ya geocodificados.
+
+    Permite geocodificar una sola vez una lista de direcciones que se va a
+    reutilizar en varias rutas.
+
+    Parameters
+    ----------
+    puntos : list
+        Puntos como direcciones, pares (lat, lon) o diccionarios.
+    geocodificador : Geocodificador
+        Geocodificador usado para las direcciones.
+
+    Returns
+    -------
+    list
+        Los mismos puntos, con cada dirección encontrada convertida en un
+        diccionario {'direccion', 'lat', 'lng'}. Los puntos no encontrados se
+        devuelven sin cambios.
+    """
+    resultado = []
+    for punto, coordenadas in zip(puntos, resolver_puntos(puntos, geocodificador)):
+        direccion = direccion_de_punto(punto)
+        if direccion is not None and coordenadas is not None:
+            resultado.append({'direccion': direccion, 'lat': coordenadas[0], 'lng': coordenadas[1]})
+        else:
+            resultado.append(punto)
+    return resultado
+
+
+def calcular_matriz(origenes: list, destinos: list, modo_transporte: str = "walk") -> Dict[str, list]:
+    """
+    Calcula la matriz de distancias y tiempos entre N orígenes y M destinos.
+
+    Todos los puntos se ajustan a su nodo más cercano del grafo en caché y cada
+    fila se resuelve con una única búsqueda de uno a muchos desde su origen.
+
+    Parameters
+    ----------
+    origenes : list
+        Orígenes como direcciones, pares (lat, lon) o diccionarios.
+    destinos : list
+        Destinos en los mismos formatos que los orígenes.
+    modo_transporte : str, optional
+        "walk", "bike" o "drive", por defecto "walk".
+
+    Returns
+    -------
+    Dict[str, list]
+        Diccionario con las claves "distancias" (km) y "tiempos" (horas), cada
+        una una matriz N x M. Los pares sin camino valen None.
+
+    Raises
+    ------
+    ValueError
+        Si el modo de transporte no es válido, alguna lista está vacía o algún
+        punto no puede ser geocodificado.
+    """
+    if modo_transporte not in VELOCIDAD_TRAMO:
+        raise ValueError("Modo de transporte no válido. Usa 'walk', 'bike' o 'drive'.")
+    if not origenes or not destinos:
+        raise ValueError("Se necesita al menos un origen y un destino.")
+
+    puntos = resolver_puntos(list(origenes) + list(destinos), Geocodificador(asincrono=True))
+    if any(p is None for p in puntos):
+        raise ValueError("No se pudieron geocodificar todas las direcciones o las coordenadas no son válidas.")
+
+    grafo = almacen_grafos.obtener(modo_transporte, puntos)
+    nodos = grafo.nodos_mas_cercanos(puntos)
+    nodos_origen, nodos_destino = nodos[:len(origenes)], nodos[len(origenes):]
+
+    distancias: List[List[Optional[float]]] = []
+    tiempos: List[List[Optional[float]]] = []
+    for nodo in nodos_origen:
+        longitudes = grafo.distancias_desde(nodo, nodos_destino)
+        fila = [longitudes[d] / 1000 if d in longitudes else None for d in nodos_destino]
+        distancias.append(fila)
+        tiempos.append([d / VELOCIDAD_TRAMO[modo_transporte] if d is not None else None for d in fila])
+
+    return {"distancias": distancias, "tiempos": tiempos}
+
+
+@dataclass
+class Tramo:
+    """
+    Resultado del cálculo de un tramo entre dos puntos consecutivos de la ruta.
+
+    Attributes
+    ----------
+    nodos : List[int]
+        Nodos del grafo que forman el camino del tramo.
+    distancia_km : float
+        Longitud del tramo en kilómetros.
+    tiempo_horas : float
+        Tiempo estimado del tramo en horas.
+    """
+    nodos: List[int]
+    distancia_km: float
+    tiempo_horas: float
+
 class Ruta:
     """
     Clase que representa una ruta geográfica compuesta por un origen, puntos intermedios y un destino,
@@ -36,19 +267,25 @@ class Ruta:
         Lista de coordenadas de puntos intermedios.
     modo_transporte : str
         Modo de transporte: "walk", "bike" o "drive".
+    optimizar_orden : bool
+        Si es True, los puntos intermedios se visitan en el orden que minimiza la distancia.
     fecha_registro : datetime
         Fecha y hora de creación de la ruta.
-    grafo : nx.MultiDiGraph
-        Grafo de calles generado por OSMnx.
+    grafo : GrafoCompacto
+        Grafo compacto de calles construido a partir de OSMnx.
     rutas : list
         Lista de subrutas (cada una una lista de nodos).
     distancias : list
         Lista de distancias por tramo (en km).
     tiempos_estimados : list
         Lista de tiempos estimados por tramo (en horas).
+    tramos : list
+        Lista de tramos calculados (nodos, distancia y tiempo de cada uno).
     
     Methods
     -------
+    resolver_tramos()
+        Calcula el camino, la distancia y el tiempo de cada tramo una sola vez.
     calcular_distancia()
         Calcula la distancia total en km de la ruta.
     calcular_dificultad()
@@ -56,7 +293,11 @@ class Ruta:
     calcular_duracion()
         Calcula el tiempo estimado de recorrido.
     guardar_en_json()
-        Exporta la ruta a distintos formatos incluyendo JSON, GPX, PDF y HTML.
+        Guarda la ruta en JSON junto con su geometría, sin generar todavía sus archivos.
+    geometria()
+        Devuelve la geometría de la ruta, con la que se generan sus archivos.
+    exportar(formatos)
+        Devuelve los archivos de la ruta, generando bajo demanda los que falten.
     listar_rutas()
         Devuelve una lista de rutas almacenadas localmente.
     to_dict()
@@ -65,7 +306,8 @@ class Ruta:
 
     def __init__(self, nombre: str, ubicacion: tuple, distancia: float, duracion: float,
                  dificultad: str, alt_max: int, alt_min: int,
-                 origen, puntos_intermedios, destino, modo_transporte: str) -> None:
+                 origen, puntos_intermedios, destino, modo_transporte: str,
+                 optimizar_orden: bool = False) -> None:
         """
         Inicializa una nueva instancia de Ruta, obteniendo coordenadas y preparando atributos.
         Puede recibir strings (direcciones) o tuplas (lat, lon) para origen, destino y puntos intermedios.
@@ -94,6 +336,8 @@ class Ruta:
             Dirección final o coordenadas del punto de destino.
         modo_transporte : str
             "walk", "bike" o "drive".
+        optimizar_orden : bool, optional
+            Si es True, reordena los puntos intermedios para minimizar la distancia total.
             
         Raises
         ------
@@ -109,74 +353,127 @@ class Ruta:
         self.alt_min = alt_min
         self.fecha_registro = datetime.now()
         self.modo_transporte = modo_transporte
-        self.geocodificador: Geocodificador = Geocodificador()
-
-        # Función auxiliar local para obtener un nombre legible de una ubicación
-        def extraer_nombre(p):
-            if isinstance(p, dict):
-                return p.get('direccion') or str((p.get('lat'), p.get('lng')))
-            elif isinstance(p, str):
-                return p
-            elif isinstance(p, tuple) and len(p) == 2:
-                return str(p)
-            return str(p)
-        # Guardar los nombres legibles para origen, destino e intermedios
-        self.origen_nombre = extraer_nombre(origen)
-        self.destino_nombre = extraer_nombre(destino)
-        self.puntos_intermedios_nombres = [extraer_nombre(p) for p in puntos_intermedios]
-        
-        # Función auxiliar local para obtener coordenadas a partir de diferentes formatos de entrada
-        def obtener_coord(p):
-            if isinstance(p, tuple) and len(p) == 2 and all(isinstance(x, (float, int)) for x in p):
-                return p
-            elif isinstance(p, dict):
-                if 'lat' in p and 'lng' in p:
-                    return (float(p['lat']), float(p['lng']))
-                elif 'direccion' in p:
-                    return self.geocodificador.obtener_coordenadas(p['direccion'])
-            elif isinstance(p, str):
-                return self.geocodificador.obtener_coordenadas(p)
-            return None
-        
-        # Obtener coordenadas geográficas del origen, destino y puntos intermedios
-        self.origen = obtener_coord(origen)
-        self.destino = obtener_coord(destino)
-        self.puntos_intermedios = [obtener_coord(p) for p in puntos_intermedios]
+        self.optimizar_orden = optimizar_orden
+        self.geocodificador: Geocodificador = Geocodificador(asincrono=True)
+
+        # Obtener en un solo lote las coordenadas del origen, destino y puntos intermedios
+        puntos = [origen] + list(puntos_intermedios) + [destino]
+        with etapa("geocodificacion"):
+            coordenadas = resolver_puntos(puntos, self.geocodificador)
+        self.origen = coordenadas[0]
+        self.destino = coordenadas[-1]
+        self.puntos_intermedios = coordenadas[1:-1]
 
         # Validar que ningún punto sea None
         if self.origen is None or self.destino is None or any(p is None for p in self.puntos_intermedios):
             raise ValueError("No se pudieron geocodificar todas las direcciones o las coordenadas no son válidas. Verifica los nombres de las calles o las coordenadas.")
+
+        # Guardar los nombres legibles para origen, destino e intermedios
+        with etapa("geocodificacion_inversa"):
+            nombres = nombrar_puntos(puntos, coordenadas, self.geocodificador)
+        self.origen_nombre = nombres[0]
+        self.destino_nombre = nombres[-1]
+        self.puntos_intermedios_nombres = nombres[1:-1]
         
         # Inicializar estructuras auxiliares y temporales
         self.timestamp = int(time.time())
-        self.grafo: Optional[nx.MultiDiGraph] = None
+        self.grafo: Optional[GrafoCompacto] = None
         self.nodos: List[int] = []
         self.rutas: List[List[int]] = []
         self.distancias: List[float] = []
         self.tiempos_estimados: List[float] = []
+        self.tramos: List[Tramo] = []
 
-    def calcular_distancia(self) -> float:
+    def resolver_tramos(self) -> List[Tramo]:
         """
-        Calcula la distancia total de la ruta usando el camino más corto entre cada par de puntos.
+        Calcula una sola vez el camino de cada tramo de la ruta.
+
+        Ajusta todos los puntos a su nodo más cercano del grafo y resuelve cada
+        tramo con una única búsqueda, que devuelve a la vez los nodos del camino,
+        su distancia y su tiempo estimado. El resultado se reutiliza para la
+        distancia total, el JSON y la geometría de la que salen las exportaciones.
 
         Returns
         -------
-        float
-            Distancia total en kilómetros.
+        List[Tramo]
+            Tramos consecutivos desde el origen hasta el destino.
+
+        Raises
+        ------
+        ValueError
+            Si algún tramo no tiene camino en el grafo.
+        """
+        puntos = [self.origen] + self.puntos_intermedios + [self.destino]
+        with etapa("grafo"):
+            self.grafo = almacen_grafos.obtener(self.modo_transporte, puntos)
+            # Si hay una jerarquía de contracción precalculada para el grafo se usa en lugar de A*
+            jerarquia = almacen_grafos.obtener_jerarquia(self.modo_transporte, puntos)
+        with etapa("ajuste_nodos"):
+            self.nodos = self.grafo.nodos_mas_cercanos(puntos)
+
+        # Caminos ya calculados al optimizar el orden, reutilizados como tramos
+        caminos: Dict[Tuple[int, int], Tuple[List[int], float]] = {}
+        if self.optimizar_orden and len(self.puntos_intermedios) > 1:
+            with etapa("orden_intermedios"):
+                caminos = self._ordenar_intermedios()
+
+        motor = jerarquia if jerarquia is not None else self.grafo
+
+        self.tramos = []
+        with etapa("caminos"):
+            for i in range(len(self.nodos) - 1):
+                par = (self.nodos[i], self.nodos[i + 1])
+                subruta, longitud = caminos[par] if par in caminos else motor.camino_mas_corto(*par)
+                distancia_km = longitud / 1000
+                self.tramos.append(Tramo(subruta, distancia_km, distancia_km / VELOCIDAD_TRAMO[self.modo_transporte]))
+
+        self.rutas = [t.nodos for t in self.tramos]
+        self.distancias = [t.distancia_km for t in self.tramos]
+        self.tiempos_estimados = [t.tiempo_horas for t in self.tramos]
+        return self.tramos
+
+    def _ordenar_intermedios(self) -> Dict[Tuple[int, int], Tuple[List[int], float]]:
+        """
+        Reordena los puntos intermedios para minimizar la distancia total de la ruta.
+
+        Calcula la matriz de distancias entre origen, intermedios y destino con
+        una búsqueda de uno a muchos por fila, y reordena en consecuencia los
+        puntos, sus nombres y sus nodos.
+
+        Returns
+        -------
+        Dict[Tuple[int, int], Tuple[List[int], float]]
+            Camino y longitud calculados para cada par de nodos (origen, destino).
         """
-        self.grafo = ox.graph_from_point(self.origen, dist=5000, network_type=self.modo_transporte)
+        caminos: Dict[Tuple[int, int], Tuple[List[int], float]] = {}
+        for nodo in self.nodos[:-1]:
+            for destino, camino in self.grafo.caminos_desde(nodo, self.nodos[1:]).items():
+                caminos[(nodo, destino)] = camino
 
-        nodo_origen = ox.nearest_nodes(self.grafo, self.origen[1], self.origen[0])
-        nodo_destino = ox.nearest_nodes(self.grafo, self.destino[1], self.destino[0])
-        nodos_intermedios = [ox.nearest_nodes(self.grafo, p[1], p[0]) for p in self.puntos_intermedios]
+        n = len(self.nodos)
+        matriz = [[caminos[(self.nodos[i], self.nodos[j])][1] if (self.nodos[i], self.nodos[j]) in caminos
+                   else float('inf') for j in range(n)] for i in range(n)]
+        orden = ordenar_intermedios(matriz)
 
-        ruta_nodos = [nodo_origen] + nodos_intermedios + [nodo_destino]
+        self.puntos_intermedios = [self.puntos_intermedios[i] for i in orden]
+        self.puntos_intermedios_nombres = [self.puntos_intermedios_nombres[i] for i in orden]
+        self.nodos = [self.nodos[0]] + [self.nodos[i + 1] for i in orden] + [self.nodos[-1]]
+        return caminos
 
-        distancia_total = 0
-        for i in range(len(ruta_nodos) - 1):
-            distancia_total += nx.shortest_path_length(self.grafo, ruta_nodos[i], ruta_nodos[i + 1], weight='length')
+    def calcular_distancia(self) -> float:
+        """
+        Calcula la distancia total de la ruta usando el camino más corto entre cada par de puntos.
 
-        return distancia_total / 1000
+        Los tramos solo se resuelven si no se han calculado antes.
+
+        Returns
+        -------
+        float
+            Distancia total en kilómetros.
+        """
+        if not self.tramos:
+            self.resolver_tramos()
+        return sum(t.distancia_km for t in self.tramos)
 
     def calcular_dificultad(self) -> str:
         """
@@ -216,7 +513,7 @@ class Ruta:
     def guardar_en_json(self) -> None:
         """
         Calcula propiedades de la ruta y guarda los datos en un archivo JSON.
-        Además, genera los archivos GPX, HTML, PDF y PNG correspondientes.
+        Además, guarda su geometría para generar bajo demanda los archivos GPX, HTML y PDF.
         """
         self.distancia = self.calcular_distancia()
         self.dificultad = self.calcular_dificultad()
@@ -240,37 +537,66 @@ class Ruta:
             "modo_transporte": self.modo_transporte
         }
 
-        with open(f"rutas/{self.nombre}.json", "w") as archivo:
+        with etapa("json"), open(f"rutas/{self.nombre}.json", "w") as archivo:
             json.dump(datos_ruta, archivo, indent=4, ensure_ascii=False)
 
-        # Cálculo de subrutas
-        nodo_origen = ox.nearest_nodes(self.grafo, self.origen[1], self.origen[0])
-        nodo_destino = ox.nearest_nodes(self.grafo, self.destino[1], self.destino[0])
-        nodos_intermedios = [ox.nearest_nodes(self.grafo, p[1], p[0]) for p in self.puntos_intermedios]
-        ruta_nodos = [nodo_origen] + nodos_intermedios + [nodo_destino]
-
-        self.rutas = []
-        self.distancias = []
-        self.tiempos_estimados = []
-
-        for i in range(len(ruta_nodos) - 1):
-            try:
-                subruta = nx.shortest_path(self.grafo, ruta_nodos[i], ruta_nodos[i + 1], weight='length')
-                self.rutas.append(subruta)
-
-                distancia_km = nx.shortest_path_length(self.grafo, ruta_nodos[i], ruta_nodos[i + 1], weight='length') / 1000
-                self.distancias.append(distancia_km)
-
-                velocidad = {'walk': 5, 'bike': 15, 'drive': 60}
-                tiempo_horas = distancia_km / velocidad[self.modo_transporte]
-                self.tiempos_estimados.append(tiempo_horas)
-            except Exception as e:
-                print(f" Error al calcular subruta: {e}")
-
-        # Exportaciones
-        exportar_gpx(self.rutas, self.grafo, self.nombre)
-        ruta_html = generar_mapa(self.origen, self.puntos_intermedios, self.destino, self.rutas, self.grafo, self.nombre)
-        exportar_pdf(self.distancias, self.tiempos_estimados, self.modo_transporte, self.nombre, self.origen_nombre, self.puntos_intermedios_nombres, self.destino_nombre)
+        with etapa("geometria"):
+            self.geometria().guardar()
+
+    def geometria(self) -> GeometriaRuta:
+        """
+        Devuelve la geometría de la ruta, con la que se generan sus archivos.
+
+        Returns
+        -------
+        GeometriaRuta
+            Coordenadas y elevación del camino de cada tramo, con las métricas y los nombres de la ruta.
+        """
+        if not self.tramos:
+            self.resolver_tramos()
+        # Coordenadas de todos los tramos con una sola indexación sobre los arrays del grafo
+        tramos = []
+        if self.rutas:
+            longitudes = [len(ruta) for ruta in self.rutas]
+            puntos = self.grafo.puntos(np.concatenate([np.asarray(ruta, dtype=np.int64) for ruta in self.rutas]))
+            tramos = np.split(puntos, np.cumsum(longitudes)[:-1])
+        return GeometriaRuta(
+            nombre=self.nombre,
+            modo_transporte=self.modo_transporte,
+            origen=tuple(self.origen),
+            puntos_intermedios=[tuple(p) for p in self.puntos_intermedios],
+            destino=tuple(self.destino),
+            origen_nombre=self.origen_nombre,
+            puntos_intermedios_nombres=list(self.puntos_intermedios_nombres),
+            destino_nombre=self.destino_nombre,
+            distancias=list(self.distancias),
+            tiempos_estimados=list(self.tiempos_estimados),
+            tramos=tramos,
+        )
+
+    def exportar(self, formatos=FORMATOS_EXPORTACION) -> Dict[str, str]:
+        """
+        Devuelve los archivos de la ruta, generando en paralelo los que falten.
+
+        Los archivos ya presentes en la caché de artefactos no se vuelven a
+        generar; se devuelve directamente su ruta.
+
+        Parameters
+        ----------
+        formatos : Iterable[str], optional
+            Formatos pedidos ("gpx", "html", "pdf"), por defecto todos.
+
+        Returns
+        -------
+        Dict[str, str]
+            Ruta en la caché del archivo de cada formato.
+
+        Raises
+        ------
+        RuntimeError
+            Si falla algún exportador.
+        """
+        return planificador_exportacion.exportar(self.geometria(), formatos)
 
 
     @staticmethod
@@ -1,4 +1,5 @@
-from ruta import Ruta
+from ruta import Ruta, eliminar_repetidos, geocodificar_puntos
+from geocodificador import Geocodificador
 import random
 import os
 from typing import List
@@ -38,10 +39,13 @@ class RutaAuto:
             Usuario al que asociar la ruta (opcional).
         """
         
-        # Se valida que haya al menos 2 direcciones
+        # Se quitan las direcciones repetidas y se valida que queden al menos 2
+        direcciones = eliminar_repetidos(direcciones)
         if len(direcciones) < 2:
             return ["Se necesitan al menos dos direcciones para generar rutas."]
 
+        # Se geocodifica cada dirección una sola vez para todas las rutas generadas
+        direcciones = geocodificar_puntos(direcciones, Geocodificador(asincrono=True))
 
         rutas_generadas = []
         
@@ -8,7 +8,8 @@ y puntos intermedios, generando los archivos necesarios.
 
 import random
 from ruta import Ruta
-from utils import exportar_pdf, exportar_gpx, generar_mapa
+from artefactos import archivo_publico
+from trazas import medir
 import json
 
 class RutaManual:
@@ -20,12 +21,13 @@ class RutaManual:
 
     Methods
     -------
-    crear_ruta_desde_datos(origen, puntos_intermedios, destino, modo, nombre, username)
+    crear_ruta_desde_datos(origen, puntos_intermedios, destino, modo, nombre, username, optimizar_orden)
         Crea una ruta con los datos proporcionados
     """
 
     @staticmethod
-    def crear_ruta_desde_datos(origen, puntos_intermedios, destino, modo, nombre=None, username=None):
+    @medir("crear_ruta")
+    def crear_ruta_desde_datos(origen, puntos_intermedios, destino, modo, nombre=None, username=None, optimizar_orden=False):
         """
         Crea una ruta con los datos proporcionados.
 
@@ -43,18 +45,18 @@ class RutaManual:
             Nombre de la ruta
         username : str, optional
             Usuario que crea la ruta
+        optimizar_orden : bool, optional
+            Si es True, reordena los puntos intermedios para minimizar la distancia
 
         Returns
         -------
         tuple
-            Nombres de los archivos generados (PDF, GPX, HTML)
+            Nombres de los archivos (PDF, GPX, HTML), que se generan al pedirlos por primera vez
 
         Raises
         ------
         ValueError
             Si el origen o destino son None
-        RuntimeError
-            Si hay un error al exportar los archivos
         """
         # Validaciones: solo verifica que no sean None
         if origen is None or destino is None:
@@ -76,7 +78,8 @@ class RutaManual:
             origen=origen,
             puntos_intermedios=puntos_intermedios,
             destino=destino,
-            modo_transporte=modo
+            modo_transporte=modo,
+            optimizar_orden=optimizar_orden
         )
 
         ruta.guardar_en_json()
@@ -95,14 +98,8 @@ class RutaManual:
                 json.dump(usuarios, f, indent=4, ensure_ascii=False)
                 f.truncate()
 
-        try:
-            pdf_filename = exportar_pdf(ruta.distancias, ruta.tiempos_estimados, ruta.modo_transporte, ruta.nombre, ruta.origen, ruta.puntos_intermedios, ruta.destino)
-            gpx_filename = exportar_gpx(ruta.rutas, ruta.grafo, ruta.timestamp)
-            html_filename = generar_mapa(ruta.origen, ruta.puntos_intermedios, ruta.destino, ruta.rutas, ruta.grafo, ruta.timestamp)
-        except Exception as e:
-            raise RuntimeError(f"Error al exportar archivos: {e}")
-
-        if not all([pdf_filename, gpx_filename, html_filename]):
-            raise ValueError("No se pudieron generar todos los archivos correctamente.")
-
+        # Los archivos se generan la primera vez que se piden, a partir de la geometría guardada
+        pdf_filename, gpx_filename, html_filename = (
+            f"static/{archivo_publico(ruta.nombre, formato)}" for formato in ("pdf", "gpx", "html")
+        )
         return pdf_filename, gpx_filename, html_filename
\ No newline at end of file
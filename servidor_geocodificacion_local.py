@@ -0,0 +1,182 @@
+"""
+Servidor HTTP local que imita la API de búsqueda de Nominatim para Alicante.
+
+Responde a las mismas peticiones que Nominatim (/search?q=...&format=json)
+con resultados predefinidos de los lugares más habituales de Alicante y, si
+existe, con el nomenclátor local (ver nomenclator.py). Permite probar y medir
+la creación de rutas a alta concurrencia sin conexión y sin cargar el servicio
+público. Para usarlo:
+
+    python servidor_geocodificacion_local.py [puerto] [retardo_en_segundos]
+
+y, en el proceso que crea las rutas:
+
+    establecer_proveedor_por_defecto(ProveedorServidorLocal("127.0.0.1:8088"))
+
+"""
+
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from cache_geocodificacion import clave_consulta
+from nomenclator import Nomenclator, obtener_nomenclator
+
+# Coordenadas aproximadas (latitud, longitud) de los lugares de Direcciones_para_probar.txt
+RESULTADOS_ALICANTE: Dict[str, Tuple[float, float]] = {
+    "Plaza de los Luceros": (38.3456, -0.4906),
+    "Playa del Postiguet": (38.3451, -0.4770),
+    "Avenida de Maisonnave": (38.3440, -0.4930),
+    "Mercado Central de Alicante": (38.3474, -0.4889),
+    "Hospital General Universitario de Alicante": (38.3620, -0.4880),
+    "Puerto de Alicante": (38.3390, -0.4840),
+    "Playa de la Albufereta": (38.3640, -0.4430),
+    "Parque de Canalejas": (38.3420, -0.4830),
+    "Avenida de la Rambla": (38.3455, -0.4840),
+    "El Corte Inglés": (38.3430, -0.4950),
+    "Calle San Vicente": (38.3480, -0.4920),
+    "Plaza de Toros de Alicante": (38.3490, -0.4880),
+    "Centro Comercial Gran Vía Alicante": (38.3590, -0.5020),
+    "Museo de Arte Contemporáneo de Alicante": (38.3454, -0.4812),
+    "Avenida de la Constitución": (38.3460, -0.4860),
+    "Calle del Teatro": (38.3470, -0.4860),
+    "Museo Arqueológico de Alicante": (38.3585, -0.4780),
+}
+
+# Sufijo que el proveedor de Nominatim añade a cada consulta, en forma canónica
+SUFIJO_CONSULTA = " alicante spain"
+
+
+class ManejadorGeocodificacion(BaseHTTPRequestHandler):
+    """
+    Manejador de las peticiones de búsqueda, con el formato de respuesta de Nominatim.
+
+    Attributes
+    ----------
+    server : ServidorGeocodificacion
+        Servidor que atiende la petición, con los resultados disponibles.
+    """
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/search":
+            self.send_error(404)
+            return
+
+        consulta = parse_qs(url.query).get("q", [""])[0]
+        coordenadas = self.server.buscar(consulta)
+        if self.server.retardo > 0:
+            time.sleep(self.server.retardo)
+
+        lugares: List[dict] = []
+        if coordenadas is not None:
+            lugares.append({"lat": str(coordenadas[0]), "lon": str(coordenadas[1]), "display_name": consulta})
+        cuerpo = json.dumps(lugares).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato: str, *args) -> None:
+        # Sin una línea por petición, que en los ensayos de carga domina el tiempo
+        pass
+
+
+class ServidorGeocodificacion(ThreadingHTTPServer):
+    """
+    Servidor HTTP multihilo con resultados de geocodificación de Alicante.
+
+    Attributes
+    ----------
+    resultados : Dict[str, Tuple[float, float]]
+        Coordenadas de cada dirección, por clave de consulta.
+    nomenclator : Nomenclator or None
+        Nomenclátor consultado para las direcciones sin resultado predefinido.
+    retardo : float
+        Segundos que se espera antes de cada respuesta, para simular la red.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, direccion: Tuple[str, int],
+                 resultados: Optional[Dict[str, Tuple[float, float]]] = None,
+                 nomenclator: Optional[Nomenclator] = None, retardo: float = 0.0) -> None:
+        """
+        Inicializa el servidor.
+
+        Parameters
+        ----------
+        direccion : Tuple[str, int]
+            Host y puerto en los que escuchar (puerto 0 para uno libre).
+        resultados : Dict[str, Tuple[float, float]], optional
+            Resultados predefinidos, por defecto RESULTADOS_ALICANTE.
+        nomenclator : Nomenclator, optional
+            Nomenclátor adicional, por defecto el de Alicante si existe.
+        retardo : float, optional
+            Retardo de cada respuesta en segundos, por defecto 0.
+        """
+        super().__init__(direccion, ManejadorGeocodificacion)
+        resultados = resultados if resultados is not None else RESULTADOS_ALICANTE
+        self.resultados: Dict[str, Tuple[float, float]] = {clave_consulta(d): c for d, c in resultados.items()}
+        self.nomenclator: Optional[Nomenclator] = nomenclator if nomenclator is not None else obtener_nomenclator()
+        self.retardo: float = retardo
+
+    def buscar(self, consulta: str) -> Optional[Tuple[float, float]]:
+        """
+        Busca una consulta de Nominatim entre los resultados disponibles.
+
+        Parameters
+        ----------
+        consulta : str
+            Consulta recibida, con o sin el sufijo ", Alicante, Spain".
+
+        Returns
+        -------
+        Optional[Tuple[float, float]]
+            Coordenadas (latitud, longitud), o None si no se conoce la dirección.
+        """
+        clave = clave_consulta(consulta)
+        if clave.endswith(SUFIJO_CONSULTA):
+            clave = clave[:-len(SUFIJO_CONSULTA)]
+        if clave in self.resultados:
+            return self.resultados[clave]
+        return self.nomenclator.buscar(clave) if self.nomenclator is not None else None
+
+
+def iniciar_servidor(host: str = "127.0.0.1", puerto: int = 0, retardo: float = 0.0,
+                     nomenclator: Optional[Nomenclator] = None) -> ServidorGeocodificacion:
+    """
+    Arranca el servidor en un hilo en segundo plano.
+
+    Parameters
+    ----------
+    host : str, optional
+        Host en el que escuchar, por defecto "127.0.0.1".
+    puerto : int, optional
+        Puerto en el que escuchar, por defecto 0 (uno libre).
+    retardo : float, optional
+        Retardo de cada respuesta en segundos, por defecto 0.
+    nomenclator : Nomenclator, optional
+        Nomenclátor adicional, por defecto el de Alicante si existe.
+
+    Returns
+    -------
+    ServidorGeocodificacion
+        Servidor en marcha; su puerto está en server_address y se detiene con shutdown().
+    """
+    servidor = ServidorGeocodificacion((host, puerto), nomenclator=nomenclator, retardo=retardo)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    puerto = int(sys.argv[1]) if len(sys.argv) > 1 else 8088
+    retardo = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    servidor = ServidorGeocodificacion(("127.0.0.1", puerto), retardo=retardo)
+    print(f"Servidor de geocodificación local en http://127.0.0.1:{puerto}/search")
+    servidor.serve_forever()
@@ -0,0 +1,146 @@
+"""
+Módulo con la simplificación de polilíneas (Douglas-Peucker) de las rutas.
+
+Los caminos de las rutas traen todos los nodos del grafo, muchos de ellos
+alineados a lo largo de la misma calle, lo que hace pesados los mapas HTML de
+las rutas largas. Aquí se eliminan los puntos que se desvían menos de una
+tolerancia en metros de la línea simplificada.
+
+El algoritmo se ejecuta una sola vez por tramo y calcula la "importancia" de
+cada punto: la mayor tolerancia con la que Douglas-Peucker lo conservaría.
+Cualquier nivel de detalle (el del mapa HTML o el del GPX ligero) se obtiene
+después comparando esa importancia con la tolerancia, sin repetir el
+algoritmo. El resultado es idéntico al de Douglas-Peucker clásico con esa
+tolerancia.
+
+"""
+
+import math
+import numpy as np
+
+# Metros por grado de latitud
+METROS_POR_GRADO = 111320
+
+# Metros por píxel en el ecuador con zoom 0 en las teselas de OpenStreetMap (256 px)
+METROS_POR_PIXEL_ZOOM_0 = 156543.03392
+
+# Zoom con el que se abre el mapa HTML de las rutas
+ZOOM_INICIAL_MAPA = 14
+
+# Desviación máxima admitida en píxeles de pantalla: por debajo de medio píxel no se aprecia
+PIXELES_TOLERANCIA = 0.5
+
+# Tolerancia del GPX ligero, del orden de la precisión de un GPS
+TOLERANCIA_GPX_LIGERO_M = 5.0
+
+
+def metros_por_pixel(zoom: int, latitud: float) -> float:
+    """
+    Devuelve los metros que ocupa un píxel del mapa con un nivel de zoom.
+
+    Parameters
+    ----------
+    zoom : int
+        Nivel de zoom de las teselas.
+    latitud : float
+        Latitud a la que se mide.
+
+    Returns
+    -------
+    float
+        Metros por píxel.
+    """
+    return METROS_POR_PIXEL_ZOOM_0 * math.cos(math.radians(latitud)) / 2 ** zoom
+
+
+def tolerancia_para_zoom(zoom: int, latitud: float, pixeles: float = PIXELES_TOLERANCIA) -> float:
+    """
+    Devuelve la tolerancia en metros que no es visible con un nivel de zoom.
+
+    Parameters
+    ----------
+    zoom : int
+        Nivel de zoom de las teselas.
+    latitud : float
+        Latitud de la ruta.
+    pixeles : float, optional
+        Desviación admitida en píxeles, por defecto PIXELES_TOLERANCIA.
+
+    Returns
+    -------
+    float
+        Tolerancia en metros.
+    """
+    return pixeles * metros_por_pixel(zoom, latitud)
+
+
+def importancia_puntos(puntos: np.ndarray) -> np.ndarray:
+    """
+    Calcula la importancia de cada punto de una polilínea según Douglas-Peucker.
+
+    La importancia de un punto es la mayor tolerancia (en metros) con la que
+    Douglas-Peucker lo conserva: su distancia al segmento que lo contiene,
+    limitada por la importancia del punto que partió ese segmento. Los
+    extremos tienen importancia infinita.
+
+    Parameters
+    ----------
+    puntos : np.ndarray
+        Array (n, 2) o (n, 3) cuyas dos primeras columnas son latitud y longitud.
+
+    Returns
+    -------
+    np.ndarray
+        Importancia de cada punto en metros.
+    """
+    n = len(puntos)
+    importancia = np.full(n, np.inf)
+    if n < 3:
+        return importancia
+
+    # Proyección equirectangular en metros alrededor de la latitud media
+    lat = np.asarray(puntos[:, 0], dtype=np.float64)
+    escala_lon = math.cos(math.radians(float(lat.mean())))
+    y = lat * METROS_POR_GRADO
+    x = np.asarray(puntos[:, 1], dtype=np.float64) * METROS_POR_GRADO * escala_lon
+
+    pendientes = [(0, n - 1, np.inf)]
+    while pendientes:
+        inicio, fin, limite = pendientes.pop()
+        if fin - inicio < 2:
+            continue
+        dx, dy = x[fin] - x[inicio], y[fin] - y[inicio]
+        px, py = x[inicio + 1:fin] - x[inicio], y[inicio + 1:fin] - y[inicio]
+        longitud2 = dx * dx + dy * dy
+        if longitud2 > 0:
+            # Distancia al segmento (no a la recta), para los caminos que vuelven sobre sí mismos
+            t = np.clip((px * dx + py * dy) / longitud2, 0.0, 1.0)
+            distancias = np.hypot(px - t * dx, py - t * dy)
+        else:
+            distancias = np.hypot(px, py)
+        k = int(np.argmax(distancias))
+        medio = inicio + 1 + k
+        valor = min(float(distancias[k]), limite)
+        importancia[medio] = valor
+        pendientes.append((inicio, medio, valor))
+        pendientes.append((medio, fin, valor))
+    return importancia
+
+
+def simplificar(puntos: np.ndarray, tolerancia: float) -> np.ndarray:
+    """
+    Simplifica una polilínea con Douglas-Peucker.
+
+    Parameters
+    ----------
+    puntos : np.ndarray
+        Array (n, 2) o (n, 3) cuyas dos primeras columnas son latitud y longitud.
+    tolerancia : float
+        Desviación máxima admitida en metros.
+
+    Returns
+    -------
+    np.ndarray
+        Puntos conservados, en el mismo orden y con las mismas columnas.
+    """
+    return puntos[importancia_puntos(puntos) > tolerancia]
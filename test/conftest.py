@@ -0,0 +1,20 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def geometria_prueba():
+    # Importados aquí para que los tests que no usan la geometría no dependan de numpy
+    import numpy as np
+    from artefactos import GeometriaRuta
+    return GeometriaRuta(
+        nombre="Ruta_1", modo_transporte="bike",
+        origen=(38.3456, -0.4906), puntos_intermedios=[(38.3474, -0.4889)], destino=(38.3451, -0.4770),
+        origen_nombre="Plaza de los Luceros", puntos_intermedios_nombres=["Mercado Central"],
+        destino_nombre="Playa del Postiguet", distancias=[0.4, 1.1], tiempos_estimados=[0.03, 0.07],
+        tramos=[np.array([(38.3456, -0.4906, 5.0), (38.3474, -0.4889, 8.0)]),
+                np.array([(38.3474, -0.4889, 8.0), (38.3451, -0.4770, 2.0)])],
+    )
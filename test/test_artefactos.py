@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import dataclasses
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import artefactos
+from artefactos import CacheArtefactos, GeometriaRuta, archivo_publico, interpretar_archivo_publico
+
+
+def test_guardar_y_cargar_geometria(tmp_path, geometria_prueba):
+    geometria = geometria_prueba
+    geometria.guardar(str(tmp_path))
+    assert sorted(os.listdir(str(tmp_path))) == ["Ruta_1.huella", "Ruta_1.json", "Ruta_1.npy"]
+    cargada = GeometriaRuta.cargar("Ruta_1", str(tmp_path))
+    assert cargada == geometria
+    assert all(isinstance(a, np.ndarray) and (a == b).all() for a, b in zip(cargada.tramos, geometria.tramos))
+    assert cargada.huella() == geometria.huella()
+    assert GeometriaRuta.leer_huella("Ruta_1", str(tmp_path)) == geometria.huella()
+    assert GeometriaRuta.cargar("no_existe", str(tmp_path)) is None
+    assert GeometriaRuta.cargar("../Ruta_1", str(tmp_path)) is None
+
+
+def test_cargar_geometria_con_tramos_en_json(tmp_path, geometria_prueba):
+    # Geometrías guardadas antes de separar los puntos en binario
+    datos = {campo.name: getattr(geometria_prueba, campo.name) for campo in dataclasses.fields(geometria_prueba)}
+    datos["tramos"] = [tramo.tolist() for tramo in geometria_prueba.tramos]
+    with open(str(tmp_path / "Ruta_1.json"), "w", encoding="utf-8") as archivo:
+        json.dump(datos, archivo)
+    assert GeometriaRuta.cargar("Ruta_1", str(tmp_path)) == geometria_prueba
+
+
+def test_huella_depende_del_contenido(geometria_prueba):
+    geometria = geometria_prueba
+    # Otra instancia con el mismo contenido tiene la misma huella
+    otra = dataclasses.replace(geometria)
+    assert otra is not geometria and geometria.huella() == otra.huella()
+    otra = dataclasses.replace(otra, distancias=[0.4, 1.2])
+    assert geometria.huella() != otra.huella()
+    movida = dataclasses.replace(geometria, tramos=[geometria.tramos[0] + 1e-6, geometria.tramos[1]])
+    assert geometria.huella() != movida.huella()
+
+
+def test_version_del_generador_en_la_huella(monkeypatch, geometria_prueba):
+    geometria = geometria_prueba
+    cache = CacheArtefactos("cache")
+    anterior = cache.ruta_archivo(geometria, "html")
+    assert anterior != cache.ruta_archivo(geometria, "gpx")
+    monkeypatch.setitem(artefactos.VERSIONES_RENDERIZADORES, "html", artefactos.VERSIONES_RENDERIZADORES["html"] + 1)
+    assert cache.ruta_archivo(geometria, "html") != anterior
+
+
+def test_nombres_publicos():
+    for formato in ("pdf", "gpx", "gpx_lite", "html"):
+        assert interpretar_archivo_publico(archivo_publico("Ruta_1", formato)) == ("Ruta_1", formato)
+    assert archivo_publico("Ruta_1", "gpx_lite") == "rutas_Ruta_1.lite.gpx"
+    assert interpretar_archivo_publico("rutas_.html") is None
+    assert interpretar_archivo_publico("Ruta_1.png") is None
+    assert interpretar_archivo_publico("sub/rutas_Ruta_1.gpx") is None
+
+
+def test_cache_genera_una_vez_y_elimina(tmp_path, geometria_prueba, monkeypatch):
+    llamadas = []
+
+    def renderizar(geometria, archivo):
+        llamadas.append(archivo)
+        with open(archivo, "w") as f:
+            f.write(geometria.nombre)
+        return archivo
+
+    monkeypatch.setitem(artefactos.RENDERIZADORES, "gpx", renderizar)
+    cache = CacheArtefactos(str(tmp_path))
+    geometria = geometria_prueba
+    archivo = cache.obtener(geometria, "gpx")
+    assert cache.obtener(geometria, "gpx") == archivo
+    assert len(llamadas) == 1
+    assert os.listdir(str(tmp_path)) == [os.path.basename(archivo)]
+    with pytest.raises(ValueError):
+        cache.obtener(geometria, "svg")
+
+    cache.eliminar(geometria.huella())
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_error_al_generar_no_deja_restos(tmp_path, geometria_prueba, monkeypatch):
+    def falla(geometria, archivo):
+        with open(archivo, "w") as f:
+            f.write("a medias")
+        raise OSError("disco lleno")
+
+    monkeypatch.setitem(artefactos.RENDERIZADORES, "html", falla)
+    cache = CacheArtefactos(str(tmp_path))
+    with pytest.raises(OSError):
+        cache.obtener(geometria_prueba, "html")
+    assert os.listdir(str(tmp_path)) == []
+    assert cache._bloqueos == {}
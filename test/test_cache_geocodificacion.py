@@ -0,0 +1,114 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache_geocodificacion import CacheGeocodificacion
+from geocodificador import Geocodificador
+from limitador import LimitadorTasa
+from proveedores_geocodificacion import ProveedorNominatim
+
+
+class GeolocalizadorPrueba:
+    """
+    Sustituto de Nominatim que cuenta las consultas recibidas.
+    """
+
+    def __init__(self, resultados=None):
+        self.consultas = 0
+        self.resultados = resultados or {}
+
+    def geocode(self, query):
+        self.consultas += 1
+        return self.resultados.get(query)
+
+
+class GeolocalizadorAsincronoPrueba(GeolocalizadorPrueba):
+    """
+    Sustituto del cliente asíncrono de Nominatim que cuenta las consultas recibidas.
+    """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excepcion):
+        return False
+
+    async def geocode(self, query):
+        return GeolocalizadorPrueba.geocode(self, query)
+
+
+class UbicacionPrueba:
+    def __init__(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+def test_entradas_positivas_y_negativas(tmp_path):
+    archivo = str(tmp_path / "cache.db")
+    cache = CacheGeocodificacion(archivo)
+    cache.guardar("Plaza de los Luceros", (38.3452, -0.4906))
+    cache.guardar("Calle Inventada", None)
+
+    # Una nueva instancia lee las entradas de la base de datos
+    cache = CacheGeocodificacion(archivo)
+    assert cache.obtener("  plaza de los   LUCEROS ") == (True, (38.3452, -0.4906))
+    assert cache.obtener("Pl. Luceros") == (True, (38.3452, -0.4906))
+    assert cache.obtener("Calle Inventada") == (True, None)
+    assert cache.obtener("Mercado Central") == (False, None)
+
+
+def test_entradas_caducadas(tmp_path):
+    cache = CacheGeocodificacion(str(tmp_path / "cache.db"), ttl_positivo=0, ttl_negativo=0)
+    cache.guardar("Plaza de los Luceros", (38.3452, -0.4906))
+    assert cache.obtener("Plaza de los Luceros") == (False, None)
+    assert cache.eliminar_caducadas() == 1
+
+
+def test_geocodificador_usa_la_cache(tmp_path):
+    geocodificador = Geocodificador(cache=CacheGeocodificacion(str(tmp_path / "cache.db")),
+                                    proveedor=ProveedorNominatim())
+    geocodificador.proveedor.geolocator = GeolocalizadorPrueba()
+    assert geocodificador.obtener_coordenadas("Calle Inventada") is None
+    assert geocodificador.obtener_coordenadas("Calle Inventada") is None
+    assert geocodificador.proveedor.geolocator.consultas == 1
+
+
+def test_lote_sin_consultas_repetidas(tmp_path):
+    geocodificador = Geocodificador(cache=CacheGeocodificacion(str(tmp_path / "cache.db")),
+                                    limitador=LimitadorTasa(tasa=1000), proveedor=ProveedorNominatim())
+    geocodificador.proveedor.geolocator = GeolocalizadorPrueba({
+        "Mercado Central, Alicante, Spain": UbicacionPrueba(38.3473, -0.4886),
+        "Calle Fuera, Alicante, Spain": UbicacionPrueba(40.4168, -3.7038),
+    })
+    geocodificador.cache.guardar("Plaza de los Luceros", (38.3452, -0.4906))
+
+    direcciones = ["Mercado Central", "mercado  central", "Plaza de los Luceros", "Calle Fuera", "Mercado Central"]
+    resultado = geocodificador.obtener_coordenadas_lote(direcciones)
+    assert resultado == {
+        "Mercado Central": (38.3473, -0.4886),
+        "mercado  central": (38.3473, -0.4886),
+        "Plaza de los Luceros": (38.3452, -0.4906),
+        "Calle Fuera": None,
+    }
+    assert geocodificador.proveedor.geolocator.consultas == 2
+
+
+def test_lote_asincrono(tmp_path):
+    geocodificador = Geocodificador(cache=CacheGeocodificacion(str(tmp_path / "cache.db")),
+                                    limitador=LimitadorTasa(tasa=1000), asincrono=True,
+                                    proveedor=ProveedorNominatim())
+    cliente = GeolocalizadorAsincronoPrueba({"Mercado Central, Alicante, Spain": UbicacionPrueba(38.3473, -0.4886)})
+    geocodificador.proveedor.cliente_async = lambda: cliente
+    geocodificador.cache.guardar("Plaza de los Luceros", (38.3452, -0.4906))
+
+    direcciones = ["Mercado Central", "mercado central", "Plaza de los Luceros", "Calle Inventada"]
+    resultado = geocodificador.obtener_coordenadas_lote(direcciones)
+    assert resultado == {
+        "Mercado Central": (38.3473, -0.4886),
+        "mercado central": (38.3473, -0.4886),
+        "Plaza de los Luceros": (38.3452, -0.4906),
+        "Calle Inventada": None,
+    }
+    assert cliente.consultas == 2
+    # Los resultados quedan en la caché para las siguientes consultas
+    assert geocodificador.cache.obtener("Calle Inventada") == (True, None)
@@ -0,0 +1,49 @@
+import io
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from escritor_gpx import escribir_gpx, fragmentos_gpx
+
+NS = {"gpx": "http://www.topografix.com/GPX/1/1"}
+
+
+def test_documento_valido_con_un_track_por_tramo():
+    tramos = [
+        [(38.3485858, -0.4860071, 0.0), (38.3486258, -0.4848692, 12.5)],
+        [(38.3486258, -0.4848692, 12.5), (38.348451, -0.4838228, 3.0)],
+    ]
+    salida = io.StringIO()
+    escritos = escribir_gpx(tramos, salida)
+    texto = salida.getvalue()
+    assert escritos == len(texto)
+
+    raiz = ET.fromstring(texto.encode("utf-8"))
+    tracks = raiz.findall("gpx:trk", NS)
+    assert [t.find("gpx:name", NS).text for t in tracks] == ["Ruta 1", "Ruta 2"]
+    puntos = tracks[0].findall("gpx:trkseg/gpx:trkpt", NS)
+    assert [(p.get("lat"), p.get("lon"), p.find("gpx:ele", NS).text) for p in puntos] == [
+        ("38.3485858", "-0.4860071", "0"),
+        ("38.3486258", "-0.4848692", "12.5"),
+    ]
+
+
+def test_tramos_por_fragmentos_desde_generadores():
+    def puntos(n):
+        for i in range(n):
+            yield (38.3 + i * 1e-5, -0.48, 0.0)
+
+    fragmentos = list(fragmentos_gpx((puntos(n) for n in (2500, 0)), puntos_por_fragmento=1000))
+    # Cabecera, apertura, 3 grupos de puntos, cierre, apertura y cierre del tramo vacío, pie
+    assert len(fragmentos) == 9
+    raiz = ET.fromstring("".join(fragmentos).encode("utf-8"))
+    segmentos = raiz.findall("gpx:trk/gpx:trkseg", NS)
+    assert [len(s.findall("gpx:trkpt", NS)) for s in segmentos] == [2500, 0]
+
+
+def test_tramos_como_arrays():
+    import numpy as np
+    tramos = [[(38.3485858, -0.4860071, 0.0), (38.3486258, -0.4848692, 12.5), (38.348451, -0.4838228, 3.0)]]
+    esperado = "".join(fragmentos_gpx(tramos))
+    assert "".join(fragmentos_gpx([np.array(tramos[0])], puntos_por_fragmento=2)) == esperado
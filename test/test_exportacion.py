@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import threading
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import artefactos
+from artefactos import CacheArtefactos, GeometriaRuta, eliminar_artefactos
+from exportacion import PlanificadorExportacion, artefacto_bajo_demanda
+
+
+def test_formatos_en_paralelo_y_una_sola_vez(tmp_path, geometria_prueba, monkeypatch):
+    llamadas = []
+    bloqueo = threading.Lock()
+    # Cada exportador espera a que los otros dos hayan empezado: solo pasa si se ejecutan a la vez
+    barrera = threading.Barrier(3, timeout=5)
+
+    def renderizador(formato):
+        def renderizar(geometria, archivo):
+            barrera.wait()
+            with bloqueo:
+                llamadas.append(formato)
+            with open(archivo, "w") as f:
+                f.write(formato)
+            return archivo
+        return renderizar
+
+    for formato in ("gpx", "html", "pdf"):
+        monkeypatch.setitem(artefactos.RENDERIZADORES, formato, renderizador(formato))
+
+    cache = CacheArtefactos(str(tmp_path))
+    planificador = PlanificadorExportacion(max_hilos=3, cache=cache)
+    geometria = geometria_prueba
+    archivos = planificador.exportar(geometria)
+    assert archivos == {f: cache.ruta_archivo(geometria, f) for f in ("gpx", "html", "pdf")}
+
+    # Ya en la caché: no se vuelve a generar, ni siquiera desde otro planificador
+    assert PlanificadorExportacion(cache=cache).exportar(geometria, ["pdf"]) == {"pdf": archivos["pdf"]}
+    assert sorted(llamadas) == ["gpx", "html", "pdf"]
+
+
+def test_peticiones_simultaneas_generan_una_vez(tmp_path, geometria_prueba, monkeypatch):
+    llamadas = []
+
+    def renderizar(geometria, archivo):
+        llamadas.append(1)
+        time.sleep(0.1)
+        with open(archivo, "w") as f:
+            f.write("pdf")
+        return archivo
+
+    monkeypatch.setitem(artefactos.RENDERIZADORES, "pdf", renderizar)
+    planificador = PlanificadorExportacion(cache=CacheArtefactos(str(tmp_path)))
+    hilos = [threading.Thread(target=planificador.exportar, args=(geometria_prueba, ["pdf"])) for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert len(llamadas) == 1
+
+
+def test_errores_de_exportacion(tmp_path, geometria_prueba, monkeypatch):
+    intentos = []
+
+    def falla(geometria, archivo):
+        intentos.append(1)
+        raise OSError("disco lleno")
+
+    monkeypatch.setitem(artefactos.RENDERIZADORES, "pdf", falla)
+    planificador = PlanificadorExportacion(cache=CacheArtefactos(str(tmp_path)))
+    geometria = geometria_prueba
+    with pytest.raises(ValueError):
+        planificador.exportar(geometria, ["svg"])
+    with pytest.raises(RuntimeError, match="disco lleno"):
+        planificador.exportar(geometria, ["pdf"])
+    # Un formato fallido se vuelve a intentar
+    with pytest.raises(RuntimeError):
+        planificador.exportar(geometria, ["pdf"])
+    assert len(intentos) == 2
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_artefacto_bajo_demanda(tmp_path, geometria_prueba, monkeypatch):
+    directorio_geometrias = str(tmp_path / "geometrias")
+    monkeypatch.setattr(artefactos, "DIRECTORIO_GEOMETRIAS", directorio_geometrias)
+    cache = CacheArtefactos(str(tmp_path / "cache"))
+    monkeypatch.setattr(artefactos, "cache_artefactos", cache)
+    planificador = PlanificadorExportacion(cache=cache)
+
+    def renderizar(geometria, archivo):
+        with open(archivo, "w") as f:
+            f.write(geometria.destino_nombre)
+        return archivo
+
+    monkeypatch.setitem(artefactos.RENDERIZADORES, "pdf", renderizar)
+    geometria_prueba.guardar(directorio_geometrias)
+
+    archivo = artefacto_bajo_demanda("Ruta_1.pdf", planificador)
+    with open(archivo) as f:
+        assert f.read() == "Playa del Postiguet"
+    assert archivo == cache.ruta_archivo(geometria_prueba, "pdf")
+
+    # Ya generado: se sirve con la huella guardada, sin cargar la geometría
+    def no_cargar(*args, **kwargs):
+        raise AssertionError("no debe cargarse la geometría")
+
+    with monkeypatch.context() as m:
+        m.setattr(GeometriaRuta, "cargar", no_cargar)
+        assert artefacto_bajo_demanda("Ruta_1.pdf", planificador) == archivo
+    assert artefacto_bajo_demanda("Ruta_2.pdf", planificador) is None
+    assert artefacto_bajo_demanda("logo.png", planificador) is None
+
+    eliminar_artefactos("Ruta_1")
+    assert not os.path.exists(archivo)
+    assert GeometriaRuta.cargar("Ruta_1", directorio_geometrias) is None
+    assert os.listdir(directorio_geometrias) == []
@@ -0,0 +1,83 @@
+import os
+import sys
+import random
+import pytest
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from grafo_compacto import GrafoCompacto
+
+
+def crear_grafo_prueba(n=15, semilla=7):
+    """
+    Crea un grafo en cuadrícula con el mismo formato que los grafos de OSMnx.
+    """
+    random.seed(semilla)
+    grafo = nx.MultiDiGraph()
+    for i in range(n):
+        for j in range(n):
+            grafo.add_node(i * n + j + 1, y=38.34 + i * 0.001, x=-0.49 + j * 0.001)
+    for i in range(n):
+        for j in range(n):
+            u = i * n + j + 1
+            for v in ([u + 1] if j + 1 < n else []) + ([u + n] if i + 1 < n else []):
+                longitud = random.uniform(90, 150)
+                grafo.add_edge(u, v, length=longitud)
+                grafo.add_edge(v, u, length=longitud)
+                # Arista paralela más larga que nunca debe usarse
+                grafo.add_edge(u, v, length=longitud + 50)
+    return grafo
+
+
+def test_camino_igual_que_networkx():
+    grafo = crear_grafo_prueba()
+    compacto = GrafoCompacto.desde_networkx(grafo)
+    nodos = list(grafo.nodes)
+    for _ in range(20):
+        origen, destino = random.sample(nodos, 2)
+        camino, longitud = compacto.camino_mas_corto(origen, destino)
+        esperado = nx.shortest_path_length(grafo, origen, destino, weight='length')
+        assert abs(longitud - esperado) < 0.01
+        assert camino[0] == origen and camino[-1] == destino
+        assert abs(compacto.camino_mas_corto(origen, destino, "dijkstra")[1] - esperado) < 0.01
+
+
+def test_nodo_mas_cercano_y_coordenadas():
+    compacto = GrafoCompacto.desde_networkx(crear_grafo_prueba())
+    nodo = compacto.nodo_mas_cercano(38.3401, -0.4899)
+    assert nodo == 1
+    assert compacto.coordenadas([nodo]) == [(38.34, -0.49)]
+    assert compacto.nodos_mas_cercanos([(38.3401, -0.4899), (38.354, -0.476)]) == [1, 225]
+
+
+def test_puntos_vectorizados():
+    compacto = GrafoCompacto.desde_networkx(crear_grafo_prueba())
+    nodos = [225, 1, 17]
+    puntos = compacto.puntos(nodos)
+    assert puntos.shape == (3, 3)
+    assert [tuple(p[:2]) for p in puntos.tolist()] == compacto.coordenadas(nodos)
+    # Sin elevación en el grafo, la elevación es 0
+    assert puntos[:, 2].tolist() == [0.0, 0.0, 0.0]
+    assert compacto.indices(nodos).tolist() == [compacto.indice(n) for n in nodos]
+    with pytest.raises(KeyError):
+        compacto.indices([1, 999])
+
+
+def test_guardar_y_cargar(tmp_path):
+    compacto = GrafoCompacto.desde_networkx(crear_grafo_prueba())
+    archivo = str(tmp_path / "alicante.grafo")
+    compacto.guardar(archivo)
+    cargado = GrafoCompacto.cargar(archivo)
+    assert len(cargado) == len(compacto)
+    assert cargado.camino_mas_corto(1, 225) == compacto.camino_mas_corto(1, 225)
+
+
+def test_distancias_desde_igual_que_caminos_desde():
+    compacto = GrafoCompacto.desde_networkx(crear_grafo_prueba())
+    destinos = [15, 113, 225]
+    caminos = compacto.caminos_desde(1, destinos)
+    distancias = compacto.distancias_desde(1, destinos)
+    assert set(distancias) == set(destinos)
+    for destino in destinos:
+        assert distancias[destino] == caminos[destino][1]
+        assert distancias[destino] == compacto.camino_mas_corto(1, destino, "dijkstra")[1]
@@ -0,0 +1,66 @@
+import os
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from grafo_compacto import GrafoCompacto
+from jerarquia_contraccion import JerarquiaContraccion
+from test_grafo_compacto import crear_grafo_prueba
+
+
+def test_jerarquia_igual_que_astar(tmp_path):
+    grafo = crear_grafo_prueba(n=10)
+    compacto = GrafoCompacto.desde_networkx(grafo)
+    archivo = str(tmp_path / "walk_alicante.ch")
+    JerarquiaContraccion.construir(compacto).guardar(archivo)
+    jerarquia = JerarquiaContraccion.cargar(archivo, compacto)
+
+    nodos = list(grafo.nodes)
+    for _ in range(30):
+        origen, destino = random.sample(nodos, 2)
+        camino, longitud = jerarquia.camino_mas_corto(origen, destino)
+        assert abs(longitud - compacto.camino_mas_corto(origen, destino)[1]) < 0.01
+        assert camino[0] == origen and camino[-1] == destino
+        # El camino desempaquetado solo usa aristas originales y suma la longitud devuelta
+        suma = sum(min(d['length'] for d in grafo[u][v].values()) for u, v in zip(camino, camino[1:]))
+        assert abs(suma - longitud) < 0.01
+
+
+def test_jerarquia_de_otro_grafo(tmp_path):
+    compacto = GrafoCompacto.desde_networkx(crear_grafo_prueba(n=6))
+    archivo = str(tmp_path / "walk_alicante.ch")
+    JerarquiaContraccion.construir(compacto).guardar(archivo)
+    # Mismos nodos y aristas, pero con otras longitudes: la jerarquía ya no sirve
+    modificado = GrafoCompacto(compacto.nodos, compacto.lat, compacto.lon, compacto.desplazamientos,
+                               compacto.destinos, compacto.pesos * 1.5, compacto.elevacion)
+    with pytest.raises(ValueError):
+        JerarquiaContraccion.cargar(archivo, modificado)
+
+
+def test_jerarquia_rechazada_no_se_vuelve_a_abrir(tmp_path, monkeypatch):
+    from grafo_cache import AlmacenGrafos
+    compacto = GrafoCompacto.desde_networkx(crear_grafo_prueba(n=6))
+    almacen = AlmacenGrafos(str(tmp_path))
+    almacen.grafos[("walk", "alicante")] = compacto
+    archivo = tmp_path / "walk_alicante.ch"
+    archivo.write_bytes(b"no es una jerarquia")
+
+    aperturas = []
+    cargar = JerarquiaContraccion.cargar.__func__
+
+    def contar(cls, *args):
+        aperturas.append(1)
+        return cargar(cls, *args)
+
+    monkeypatch.setattr(JerarquiaContraccion, "cargar", classmethod(contar))
+    punto = [(38.345, -0.49)]
+    assert almacen.obtener_jerarquia("walk", punto) is None
+    assert almacen.obtener_jerarquia("walk", punto) is None
+    assert len(aperturas) == 1
+
+    # Al reconstruirla, el archivo cambia y se vuelve a abrir
+    JerarquiaContraccion.construir(compacto).guardar(str(archivo))
+    os.utime(str(archivo), ns=(1, 1))
+    assert almacen.obtener_jerarquia("walk", punto) is not None
+    assert len(aperturas) == 2
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from limitador import LimitadorTasa
+
+
+def test_primera_peticion_sin_espera():
+    limitador = LimitadorTasa(tasa=2.0, capacidad=1)
+    assert limitador.reservar() == 0.0
+    # La segunda petición inmediata espera el tiempo de reponer una ficha
+    assert 0.45 < limitador.reservar() <= 0.5
+
+
+def test_reservas_en_orden_de_llegada():
+    limitador = LimitadorTasa(tasa=10.0, capacidad=2)
+    esperas = [limitador.reservar() for _ in range(5)]
+    assert esperas[:2] == [0.0, 0.0]
+    assert esperas[2] < esperas[3] < esperas[4]
+    assert abs(esperas[4] - 0.3) < 0.01
+
+
+def test_hilos_concurrentes_respetan_la_tasa():
+    limitador = LimitadorTasa(tasa=50.0, capacidad=1)
+    instantes = []
+    bloqueo = threading.Lock()
+
+    def peticion():
+        limitador.esperar()
+        with bloqueo:
+            instantes.append(time.monotonic())
+
+    hilos = [threading.Thread(target=peticion) for _ in range(10)]
+    inicio = time.monotonic()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    # 10 peticiones a 50/s con ráfaga 1: la última sale tras unos 9 / 50 segundos
+    assert max(instantes) - inicio >= 9 / 50 - 0.01
+
+
+def test_corrutinas_comparten_la_cuota():
+    limitador = LimitadorTasa(tasa=50.0, capacidad=1)
+
+    async def peticiones():
+        await asyncio.gather(*(limitador.esperar_async() for _ in range(5)))
+
+    inicio = time.monotonic()
+    asyncio.run(peticiones())
+    # 5 peticiones a 50/s con ráfaga 1: la última sale tras unos 4 / 50 segundos
+    assert time.monotonic() - inicio >= 4 / 50 - 0.01
@@ -0,0 +1,100 @@
+import os
+import sys
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import nomenclator as modulo_nomenclator
+from nomenclator import Nomenclator, _trigramas, obtener_nomenclator
+from geocodificador import Geocodificador
+from cache_geocodificacion import CacheGeocodificacion
+from proveedores_geocodificacion import ProveedorNomenclator
+
+ENTRADAS = [
+    ("Mercado Central", 38.3473, -0.4886),
+    ("Playa del Postiguet", 38.3455, -0.4780),
+    ("Calle San Vicente", 38.3470, -0.4900),
+    ("Calle San Vicente", 38.3480, -0.4920),
+    ("Calle San Vicente", 38.3490, -0.4940),
+]
+
+
+def test_busqueda_exacta_y_aproximada():
+    nomenclator = Nomenclator(ENTRADAS)
+    assert len(nomenclator) == 3
+    assert nomenclator.buscar("mercado central") == (38.3473, -0.4886)
+    assert nomenclator.buscar("Mercado Central de Alicante") == (38.3473, -0.4886)
+    assert nomenclator.buscar("Playa del Postiget") == (38.3455, -0.4780)
+    # El punto representativo de una calle es el más cercano a su centro
+    assert nomenclator.buscar("Calle San Vicente") == (38.3480, -0.4920)
+    assert nomenclator.buscar("Calle San Vicente 20") is None
+    assert nomenclator.buscar("Estación de autobuses") is None
+
+
+def test_busqueda_aproximada_no_recorre_los_trigramas_comunes():
+    # Miles de calles comparten los trigramas de "calle": no deben ser candidatas
+    entradas = ENTRADAS + [(f"Calle Particular {i}", 38.35, -0.49) for i in range(3000)]
+    nomenclator = Nomenclator(entradas)
+    assert nomenclator.buscar("Calle San Vicnte") == (38.3480, -0.4920)
+    candidatos = nomenclator._candidatos(_trigramas("calle san vicnte"))
+    assert nomenclator._por_clave["calle san vicente"] in candidatos
+    assert len(candidatos) < 100
+
+
+def test_desde_networkx_guardar_y_cargar(tmp_path):
+    grafo = nx.MultiDiGraph()
+    grafo.add_node(1, y=38.3470, x=-0.4900)
+    grafo.add_node(2, y=38.3480, x=-0.4920)
+    grafo.add_node(3, y=38.3490, x=-0.4940)
+    grafo.add_edge(1, 2, name="Calle San Vicente")
+    grafo.add_edge(2, 3, name=["Calle San Vicente", "Calle del Teatro"])
+    grafo.add_edge(3, 1)
+    nomenclator = Nomenclator.desde_networkx(grafo)
+    assert len(nomenclator.lat) == 5
+
+    archivo = str(tmp_path / "nomenclator.json")
+    nomenclator.guardar(archivo)
+    cargado = Nomenclator.cargar(archivo)
+    assert cargado.nombres == nomenclator.nombres
+    assert cargado.buscar("calle del teatro") == nomenclator.buscar("Calle del Teatro")
+
+
+def test_geocodificador_consulta_el_nomenclator(tmp_path):
+    geocodificador = Geocodificador(cache=CacheGeocodificacion(str(tmp_path / "cache.db")),
+                                    nomenclator=Nomenclator(ENTRADAS), proveedor=ProveedorNomenclator(Nomenclator([])))
+    assert geocodificador.obtener_coordenadas("Mercado Central") == (38.3473, -0.4886)
+    assert geocodificador.obtener_coordenadas_lote(["Playa del Postiguet"]) == {"Playa del Postiguet": (38.3455, -0.4780)}
+
+
+def test_busqueda_inversa():
+    nomenclator = Nomenclator(ENTRADAS)
+    assert nomenclator.nombres_mas_cercanos([]) == []
+    # A unos 20 m del Mercado Central y a más de 5 km de cualquier nombre
+    assert nomenclator.nombres_mas_cercanos([(38.3474, -0.4888), (38.30, -0.43)]) == ["Mercado Central", None]
+    assert nomenclator.nombres_mas_cercanos([(38.3489, -0.4938)]) == ["Calle San Vicente"]
+
+    geocodificador = Geocodificador(nomenclator=nomenclator, proveedor=ProveedorNomenclator(nomenclator))
+    assert geocodificador.obtener_nombres([(38.3456, -0.4781)]) == ["Playa del Postiguet"]
+
+
+def test_nomenclator_roto_no_se_vuelve_a_leer(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo_nomenclator, "_nomenclator", None)
+    monkeypatch.setattr(modulo_nomenclator, "_firma_fallida", None)
+    lecturas = []
+    cargar = Nomenclator.cargar.__func__
+
+    def contar(cls, ruta_archivo):
+        lecturas.append(ruta_archivo)
+        return cargar(cls, ruta_archivo)
+
+    monkeypatch.setattr(Nomenclator, "cargar", classmethod(contar))
+    archivo = tmp_path / "nomenclator.json"
+    assert obtener_nomenclator(str(archivo)) is None
+    archivo.write_text("{", encoding="utf-8")
+    assert obtener_nomenclator(str(archivo)) is None
+    assert obtener_nomenclator(str(archivo)) is None
+    assert len(lecturas) == 1
+
+    # Regenerado, se carga
+    Nomenclator(ENTRADAS).guardar(str(archivo))
+    assert obtener_nomenclator(str(archivo)).buscar("Mercado Central") == (38.3473, -0.4886)
+    assert len(lecturas) == 2
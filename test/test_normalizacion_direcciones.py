@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from normalizacion_direcciones import clave_canonica, palabras_direccion
+
+
+def test_variantes_de_una_direccion():
+    clave = clave_canonica("Plaza de los Luceros")
+    assert clave == "plaza luceros"
+    assert clave_canonica("plaza de los luceros ") == clave
+    assert clave_canonica("Pl. Luceros") == clave
+    assert clave_canonica("PLAZA  DE LOS LUCEROS") == clave
+
+
+def test_tildes_abreviaturas_y_numeros():
+    assert clave_canonica("C/San Vicente, 20") == "calle san vicente 20"
+    assert clave_canonica("Avda. de la Estación") == clave_canonica("Avenida Estacion")
+    assert clave_canonica("Pº Explanada") == "paseo explanada"
+    assert clave_canonica("Playa de l'Albufereta") == "playa albufereta"
+    # Las abreviaturas de tipo de vía solo se expanden al principio
+    assert clave_canonica("Bloque C") == "bloque c"
+    # Si solo hay palabras vacías, se conservan
+    assert clave_canonica("El") == "el"
+    assert palabras_direccion("Sta. María del Mar") == ["santa", "maria", "del", "mar"]
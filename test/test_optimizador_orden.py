@@ -0,0 +1,28 @@
+import os
+import sys
+import random
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from optimizador_orden import ordenar_intermedios, coste_recorrido
+
+
+def matriz_aleatoria(k):
+    return [[random.uniform(1, 10) for _ in range(k + 2)] for _ in range(k + 2)]
+
+
+def test_orden_exacto_igual_que_fuerza_bruta():
+    random.seed(3)
+    for k in range(2, 7):
+        matriz = matriz_aleatoria(k)
+        orden = [i + 1 for i in ordenar_intermedios(matriz)]
+        optimo = min(coste_recorrido(matriz, list(p)) for p in itertools.permutations(range(1, k + 1)))
+        assert abs(coste_recorrido(matriz, orden) - optimo) < 1e-9
+
+
+def test_heuristica_no_empeora_el_orden_original():
+    random.seed(5)
+    matriz = matriz_aleatoria(15)
+    orden = ordenar_intermedios(matriz)
+    assert sorted(orden) == list(range(15))
+    assert coste_recorrido(matriz, [i + 1 for i in orden]) <= coste_recorrido(matriz, list(range(1, 16)))
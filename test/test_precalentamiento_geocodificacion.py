@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache_geocodificacion import CacheGeocodificacion
+from geocodificador import Geocodificador
+from nomenclator import Nomenclator
+import precalentamiento_geocodificacion
+from precalentamiento_geocodificacion import direcciones_de_rutas, iniciar_precalentamiento, precalentar_cache
+from proveedores_geocodificacion import ProveedorGeocodificacionInterface
+
+
+class ProveedorPrueba(ProveedorGeocodificacionInterface):
+    def __init__(self):
+        self.consultas = []
+
+    def geocodificar(self, direccion):
+        self.consultas.append(direccion)
+        return (38.3452, -0.4906) if "Luceros" in direccion else None
+
+
+def guardar_ruta(directorio, nombre, origen, intermedios, destino):
+    with open(os.path.join(directorio, f"{nombre}.json"), "w", encoding="utf-8") as archivo:
+        json.dump({"nombre": nombre, "origen": origen, "puntos_intermedios": intermedios, "destino": destino}, archivo)
+
+
+def test_precalentar_desde_rutas(tmp_path):
+    guardar_ruta(tmp_path, "Ruta_1", "Plaza de los Luceros", ["Calle Inventada"], "(38.345, -0.49)")
+    guardar_ruta(tmp_path, "Ruta_2", "Pl. Luceros", [], "Calle Inventada")
+    (tmp_path / "roto.json").write_text("{", encoding="utf-8")
+    assert direcciones_de_rutas(str(tmp_path)) == ["Plaza de los Luceros", "Calle Inventada"]
+
+    proveedor = ProveedorPrueba()
+    cache = CacheGeocodificacion(str(tmp_path / "cache.db"))
+    geocodificador = Geocodificador(cache=cache, nomenclator=Nomenclator([]), proveedor=proveedor)
+    assert precalentar_cache(str(tmp_path), geocodificador) == 1
+    assert precalentar_cache(str(tmp_path), geocodificador) == 1
+    # La segunda pasada se sirve entera de la caché
+    assert proveedor.consultas == ["Plaza de los Luceros", "Calle Inventada"]
+    assert cache.obtener("Pl. Luceros", proveedor.nombre) == (True, (38.3452, -0.4906))
+
+
+def test_un_solo_proceso_precalienta(tmp_path, monkeypatch):
+    empezado, seguir = threading.Event(), threading.Event()
+
+    def precalentar(directorio):
+        empezado.set()
+        seguir.wait(5)
+        return 0
+
+    monkeypatch.setattr(precalentamiento_geocodificacion, "precalentar_cache", precalentar)
+    archivo_bloqueo = str(tmp_path / "precalentamiento.lock")
+    hilo = iniciar_precalentamiento(str(tmp_path), archivo_bloqueo)
+    assert hilo is not None and empezado.wait(5)
+    # Mientras dura, otro proceso (aquí, otra llamada) no lo lanza de nuevo
+    assert iniciar_precalentamiento(str(tmp_path), archivo_bloqueo) is None
+    seguir.set()
+    hilo.join(5)
+    # Terminado, el bloqueo queda libre
+    segundo = iniciar_precalentamiento(str(tmp_path), archivo_bloqueo)
+    assert segundo is not None
+    segundo.join(5)
@@ -0,0 +1,73 @@
+import os
+import sys
+import asyncio
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache_geocodificacion import CacheGeocodificacion
+from geocodificador import Geocodificador
+from nomenclator import Nomenclator
+from proveedores_geocodificacion import (ProveedorNomenclator, ProveedorNominatim, ProveedorServidorLocal,
+                                         establecer_proveedor_por_defecto)
+from servidor_geocodificacion_local import iniciar_servidor
+
+
+def test_servidor_local_sin_limitador(tmp_path):
+    servidor = iniciar_servidor(nomenclator=Nomenclator([]))
+    try:
+        host, puerto = servidor.server_address
+        proveedor = ProveedorServidorLocal(f"{host}:{puerto}")
+        assert proveedor.limitador is None
+        assert proveedor.geocodificar("Plaza de los Luceros") == (38.3456, -0.4906)
+        assert proveedor.geocodificar("Calle Inventada") is None
+
+        geocodificador = Geocodificador(cache=CacheGeocodificacion(str(tmp_path / "cache.db")),
+                                        nomenclator=Nomenclator([]), proveedor=proveedor)
+        assert geocodificador.limitador is None
+        direcciones = ["Mercado Central de Alicante", "Puerto de Alicante", "Calle Inventada"]
+        resultado = asyncio.run(geocodificador.obtener_coordenadas_lote_async(direcciones))
+        assert resultado == {
+            "Mercado Central de Alicante": (38.3474, -0.4889),
+            "Puerto de Alicante": (38.3390, -0.4840),
+            "Calle Inventada": None,
+        }
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_proveedor_por_defecto(tmp_path):
+    proveedor = ProveedorNomenclator(Nomenclator([("Mercado Central", 38.3473, -0.4886)]))
+    establecer_proveedor_por_defecto(proveedor)
+    try:
+        geocodificador = Geocodificador(cache=CacheGeocodificacion(str(tmp_path / "cache.db")),
+                                        nomenclator=Nomenclator([]))
+        assert geocodificador.proveedor is proveedor
+        assert geocodificador.obtener_coordenadas("mercado central") == (38.3473, -0.4886)
+    finally:
+        establecer_proveedor_por_defecto(None)
+
+
+def test_resultados_de_pruebas_no_pasan_a_nominatim(tmp_path):
+    cache = CacheGeocodificacion(str(tmp_path / "cache.db"))
+    servidor = iniciar_servidor(nomenclator=Nomenclator([]))
+    try:
+        host, puerto = servidor.server_address
+        pruebas = Geocodificador(cache=cache, nomenclator=Nomenclator([]),
+                                 proveedor=ProveedorServidorLocal(f"{host}:{puerto}"))
+        assert pruebas.obtener_coordenadas("Plaza de los Luceros") == (38.3456, -0.4906)
+        assert pruebas.obtener_coordenadas("Calle Inventada") is None
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    # Un geocodificador de Nominatim sobre la misma caché no ve esas entradas y consulta al servicio
+    nominatim = ProveedorNominatim(limitador=None)
+    assert nominatim.nombre == "nominatim"
+    nominatim.geolocator = MagicMock()
+    nominatim.geolocator.geocode.return_value = MagicMock(latitude=38.3457, longitude=-0.4907)
+    produccion = Geocodificador(cache=cache, nomenclator=Nomenclator([]), proveedor=nominatim)
+    assert produccion.obtener_coordenadas("Plaza de los Luceros") == (38.3457, -0.4907)
+    assert produccion.obtener_coordenadas("Calle Inventada") == (38.3457, -0.4907)
+    assert nominatim.geolocator.geocode.call_count == 2
+    assert cache.obtener("Plaza de los Luceros") == (True, (38.3457, -0.4907))
@@ -0,0 +1,68 @@
+import os
+import sys
+import math
+import random
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from simplificacion import (METROS_POR_GRADO, ZOOM_INICIAL_MAPA, importancia_puntos, simplificar,
+                            tolerancia_para_zoom)
+
+
+def douglas_peucker(puntos, tolerancia):
+    """
+    Douglas-Peucker recursivo clásico, como referencia.
+    """
+    escala_lon = math.cos(math.radians(sum(p[0] for p in puntos) / len(puntos)))
+    xy = [(p[1] * METROS_POR_GRADO * escala_lon, p[0] * METROS_POR_GRADO) for p in puntos]
+
+    def distancia(p, a, b):
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        longitud2 = dx * dx + dy * dy
+        t = 0.0 if longitud2 == 0 else max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / longitud2))
+        return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+    def recorrer(inicio, fin):
+        if fin - inicio < 2:
+            return []
+        distancias = [distancia(xy[i], xy[inicio], xy[fin]) for i in range(inicio + 1, fin)]
+        k = max(range(len(distancias)), key=distancias.__getitem__)
+        if distancias[k] <= tolerancia:
+            return []
+        medio = inicio + 1 + k
+        return recorrer(inicio, medio) + [medio] + recorrer(medio, fin)
+
+    return [0] + recorrer(0, len(puntos) - 1) + [len(puntos) - 1]
+
+
+def camino_aleatorio(n=400, semilla=3):
+    random.seed(semilla)
+    lat, lon, puntos = 38.345, -0.49, []
+    for _ in range(n):
+        lat += random.uniform(-1, 1) * 1e-4
+        lon += random.uniform(-1, 1) * 1e-4
+        puntos.append((lat, lon, random.uniform(0, 50)))
+    return np.array(puntos)
+
+
+def test_igual_que_douglas_peucker_clasico():
+    puntos = camino_aleatorio()
+    for tolerancia in (0.5, 3.0, 10.0, 40.0):
+        esperado = douglas_peucker(puntos.tolist(), tolerancia)
+        assert simplificar(puntos, tolerancia).tolist() == puntos[esperado].tolist()
+
+
+def test_puntos_alineados_y_extremos():
+    # Una calle recta: solo quedan los extremos
+    recta = np.array([(38.34 + i * 1e-4, -0.49 + i * 1e-4, 0.0) for i in range(50)])
+    assert simplificar(recta, 0.1).tolist() == recta[[0, -1]].tolist()
+    assert simplificar(recta[:2], 100).tolist() == recta[:2].tolist()
+    assert np.isinf(importancia_puntos(recta)[[0, -1]]).all()
+
+
+def test_tolerancia_para_zoom():
+    # Con zoom 18 en Alicante un píxel mide menos de medio metro
+    assert 0.15 < tolerancia_para_zoom(18, 38.345) < 0.25
+    assert tolerancia_para_zoom(14, 38.345) == tolerancia_para_zoom(18, 38.345) * 16
+    # La del mapa HTML, con su zoom inicial, está por debajo del ancho de una calle
+    assert 3 < tolerancia_para_zoom(ZOOM_INICIAL_MAPA, 38.345) < 5
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trazas import HistogramaEtapas, estadisticas_etapas, etapa, medir, traza, traza_actual
+
+
+def test_etapas_en_la_traza_y_en_el_histograma():
+    estadisticas_etapas.reiniciar()
+
+    @medir("prueba_funcion")
+    def funcion():
+        time.sleep(0.01)
+        return 42
+
+    with traza() as t:
+        assert traza_actual() is t
+        with etapa("prueba_bloque"):
+            assert funcion() == 42
+        with pytest.raises(ValueError):
+            with etapa("prueba_error"):
+                raise ValueError()
+    assert traza_actual() is None
+
+    # Las etapas se registran al terminar, también si fallan
+    assert [e for e, _ in t.etapas] == ["prueba_funcion", "prueba_bloque", "prueba_error"]
+    datos = t.a_dict()
+    assert datos["etapas"][0]["ms"] >= 10
+    assert datos["total_ms"] >= datos["etapas"][1]["ms"]
+
+    # Fuera de una traza solo se acumula en el histograma
+    funcion()
+    resumen = estadisticas_etapas.resumen()
+    assert resumen["prueba_funcion"]["n"] == 2
+    assert resumen["prueba_bloque"]["n"] == 1
+
+
+def test_intervalos_del_histograma():
+    histograma = HistogramaEtapas(limites_ms=(10, 100))
+    for segundos in (0.001, 0.01, 0.05, 0.5):
+        histograma.registrar("etapa", segundos)
+    resumen = histograma.resumen()["etapa"]
+    assert resumen["intervalos"] == {"<=10 ms": 2, "<=100 ms": 1, ">100 ms": 1}
+    assert resumen["max_ms"] == 500
+    assert resumen["n"] == 4
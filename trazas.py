@@ -0,0 +1,236 @@
+"""
+Módulo con la medición de tiempos por etapa de la creación de rutas.
+
+Cada etapa (geocodificación, carga del grafo, ajuste de puntos, cálculo de
+caminos, JSON, GPX, mapa HTML, PDF...) se mide con el gestor de contexto
+etapa() o con el decorador medir(). La duración se guarda en la traza de la
+petición en curso, si la hay (ver traza()), y se acumula en un histograma por
+etapa compartido por todo el proceso (ver estadisticas_etapas).
+
+La traza en curso se guarda en una variable de contexto, por lo que cada hilo
+de Flask tiene la suya y las etapas medidas fuera de una petición solo se
+acumulan en el histograma.
+
+"""
+
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Límites superiores (en milisegundos) de los intervalos del histograma de cada etapa
+LIMITES_HISTOGRAMA_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Traza:
+    """
+    Duraciones de las etapas de una petición, en el orden en que terminan.
+
+    Attributes
+    ----------
+    etapas : List[Tuple[str, float]]
+        Pares (etapa, segundos).
+
+    Methods
+    -------
+    registrar(etapa, segundos)
+        Añade la duración de una etapa.
+    a_dict()
+        Devuelve la traza lista para incluirla en una respuesta JSON.
+    """
+
+    def __init__(self) -> None:
+        self.etapas: List[Tuple[str, float]] = []
+        self._inicio: float = time.perf_counter()
+        self._bloqueo: threading.Lock = threading.Lock()
+
+    def registrar(self, etapa: str, segundos: float) -> None:
+        """
+        Añade la duración de una etapa.
+
+        Parameters
+        ----------
+        etapa : str
+            Nombre de la etapa.
+        segundos : float
+            Duración de la etapa.
+        """
+        with self._bloqueo:
+            self.etapas.append((etapa, segundos))
+
+    def a_dict(self) -> Dict[str, Any]:
+        """
+        Devuelve la traza lista para incluirla en una respuesta JSON.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Diccionario con las claves "etapas" (lista de {"etapa", "ms"}) y
+            "total_ms" (tiempo desde que empezó la traza).
+        """
+        with self._bloqueo:
+            etapas = [{"etapa": e, "ms": round(s * 1000, 3)} for e, s in self.etapas]
+        return {"etapas": etapas, "total_ms": round((time.perf_counter() - self._inicio) * 1000, 3)}
+
+
+class HistogramaEtapas:
+    """
+    Histograma en memoria de la duración de cada etapa, seguro entre hilos.
+
+    Methods
+    -------
+    registrar(etapa, segundos)
+        Acumula la duración de una etapa.
+    resumen()
+        Devuelve el número, la suma, el máximo y los intervalos de cada etapa.
+    reiniciar()
+        Vacía el histograma.
+    """
+
+    def __init__(self, limites_ms: Tuple[float, ...] = LIMITES_HISTOGRAMA_MS) -> None:
+        """
+        Inicializa el histograma vacío.
+
+        Parameters
+        ----------
+        limites_ms : Tuple[float, ...], optional
+            Límites superiores de los intervalos en milisegundos, por defecto LIMITES_HISTOGRAMA_MS.
+        """
+        self.limites_ms: Tuple[float, ...] = tuple(limites_ms)
+        self._etapas: Dict[str, Dict[str, Any]] = {}
+        self._bloqueo: threading.Lock = threading.Lock()
+
+    def registrar(self, etapa: str, segundos: float) -> None:
+        """
+        Acumula la duración de una etapa.
+
+        Parameters
+        ----------
+        etapa : str
+            Nombre de la etapa.
+        segundos : float
+            Duración de la etapa.
+        """
+        ms = segundos * 1000
+        with self._bloqueo:
+            datos = self._etapas.get(etapa)
+            if datos is None:
+                datos = {"n": 0, "suma_ms": 0.0, "max_ms": 0.0, "intervalos": [0] * (len(self.limites_ms) + 1)}
+                self._etapas[etapa] = datos
+            datos["n"] += 1
+            datos["suma_ms"] += ms
+            datos["max_ms"] = max(datos["max_ms"], ms)
+            datos["intervalos"][bisect.bisect_left(self.limites_ms, ms)] += 1
+
+    def resumen(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Devuelve el estado del histograma.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            Para cada etapa: "n", "media_ms", "max_ms" y "intervalos", un
+            diccionario con el número de mediciones hasta cada límite ("<=X ms")
+            y por encima del último (">X ms").
+        """
+        etiquetas = [f"<={l:g} ms" for l in self.limites_ms] + [f">{self.limites_ms[-1]:g} ms"]
+        with self._bloqueo:
+            return {
+                etapa: {
+                    "n": d["n"],
+                    "media_ms": round(d["suma_ms"] / d["n"], 3),
+                    "max_ms": round(d["max_ms"], 3),
+                    "intervalos": dict(zip(etiquetas, d["intervalos"])),
+                }
+                for etapa, d in self._etapas.items()
+            }
+
+    def reiniciar(self) -> None:
+        """
+        Vacía el histograma.
+        """
+        with self._bloqueo:
+            self._etapas = {}
+
+
+# Histograma de etapas compartido por todo el proceso
+estadisticas_etapas = HistogramaEtapas()
+
+_traza_actual: ContextVar[Optional[Traza]] = ContextVar("traza_actual", default=None)
+
+
+@contextmanager
+def traza() -> Iterator[Traza]:
+    """
+    Abre una traza para las etapas medidas dentro del bloque.
+
+    Yields
+    ------
+    Traza
+        Traza de la petición, que sigue disponible al salir del bloque.
+    """
+    nueva = Traza()
+    token = _traza_actual.set(nueva)
+    try:
+        yield nueva
+    finally:
+        _traza_actual.reset(token)
+
+
+def traza_actual() -> Optional[Traza]:
+    """
+    Devuelve la traza abierta en el contexto actual.
+
+    Returns
+    -------
+    Optional[Traza]
+        Traza en curso, o None si no se ha abierto ninguna.
+    """
+    return _traza_actual.get()
+
+
+@contextmanager
+def etapa(nombre: str) -> Iterator[None]:
+    """
+    Mide la duración del bloque como una etapa, aunque termine con una excepción.
+
+    Parameters
+    ----------
+    nombre : str
+        Nombre de la etapa.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        estadisticas_etapas.registrar(nombre, segundos)
+        actual = _traza_actual.get()
+        if actual is not None:
+            actual.registrar(nombre, segundos)
+
+
+def medir(nombre: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorador que mide cada llamada a una función como una etapa.
+
+    Parameters
+    ----------
+    nombre : str
+        Nombre de la etapa.
+
+    Returns
+    -------
+    Callable
+        Decorador que envuelve la función con etapa(nombre).
+    """
+    def decorador(funcion: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
@@ -1,22 +1,22 @@
 import folium
-import gpxpy
-import gpxpy.gpx
 from fpdf import FPDF
 import os
-from typing import List, Tuple
-import networkx as nx
+from typing import List, Optional, Sequence, Tuple
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from datetime import datetime
+from trazas import medir
+from escritor_gpx import escribir_gpx
+from simplificacion import ZOOM_INICIAL_MAPA
 
 
+@medir("mapa_html")
 def generar_mapa(
     origen: Tuple[float, float],
     intermedios: List[Tuple[float, float]],
     destino: Tuple[float, float],
-    rutas: List[List[int]],
-    grafo: nx.MultiDiGraph,
-    timestamp: int
+    tramos: List[Sequence[Sequence[float]]],
+    html_filename: str
 ) -> str:
     """
     Genera un archivo HTML con el mapa y las rutas dibujadas.
@@ -32,86 +32,63 @@ def generar_mapa(
     destino : Tuple[float, float]
         Coordenadas (latitud, longitud) del destino.
 
-    rutas : List[List[int]]
-        Lista de rutas, cada una representada por nodos del grafo.
+    tramos : List[Sequence[Sequence[float]]]
+        Coordenadas (latitud, longitud) del camino de cada tramo, como arrays
+        (n, 2) o listas de pares.
 
-    grafo : nx.MultiDiGraph
-        Grafo de calles generado por OSMnx.
-
-    timestamp : int
-        Marca de tiempo usada para nombrar el archivo generado.
+    html_filename : str
+        Ruta del archivo HTML que se genera.
 
     Devuelve:
     ---------
     str
         Ruta del archivo HTML generado.
     """
-    mapa = folium.Map(location=origen, zoom_start=14)
+    mapa = folium.Map(location=origen, zoom_start=ZOOM_INICIAL_MAPA)
 
     folium.Marker(origen, popup="Origen", icon=folium.Icon(color='green')).add_to(mapa)
     for punto in intermedios:
         folium.Marker(punto, popup="Intermedio", icon=folium.Icon(color='orange')).add_to(mapa)
     folium.Marker(destino, popup="Destino", icon=folium.Icon(color='red')).add_to(mapa)
 
-    for ruta in rutas:
-        puntos: List[Tuple[float, float]] = [(grafo.nodes[n]['y'], grafo.nodes[n]['x']) for n in ruta]
+    for puntos in tramos:
         folium.PolyLine(puntos, color='blue', weight=5, opacity=0.7).add_to(mapa)
 
-    if not os.path.exists("static"):
-        os.makedirs("static")
-
-    html_filename: str = f"static/rutas_{timestamp}.html"
     mapa.save(html_filename)
     return html_filename
 
 
+@medir("gpx")
 def exportar_gpx(
-    rutas: List[List[int]],
-    grafo: nx.MultiDiGraph,
-    timestamp: int
+    tramos: List[Sequence[Sequence[float]]],
+    gpx_filename: str
 ) -> str:
     """
     Exporta la ruta generada en formato GPX.
 
+    El documento se escribe por fragmentos a medida que se recorren los tramos
+    (ver escritor_gpx.py), sin construir antes el árbol completo del GPX.
+
     Parámetros:
     -----------
-    rutas : List[List[int]]
-        Lista de rutas representadas por nodos del grafo.
-
-    grafo : nx.MultiDiGraph
-        Grafo de calles generado por OSMnx.
+    tramos : List[Sequence[Sequence[float]]]
+        Puntos (latitud, longitud, elevación) del camino de cada tramo, como
+        arrays (n, 3) o listas de ternas.
 
-    timestamp : int
-        Marca de tiempo usada para nombrar el archivo generado.
+    gpx_filename : str
+        Ruta del archivo GPX que se genera.
 
     Devuelve:
     ---------
     str
         Ruta del archivo GPX generado.
     """
-    gpx = gpxpy.gpx.GPX()
-
-    for i, ruta in enumerate(rutas):
-        track = gpxpy.gpx.GPXTrack(name=f"Ruta {i + 1}")
-        gpx.tracks.append(track)
-        segment = gpxpy.gpx.GPXTrackSegment()
-        track.segments.append(segment)
-
-        for node in ruta:
-            lat: float = grafo.nodes[node]['y']
-            lon: float = grafo.nodes[node]['x']
-            elevation: float = grafo.nodes[node].get('elevation', 0)
-            segment.points.append(gpxpy.gpx.GPXTrackPoint(lat, lon, elevation=elevation))
-
-    if not os.path.exists("static"):
-        os.makedirs("static")
-
-    gpx_filename: str = f"static/rutas_{timestamp}.gpx"
-    with open(gpx_filename, "w") as f:
-        f.write(gpx.to_xml())
+    with open(gpx_filename, "w", encoding="utf-8") as f:
+        escribir_gpx(tramos, f)
 
     return gpx_filename
 
+@medir("pdf")
 def exportar_pdf(
     distancias: List[float],
     tiempos_estimados: List[float],
@@ -119,7 +96,8 @@ def exportar_pdf(
     nombre: str,
     origen,
     puntos_intermedios,
-    destino
+    destino,
+    pdf_filename: Optional[str] = None
 ) -> str:
     """
     Genera un resumen visual completo de la ruta en formato PDF.
@@ -190,13 +168,15 @@ def exportar_pdf(
     pdf.cell(0, 10, f"- Tiempo total estimado: {h_tot}h {m_tot}m", ln=True)
 
     # Guardar PDF
-    if not os.path.exists("static"):
-        os.makedirs("static")
-    pdf_filename = f"static/{nombre}.pdf"
+    if pdf_filename is None:
+        if not os.path.exists("static"):
+            os.makedirs("static")
+        pdf_filename = f"static/{nombre}.pdf"
     pdf.output(pdf_filename)
 
     return pdf_filename
 
+@medir("png")
 def exportar_png_desde_html(output_path: str) -> None:
     """
     Versión deshabilitada de la función para evitar dependencia de Selenium/Chrome.